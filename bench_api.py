@@ -0,0 +1,415 @@
+"""Banc de charge reproductible pour l'API des argumentaires et les fichiers statiques.
+
+Exemples :
+
+    python3 bench_api.py run --sizes 20,1000,10000 --output base.json
+    python3 bench_api.py run --server-args="--mode=async" --output async.json
+    python3 bench_api.py compare base.json async.json --threshold 10
+
+Chaque taille de corpus démarre un server.py neuf dans un répertoire
+temporaire, amorcé avec des argumentaires synthétiques (graine fixe), puis
+le charge avec un mélange pondéré de GET /api/argumentaires, GET statique et
+POST. Le rapport JSON donne le débit, les percentiles de latence et le pic
+de mémoire résidente du serveur.
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import shlex
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from threading import Event, Thread
+from typing import Any
+
+
+ROOT_DIR = Path(__file__).resolve().parent
+SITE_FILES = ("server.py", "index.html", "bdd.html")
+DEFAULT_SIZES = "20,1000,10000"
+DEFAULT_MIX = "get=70,static=20,post=10"
+REQUEST_KINDS = ("get", "static", "post")
+STATIC_PATH = "/index.html"
+PERCENTILES = (50, 95, 99)
+RSS_SAMPLE_INTERVAL = 0.2
+# Métriques où une hausse est une régression (les autres : une baisse).
+LOWER_IS_BETTER = ("p50_ms", "p95_ms", "p99_ms", "peak_rss_kb", "error_rate")
+
+
+def parse_mix(spec: str) -> dict[str, int]:
+    mix: dict[str, int] = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in REQUEST_KINDS:
+            raise ValueError(f"Type de requête inconnu : {name!r}")
+        mix[name] = int(weight)
+    if sum(mix.values()) <= 0:
+        raise ValueError("Le mélange doit avoir au moins un poids positif")
+    return mix
+
+
+def synthetic_corpus(size: int, seed: int) -> list[dict[str, Any]]:
+    """Argumentaires synthétiques, identiques d'un run à l'autre pour une graine."""
+    rng = random.Random(seed)
+    words = ("biologie", "nature", "homme", "femme", "égalité", "travail",
+             "salaire", "enfants", "force", "émotion", "science", "histoire")
+    items = []
+    for index in range(size):
+        phrase = f"Phrase {index:05d} " + " ".join(rng.choices(words, k=3))
+        argumentaire = " ".join(rng.choices(words, k=rng.randint(12, 40)))
+        sources = [
+            {"titre": f"Source {rng.randint(1, 500)}", "url": f"https://example.org/{index}/{n}"}
+            for n in range(rng.randint(0, 3))
+        ]
+        items.append({"phrase": phrase, "argumentaire": argumentaire, "sources": sources})
+    return items
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_server(process: subprocess.Popen, port: int, timeout: float = 30.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Le serveur s'est arrêté avant d'être prêt")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/api/argumentaires?limit=1")
+            conn.getresponse().read()
+            conn.close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("Le serveur n'a pas démarré dans les temps")
+
+
+def _process_tree(pid: int) -> list[int]:
+    pids = [pid]
+    for current in pids:
+        try:
+            children = Path(f"/proc/{current}/task/{current}/children").read_text()
+        except OSError:
+            continue
+        pids.extend(int(child) for child in children.split())
+    return pids
+
+
+def _status_kb(pid: int, field: str) -> int:
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+class RssSampler(Thread):
+    """Relève la mémoire résidente du serveur et de ses workers (Linux /proc)."""
+
+    def __init__(self, pid: int) -> None:
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.peak_kb = 0
+        self._stop_event = Event()
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            self.sample()
+            self._stop_event.wait(RSS_SAMPLE_INTERVAL)
+
+    def sample(self) -> None:
+        pids = _process_tree(self.pid)
+        total = sum(_status_kb(pid, "VmRSS") for pid in pids)
+        # VmHWM rattrape un pic survenu entre deux relevés.
+        self.peak_kb = max(self.peak_kb, total, _status_kb(self.pid, "VmHWM"))
+
+    def stop(self) -> int | None:
+        self._stop_event.set()
+        self.join()
+        return self.peak_kb or None
+
+
+class LoadWorker(Thread):
+    """Client keep-alive qui tire des requêtes selon le mélange jusqu'à l'échéance."""
+
+    def __init__(
+        self,
+        index: int,
+        port: int,
+        mix: dict[str, int],
+        seed: int,
+        start_at: float,
+        stop_at: float,
+    ) -> None:
+        super().__init__(daemon=True)
+        self.index = index
+        self.port = port
+        self.kinds = list(mix)
+        self.weights = list(mix.values())
+        self.rng = random.Random(seed * 1000 + index)
+        self.start_at = start_at
+        self.stop_at = stop_at
+        self.latencies: dict[str, list[float]] = {kind: [] for kind in REQUEST_KINDS}
+        self.errors: dict[str, int] = {kind: 0 for kind in REQUEST_KINDS}
+        self._posted = 0
+        self._conn: http.client.HTTPConnection | None = None
+
+    def _request(self, kind: str) -> tuple[str, str, bytes | None, dict[str, str]]:
+        if kind == "get":
+            return "GET", "/api/argumentaires", None, {"Accept-Encoding": "gzip"}
+        if kind == "static":
+            return "GET", STATIC_PATH, None, {"Accept-Encoding": "gzip"}
+        self._posted += 1
+        body = json.dumps(
+            {
+                "phrase": f"Bench {self.index}-{self._posted}",
+                "argumentaire": "Argumentaire généré par le banc de charge.",
+                "sources": [{"titre": "bench_api"}],
+            },
+            ensure_ascii=False,
+        ).encode("utf-8")
+        # Les phrases du banc se ressemblent : pas de contrôle des doublons.
+        return "POST", "/api/argumentaires?duplicates=allow", body, {"Content-Type": "application/json"}
+
+    def _send(self, method: str, path: str, body: bytes | None, headers: dict[str, str]) -> int:
+        if self._conn is None:
+            self._conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=30)
+        try:
+            self._conn.request(method, path, body=body, headers=headers)
+            response = self._conn.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            self._conn.close()
+            self._conn = None
+            raise
+        if response.will_close:
+            self._conn.close()
+            self._conn = None
+        return response.status
+
+    def run(self) -> None:
+        while True:
+            now = time.perf_counter()
+            if now >= self.stop_at:
+                break
+            kind = self.rng.choices(self.kinds, self.weights)[0]
+            request = self._request(kind)
+            started = time.perf_counter()
+            try:
+                status = self._send(*request)
+            except (OSError, http.client.HTTPException):
+                status = 0
+            elapsed = time.perf_counter() - started
+            # Les requêtes de préchauffe ne sont pas comptées.
+            if started < self.start_at:
+                continue
+            if status != 200:
+                self.errors[kind] += 1
+            else:
+                self.latencies[kind].append(elapsed)
+        if self._conn is not None:
+            self._conn.close()
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Percentile au rang le plus proche."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(latencies: list[float], errors: int, duration: float) -> dict[str, Any]:
+    ordered = sorted(latencies)
+    total = len(ordered) + errors
+    summary: dict[str, Any] = {
+        "requests": total,
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "rps": round(len(ordered) / duration, 1) if duration > 0 else 0.0,
+    }
+    for pct in PERCENTILES:
+        summary[f"p{pct}_ms"] = round(percentile(ordered, pct) * 1000, 3)
+    return summary
+
+
+def prepare_site(workdir: Path, corpus: list[dict[str, Any]]) -> None:
+    for name in SITE_FILES:
+        source = ROOT_DIR / name
+        if source.exists():
+            shutil.copy2(source, workdir / name)
+    with (workdir / "argumentaires.json").open("w", encoding="utf-8") as handle:
+        json.dump(corpus, handle, ensure_ascii=False)
+
+
+def run_level(size: int, args: argparse.Namespace, mix: dict[str, int]) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix="bench-argumentaires-") as tmp:
+        workdir = Path(tmp)
+        prepare_site(workdir, synthetic_corpus(size, args.seed))
+        port = free_port()
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                "server.py",
+                f"--port={port}",
+                # Sans limite de débit : les POST du banc viennent tous de 127.0.0.1.
+                "--post-rate=0",
+                *shlex.split(args.server_args),
+            ],
+            cwd=workdir,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_for_server(server, port)
+            sampler = RssSampler(server.pid)
+            sampler.start()
+            start_at = time.perf_counter() + args.warmup
+            stop_at = start_at + args.duration
+            workers = [
+                LoadWorker(index, port, mix, args.seed, start_at, stop_at)
+                for index in range(args.concurrency)
+            ]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            peak_rss_kb = sampler.stop()
+        finally:
+            if server.poll() is None:
+                server.terminate()
+                try:
+                    server.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    server.kill()
+                    server.wait()
+
+    every: list[float] = []
+    errors = 0
+    by_kind: dict[str, Any] = {}
+    for kind in mix:
+        latencies = [value for worker in workers for value in worker.latencies[kind]]
+        kind_errors = sum(worker.errors[kind] for worker in workers)
+        by_kind[kind] = summarize(latencies, kind_errors, args.duration)
+        every.extend(latencies)
+        errors += kind_errors
+    result = {"corpus": size, **summarize(every, errors, args.duration)}
+    result["peak_rss_kb"] = peak_rss_kb
+    result["by_kind"] = by_kind
+    return result
+
+
+def command_run(args: argparse.Namespace) -> int:
+    mix = parse_mix(args.mix)
+    sizes = [int(value) for value in args.sizes.split(",") if value.strip()]
+    report: dict[str, Any] = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "server_args": args.server_args,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "mix": mix,
+            "seed": args.seed,
+        },
+        "results": [],
+    }
+    for size in sizes:
+        print(f"corpus={size} …", file=sys.stderr, flush=True)
+        report["results"].append(run_level(size, args, mix))
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    print(output)
+    return 0
+
+
+def _regression(metric: str, before: float, after: float, threshold: float) -> float | None:
+    """Écart relatif en %, s'il dépasse le seuil dans le mauvais sens."""
+    if metric == "error_rate":
+        return round((after - before) * 100, 2) if after - before > threshold / 100 else None
+    if not before:
+        return None
+    change = (after - before) / before * 100
+    worse = change if metric in LOWER_IS_BETTER else -change
+    return round(change, 2) if worse > threshold else None
+
+
+def command_compare(args: argparse.Namespace) -> int:
+    base = json.loads(Path(args.base).read_text(encoding="utf-8"))
+    current = json.loads(Path(args.current).read_text(encoding="utf-8"))
+    base_levels = {level["corpus"]: level for level in base["results"]}
+    metrics = ("rps", *(f"p{pct}_ms" for pct in PERCENTILES), "peak_rss_kb", "error_rate")
+    rows = []
+    regressions = 0
+    for level in current["results"]:
+        before = base_levels.get(level["corpus"])
+        if before is None:
+            continue
+        for metric in metrics:
+            old, new = before.get(metric), level.get(metric)
+            if old is None or new is None:
+                continue
+            flagged = _regression(metric, old, new, args.threshold)
+            regressions += flagged is not None
+            rows.append({
+                "corpus": level["corpus"],
+                "metric": metric,
+                "base": old,
+                "current": new,
+                "regression": flagged is not None,
+            })
+    print(json.dumps({"threshold": args.threshold, "regressions": regressions, "rows": rows},
+                     ensure_ascii=False, indent=2))
+    return 1 if regressions else 0
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="lancer le banc et écrire un rapport JSON")
+    run.add_argument("--sizes", default=DEFAULT_SIZES,
+                     help=f"tailles de corpus séparées par des virgules (défaut : {DEFAULT_SIZES})")
+    run.add_argument("--concurrency", type=int, default=16, help="clients simultanés (défaut : 16)")
+    run.add_argument("--duration", type=float, default=10.0, help="secondes mesurées par taille (défaut : 10)")
+    run.add_argument("--warmup", type=float, default=1.0, help="secondes de préchauffe non comptées (défaut : 1)")
+    run.add_argument("--mix", default=DEFAULT_MIX, help=f"poids des requêtes (défaut : {DEFAULT_MIX})")
+    run.add_argument("--seed", type=int, default=1, help="graine du corpus et des tirages (défaut : 1)")
+    run.add_argument("--server-args", default="", help="options transmises à server.py, ex. \"--store=sqlite\"")
+    run.add_argument("--output", help="fichier où écrire le rapport JSON")
+    run.set_defaults(handler=command_run)
+
+    compare = commands.add_parser("compare", help="comparer deux rapports et signaler les régressions")
+    compare.add_argument("base", help="rapport de référence")
+    compare.add_argument("current", help="rapport à évaluer")
+    compare.add_argument("--threshold", type=float, default=10.0,
+                         help="écart toléré en %% avant de signaler une régression (défaut : 10)")
+    compare.set_defaults(handler=command_compare)
+
+    args = parser.parse_args(argv)
+    if getattr(args, "concurrency", 1) < 1:
+        parser.error("--concurrency doit être au moins 1")
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
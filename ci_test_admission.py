@@ -0,0 +1,83 @@
+"""CI : délestage des POST (413, 429 puis 503) sur un serveur aux limites serrées."""
+
+from __future__ import annotations
+
+import http.client
+import json
+import socket
+import subprocess
+import sys
+import time
+
+from ci_test_api import BASE_URL, cleanup_db, expect, wait_for_server
+
+PORT = int(BASE_URL.rsplit(":", 1)[1])
+MAX_BODY_BYTES = 1024
+# Deux jetons, rechargés trop lentement pour revenir pendant le test.
+LIMITS = (
+    "--post-burst", "2",
+    "--post-rate", "0.01",
+    "--max-inflight-writes", "1",
+    "--max-body-bytes", str(MAX_BODY_BYTES),
+)
+
+
+def post(body: bytes) -> tuple[int, dict[str, str]]:
+    conn = http.client.HTTPConnection("127.0.0.1", PORT, timeout=10)
+    try:
+        conn.request("POST", "/api/argumentaires", body, {"Content-Type": "application/json"})
+        response = conn.getresponse()
+        response.read()
+        return response.status, {name.lower(): value for name, value in response.getheaders()}
+    finally:
+        conn.close()
+
+
+def main(argv: list[str]) -> None:
+    # Mode threaded seulement : en async le corps est lu avant l'admission, et
+    # avec --workers les limites sont propres à chaque processus.
+    server = subprocess.Popen(
+        [sys.executable, "server.py", *LIMITS, *argv],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for_server(server)
+        # 413 avant tout jeton : le corps n'est pas lu.
+        status, _ = post(b" " * (MAX_BODY_BYTES + 1))
+        expect(status == 413, f"Corps trop gros : statut {status}")
+
+        # Un envoi dont le corps n'arrive pas occupe l'unique place d'écriture.
+        body = json.dumps({"phrase": "CI admission", "argumentaire": "x"}).encode("utf-8")
+        slow = socket.create_connection(("127.0.0.1", PORT), timeout=10)
+        try:
+            slow.sendall(
+                b"POST /api/argumentaires HTTP/1.1\r\nHost: ci\r\n"
+                b"Content-Type: application/json\r\n"
+                + f"Content-Length: {len(body)}\r\n\r\n".encode("ascii")
+                + body[:5]
+            )
+            time.sleep(0.5)
+            status, headers = post(body)
+            expect(status == 503 and "retry-after" in headers, f"Écritures saturées : {status} {headers}")
+            # Les deux jetons de la rafale sont consommés.
+            status, headers = post(body)
+            expect(status == 429, f"Rafale épuisée : statut {status}")
+            expect(int(headers.get("retry-after", "0")) >= 1, f"Retry-After absent : {headers}")
+            slow.sendall(body[5:])
+            reply = slow.recv(4096)
+            expect(reply.split()[1:2] == [b"200"], f"Envoi lent refusé : {reply[:40]!r}")
+        finally:
+            slow.close()
+        print(f"ci_test_admission {' '.join(argv) or '--mode=threaded'}: ok")
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            server.kill()
+        cleanup_db("CI admission")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -2,14 +2,20 @@
 
 from __future__ import annotations
 
+import base64
+import gzip
+import http.client
 import json
+import os
+import re
 import sqlite3
 import subprocess
 import sys
 import time
 from pathlib import Path
 from typing import Any
-from urllib.error import URLError
+from urllib.error import HTTPError, URLError
+from urllib.parse import quote, urlencode
 from urllib.request import Request, urlopen
 
 
@@ -21,6 +27,8 @@ PAYLOAD = {
         {"titre": "GitLab CI"},
     ],
 }
+# Une phrase proche de PAYLOAD, puis deux phrases proches entre elles seulement.
+DUPLICATE_PHRASES = ("CI phrase tests", "CI lot unique alpha", "CI lot unique alphas")
 
 
 def wait_for_server(process: subprocess.Popen, timeout: float = 15.0) -> None:
@@ -55,6 +63,307 @@ def post_argumentaire(payload: dict[str, Any]) -> dict[str, Any]:
         return json.loads(response.read().decode("utf-8"))
 
 
+def call(
+    method: str,
+    path: str,
+    body: bytes | None = None,
+    content_type: str = "application/json",
+) -> tuple[int, Any]:
+    """Requête brute : (statut, JSON décodé), y compris pour les erreurs 4xx."""
+    request = Request(
+        f"{BASE_URL}{path}",
+        data=body,
+        headers={"Content-Type": content_type} if body is not None else {},
+        method=method,
+    )
+    for _ in range(30):
+        try:
+            with urlopen(request) as response:  # noqa: S310 - localhost call
+                return response.status, json.loads(response.read().decode("utf-8"))
+        except HTTPError as error:
+            # Le seau de jetons des POST (--post-rate) peut refuser une rafale.
+            if error.code != 429:
+                return error.code, json.loads(error.read().decode("utf-8") or "null")
+            time.sleep(float(error.headers.get("Retry-After") or 1))
+    raise RuntimeError(f"{method} {path} : toujours limité après 30 essais")
+
+
+def raw(path: str, headers: dict[str, str] | None = None) -> tuple[int, dict[str, str], bytes]:
+    """GET sans décodage : (statut, en-têtes en minuscules, corps tel que reçu)."""
+    host, port = BASE_URL.rsplit("/", 1)[1].split(":")
+    conn = http.client.HTTPConnection(host, int(port), timeout=30)
+    try:
+        conn.request("GET", path, headers=headers or {})
+        response = conn.getresponse()
+        body = response.read()
+        return response.status, {name.lower(): value for name, value in response.getheaders()}, body
+    finally:
+        conn.close()
+
+
+def check_revalidation(path: str) -> None:
+    """Le même ETag revient, et If-None-Match donne un 304 sans corps."""
+    status, headers, body = raw(path)
+    expect(status == 200 and "etag" in headers, f"{path} : statut {status} {headers}")
+    status, again, _ = raw(path)
+    expect(again.get("etag") == headers["etag"], f"{path} : ETag instable")
+    status, _, body = raw(path, {"If-None-Match": headers["etag"]})
+    expect(status == 304 and body == b"", f"{path} revalidé : statut {status}, {len(body)} octets")
+
+
+def check_encodings(path: str) -> None:
+    """Vary sur toutes les variantes, gzip décodé identique au corps en clair."""
+    check_revalidation(path)
+    status, plain_headers, plain = raw(path, {"Accept-Encoding": "identity"})
+    expect(status == 200 and "content-encoding" not in plain_headers, f"{path} en clair : {plain_headers}")
+    status, headers, compressed = raw(path, {"Accept-Encoding": "gzip"})
+    expect(status == 200 and headers.get("content-encoding") == "gzip", f"{path} en gzip : {headers}")
+    for variant in (plain_headers, headers):
+        expect("Accept-Encoding" in variant.get("vary", ""), f"{path} sans Vary : {variant}")
+    expect(gzip.decompress(compressed) == plain, f"{path} : gzip décodé différent du corps en clair")
+
+
+def call_json(method: str, path: str, payload: Any) -> tuple[int, Any]:
+    return call(method, path, json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+
+def expect(condition: bool, message: str) -> None:
+    if not condition:
+        raise RuntimeError(message)
+
+
+def check_bulk_validation() -> None:
+    """Entrées invalides d'un import : erreur par entrée ou 400, jamais de 500."""
+    status, report = call_json(
+        "POST",
+        "/api/argumentaires/bulk?duplicates=allow",
+        [
+            {"phrase": "CI source numérique", "argumentaire": "x", "sources": [{"titre": 5}]},
+            {"phrase": "CI source url liste", "argumentaire": "x", "sources": [{"url": ["a"]}]},
+        ],
+    )
+    expect(status == 200, f"Import avec sources invalides : statut {status}")
+    expect(
+        [result["status"] for result in report["results"]] == ["error", "error"],
+        f"Sources non textuelles acceptées : {report}",
+    )
+    expect("texte" in report["results"][0]["error"], f"Motif de rejet inattendu : {report}")
+
+    status, _ = call("POST", "/api/argumentaires/bulk", b'[{"phrase": "\xff\xfe"}]')
+    expect(status == 400, f"Import JSON non UTF-8 : statut {status}")
+
+    ndjson = b'{"phrase": "\xff", "argumentaire": "x"}\n{"phrase": "CI ndjson ok", "argumentaire": "x"}\n'
+    status, report = call(
+        "POST",
+        "/api/argumentaires/bulk?duplicates=allow",
+        ndjson,
+        "application/x-ndjson",
+    )
+    expect(status == 200, f"Import NDJSON non UTF-8 : statut {status}")
+    expect(
+        [result["status"] for result in report["results"]] == ["error", "ok"],
+        f"Ligne NDJSON non UTF-8 mal traitée : {report}",
+    )
+
+    status, _ = call_json(
+        "POST",
+        "/api/argumentaires",
+        {"phrase": "CI source invalide", "argumentaire": "x", "sources": [{"titre": 5}]},
+    )
+    expect(status == 400, f"POST avec source non textuelle : statut {status}")
+    status, _ = call("POST", "/api/argumentaires", b'{"phrase": "\xff"}')
+    expect(status == 400, f"POST non UTF-8 : statut {status}")
+
+
+def check_duplicate_merge() -> None:
+    """`duplicates=merge` ajoute les sources sans écraser l'argumentaire voisin."""
+    status, merged = call_json(
+        "POST",
+        "/api/argumentaires?duplicates=merge",
+        {
+            "phrase": PAYLOAD["phrase"] + "s",
+            "argumentaire": "Autre texte",
+            "sources": [{"titre": "CI merge"}],
+        },
+    )
+    expect(status == 200, f"Fusion de doublon : statut {status} {merged}")
+    expect(merged["phrase"] == PAYLOAD["phrase"], f"Fusion sur une autre phrase : {merged}")
+    expect(merged["argumentaire"] == PAYLOAD["argumentaire"], f"Argumentaire écrasé : {merged}")
+    titles = [source.get("titre") for source in merged["sources"]]
+    expect(titles == ["GitLab CI", "CI merge"], f"Sources fusionnées : {titles}")
+
+    # Même clé de doublon (casse, ponctuation) : l'argumentaire est remplacé.
+    status, merged = call_json(
+        "POST",
+        "/api/argumentaires?duplicates=merge",
+        {"phrase": PAYLOAD["phrase"].lower() + " !", "argumentaire": "Texte mis à jour"},
+    )
+    expect(status == 200, f"Fusion de même clé : statut {status} {merged}")
+    expect(merged["phrase"] == PAYLOAD["phrase"], f"Fusion sur une autre phrase : {merged}")
+    expect(merged["argumentaire"] == "Texte mis à jour", f"Argumentaire non remplacé : {merged}")
+
+
+def check_duplicate_modes() -> None:
+    """`reject` est opt-in, y compris entre les entrées d'un même import."""
+    near = {"phrase": DUPLICATE_PHRASES[0], "argumentaire": "Presque la même"}
+    status, body = call_json("POST", "/api/argumentaires?duplicates=reject", near)
+    expect(status == 409 and body["candidates"], f"Doublon refusé : statut {status} {body}")
+    status, body = call_json("POST", "/api/argumentaires", near)
+    expect(status == 200 and body["phrase"] == near["phrase"], f"Doublon par défaut : {status} {body}")
+
+    batch = [{"phrase": phrase, "argumentaire": "Lot"} for phrase in DUPLICATE_PHRASES[1:]]
+    status, report = call_json("POST", "/api/argumentaires/bulk?duplicates=reject", batch)
+    expect(status == 200, f"Import en reject : statut {status} {report}")
+    statuses = [result["status"] for result in report["results"]]
+    expect(statuses == ["ok", "duplicate"], f"Doublon interne au lot : {statuses}")
+    candidates = [candidate["phrase"] for candidate in report["results"][1]["candidates"]]
+    expect(candidates == [DUPLICATE_PHRASES[1]], f"Candidats du lot : {candidates}")
+
+
+def sort_key(phrase: str) -> tuple[str, str]:
+    """Ordre des listes du serveur (server._sort_key)."""
+    return (phrase.lower(), phrase)
+
+
+def check_paging() -> None:
+    """Pages jusqu'au bout, curseur d'une phrase disparue, projection, q, erreurs 400."""
+    phrases = [item["phrase"] for item in fetch_argumentaires()]
+    seen: list[str] = []
+    path = "/api/argumentaires?limit=2"
+    while True:
+        status, headers, body = raw(path)
+        expect(status == 200, f"{path} : statut {status}")
+        seen.extend(item["phrase"] for item in json.loads(body))
+        if "x-next-cursor" not in headers:
+            expect("link" not in headers, f"Link sans curseur : {headers}")
+            break
+        link = headers["link"]
+        expect(link.endswith('>; rel="next"'), f"Link inattendu : {link}")
+        path = link[1:link.index(">")]
+        expect(f"cursor={headers['x-next-cursor']}" in path, f"Link et X-Next-Cursor divergent : {link}")
+    expect(seen == phrases, f"Pagination : {len(seen)} phrases pour {len(phrases)}")
+
+    # Un curseur reste valable si sa phrase a disparu : la page reprend juste après.
+    gone = "CI curseur supprimé"
+    cursor = base64.urlsafe_b64encode(gone.encode("utf-8")).decode("ascii").rstrip("=")
+    status, page = call("GET", f"/api/argumentaires?{urlencode({'limit': 3, 'cursor': cursor})}")
+    expected = [phrase for phrase in phrases if sort_key(phrase) > sort_key(gone)][:3]
+    expect(status == 200 and [item["phrase"] for item in page] == expected, f"Curseur orphelin : {page}")
+
+    status, page = call("GET", "/api/argumentaires?limit=5&fields=phrase")
+    expect(status == 200 and all(item.keys() == {"phrase"} for item in page), f"fields=phrase : {page}")
+
+    status, page = call("GET", f"/api/argumentaires?{urlencode({'q': 'VÀLIDATION gitlab'})}")
+    found = [item["phrase"] for item in page]
+    expect(status == 200 and PAYLOAD["phrase"] in found, f"q sans accents ni casse : {found}")
+
+    for query in ("limit=0", "limit=abc", "cursor=***", "fields=inconnu"):
+        status, _ = call("GET", f"/api/argumentaires?{query}")
+        expect(status == 400, f"?{query} : statut {status}")
+
+
+def check_static() -> None:
+    """Fichiers du site : 304, rechargement après modification ; fichiers d'état masqués."""
+    for path in (
+        "/argumentaires.journal",
+        "/argumentaires.state.json",
+        "/argumentaires.lock",
+        "/argumentaires.db-wal",
+        "/events/",
+        "/events/shard-0.jsonl",
+    ):
+        status, _, _ = raw(path)
+        expect(status == 404, f"{path} servi : statut {status}")
+
+    asset = Path("ci-static.txt")
+    asset.write_text("version 1\n", encoding="utf-8")
+    try:
+        status, headers, body = raw(f"/{asset}")
+        expect(status == 200 and body == b"version 1\n", f"Fichier statique : {status} {body!r}")
+        for conditional in (
+            {"If-None-Match": headers["etag"]},
+            {"If-Modified-Since": headers["last-modified"]},
+        ):
+            status, _, body = raw(f"/{asset}", conditional)
+            expect(status == 304 and body == b"", f"{conditional} : statut {status}")
+        asset.write_text("version 2\n", encoding="utf-8")
+        modified = asset.stat().st_mtime + 10
+        os.utime(asset, (modified, modified))
+        time.sleep(1.2)  # STATIC_RECHECK_SECONDS
+        status, changed, body = raw(f"/{asset}", {"If-None-Match": headers["etag"]})
+        expect(status == 200 and body == b"version 2\n", f"Fichier modifié : {status} {body!r}")
+        expect(changed["etag"] != headers["etag"], "ETag inchangé après modification")
+    finally:
+        asset.unlink()
+
+
+METRIC_LINE = re.compile(r'^([A-Za-z_:][A-Za-z0-9_:]*)(\{(?:[A-Za-z_]\w*="[^"]*",?)*\})? (\S+)$')
+
+
+def scrape_metrics() -> dict[str, float]:
+    """/api/metrics au format texte Prometheus : série -> valeur, chaque ligne validée."""
+    status, headers, body = raw("/api/metrics")
+    expect(status == 200 and headers["content-type"].startswith("text/plain"), f"/api/metrics : {status}")
+    series: dict[str, float] = {}
+    for line in body.decode("utf-8").splitlines():
+        if not line or line.startswith(("# HELP ", "# TYPE ")):
+            continue
+        match = METRIC_LINE.match(line)
+        expect(match is not None, f"Ligne de métrique illisible : {line!r}")
+        series[match[1] + (match[2] or "")] = float(match[3])
+    return series
+
+
+def check_metrics(per_process: bool) -> None:
+    """Le compteur et l'histogramme des requêtes HTTP avancent après une requête."""
+    labels = 'route="/api/stats/top",method="GET"'
+    counter = f'bingo_http_requests_total{{{labels},status="200"}}'
+    buckets = [f'bingo_http_request_duration_seconds_bucket{{{labels},le="{le}"}}' for le in ("10", "+Inf")]
+    before = scrape_metrics()
+    status, _ = call("GET", "/api/stats/top")
+    expect(status == 200, f"/api/stats/top : statut {status}")
+    after = scrape_metrics()
+    for family in ("bingo_http_requests_total{", "bingo_http_request_duration_seconds_bucket{"):
+        expect(any(name.startswith(family) for name in after), f"Famille absente : {family}")
+    # Avec --workers, chaque processus a ses métriques : la collecte peut
+    # tomber sur un autre worker que la requête.
+    if per_process:
+        for name in (counter, *buckets):
+            expect(after.get(name, 0) >= before.get(name, 0) + 1, f"{name} n'a pas augmenté")
+
+
+def check_rooms() -> None:
+    """Salon multijoueur : création, arrivée, coups, 404 et 403."""
+    status, room = call_json("POST", "/api/rooms", {"size": 3, "free": False})
+    if status == 501:
+        return  # Salons indisponibles avec --workers.
+    expect(status == 201, f"Création de salon : statut {status}")
+    status, _ = call_json("POST", "/api/rooms", {"size": 3.0})
+    expect(status == 400, f"Salon de taille flottante : statut {status}")
+    base = f"/api/rooms/{room['room']}"
+
+    status, _ = call_json("POST", f"{base}/join", {"name": 5})
+    expect(status == 400, f"Nom de joueur non textuel : statut {status}")
+    status, joined = call_json("POST", f"{base}/join", {"name": "CI"})
+    expect(status == 201, f"Arrivée dans le salon : statut {status}")
+    player = joined["player"]
+
+    mark = {"player": player["id"], "token": player["token"], "cell": 4, "marked": True}
+    status, result = call_json("POST", f"{base}/mark", mark)
+    expect(status == 200 and result["marks"] == 1 << 4, f"Coup refusé : {status} {result}")
+    status, _ = call_json("POST", f"{base}/mark", {**mark, "token": "x"})
+    expect(status == 403, f"Jeton invalide : statut {status}")
+    status, _ = call_json("POST", f"{base}/mark", {**mark, "token": 0})
+    expect(status == 400, f"Jeton non textuel : statut {status}")
+
+    status, state = call("GET", base)
+    expect(status == 200 and state["players"][0]["marked"] == 1, f"État du salon : {status} {state}")
+    status, _ = call("GET", "/api/rooms/inconnu")
+    expect(status == 404, f"Salon inconnu : statut {status}")
+    status, _ = call_json("POST", "/api/rooms/inconnu/mark", mark)
+    expect(status == 404, f"Coup dans un salon inconnu : statut {status}")
+
+
 def fetch_argumentaires() -> list[dict[str, Any]]:
     with urlopen(f"{BASE_URL}/api/argumentaires") as response:  # noqa: S310
         if response.status != 200:
@@ -74,9 +383,10 @@ def cleanup_db(phrase: str) -> None:
         conn.close()
 
 
-def main() -> None:
+def main(argv: list[str]) -> None:
+    # Les options (ex. --store=sqlite) sont transmises telles quelles au serveur.
     server = subprocess.Popen(
-        [sys.executable, "server.py"],
+        [sys.executable, "server.py", *argv],
         stdout=subprocess.PIPE,
         stderr=subprocess.STDOUT,
         text=True,
@@ -91,6 +401,35 @@ def main() -> None:
         phrases = {item.get("phrase") for item in data}
         if PAYLOAD["phrase"] not in phrases:
             raise RuntimeError("L'argumentaire inséré est introuvable via GET")
+
+        # Une phrase nommée « stream » reste une phrase : le flux SSE est ailleurs.
+        status, _ = call("GET", "/api/argumentaires/stream")
+        expect(status == 404, f"/api/argumentaires/stream : statut {status}")
+
+        check_revalidation(f"/api/argumentaires/{quote(PAYLOAD['phrase'])}")
+        for path in ("/api/argumentaires", "/api/argumentaires?limit=5&fields=phrase,argumentaire"):
+            check_encodings(path)
+
+        # Delta depuis la version d'avant une écriture : seule la nouvelle entrée.
+        _, headers, _ = raw("/api/argumentaires")
+        version = headers["x-store-version"]
+        post_argumentaire({"phrase": "CI delta", "argumentaire": "x"})
+        status, delta = call("GET", f"/api/argumentaires?since={quote(version)}")
+        expect(status == 200, f"?since : statut {status}")
+        if not delta.get("reset"):
+            changed = [item["phrase"] for item in delta["items"]]
+            expect(changed == ["CI delta"], f"Delta inattendu : {changed}")
+
+        status, compact = call("GET", "/api/argumentaires?sources=ref")
+        expect(status == 200 and compact["sources"], f"?sources=ref : statut {status}")
+
+        check_paging()
+        check_static()
+        check_bulk_validation()
+        check_duplicate_merge()
+        check_duplicate_modes()
+        check_rooms()
+        check_metrics(per_process=not any(arg.startswith("--workers") for arg in argv))
     finally:
         if server.poll() is None:
             server.terminate()
@@ -98,8 +437,9 @@ def main() -> None:
                 server.wait(timeout=5)
             except subprocess.TimeoutExpired:
                 server.kill()
-        cleanup_db(PAYLOAD["phrase"])
+        for phrase in (PAYLOAD["phrase"], "CI ndjson ok", "CI delta", *DUPLICATE_PHRASES):
+            cleanup_db(phrase)
 
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])
@@ -0,0 +1,112 @@
+"""CI : un SIGHUP sous trafic keep-alive ne fait échouer aucune requête."""
+
+from __future__ import annotations
+
+import http.client
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from threading import Thread
+
+from ci_test_api import BASE_URL, expect, wait_for_server
+
+PORT = int(BASE_URL.rsplit(":", 1)[1])
+CLIENTS = 8
+RELOAD_AFTER_SECONDS = 2.0
+TRAFFIC_SECONDS = 8.0
+PATHS = ("/api/argumentaires", "/api/argumentaires?limit=5", "/api/stats/top", "/")
+
+
+def client(index: int, deadline: float, done: list[int], errors: list[str]) -> None:
+    """Requêtes en boucle sur une connexion réutilisée tant que le serveur la garde."""
+    conn = None
+    count = 0
+    while time.monotonic() < deadline:
+        path = PATHS[count % len(PATHS)]
+        count += 1
+        try:
+            if conn is None:
+                conn = http.client.HTTPConnection("127.0.0.1", PORT, timeout=10)
+            conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(f"client {index} : {path} -> {response.status}")
+            done[index] += 1
+            if response.will_close:
+                conn.close()
+                conn = None
+        except (OSError, http.client.HTTPException) as exc:
+            errors.append(f"client {index} : {path} -> {exc!r}")
+            if conn is not None:
+                conn.close()
+            conn = None
+    if conn is not None:
+        conn.close()
+
+
+def main(argv: list[str]) -> None:
+    # Groupe de processus dédié : le successeur, qui n'est pas notre enfant,
+    # est arrêté avec le reste à la fin.
+    server = subprocess.Popen(
+        [sys.executable, "server.py", *argv],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    try:
+        wait_for_server(server)
+        deadline = time.monotonic() + TRAFFIC_SECONDS
+        done = [0] * CLIENTS
+        errors: list[str] = []
+        threads = [
+            Thread(target=client, args=(index, deadline, done, errors)) for index in range(CLIENTS)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(RELOAD_AFTER_SECONDS)
+        os.kill(server.pid, signal.SIGHUP)
+        for thread in threads:
+            thread.join()
+
+        expect(not errors, f"{len(errors)} requêtes en échec pendant le rechargement : {errors[:5]}")
+        expect(sum(done) > 0, "Aucune requête servie")
+        # Le prédécesseur s'arrête une fois le successeur prêt, qui sert encore.
+        try:
+            server.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            raise RuntimeError("Le processus d'origine sert encore après le SIGHUP") from None
+        conn = http.client.HTTPConnection("127.0.0.1", PORT, timeout=10)
+        conn.request("GET", "/api/argumentaires")
+        expect(conn.getresponse().status == 200, "Le successeur ne répond pas")
+        conn.close()
+        print(f"ci_test_reload {' '.join(argv) or '--mode=threaded'}: ok ({sum(done)} requêtes)")
+    finally:
+        try:
+            os.killpg(server.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+        if server.poll() is None:
+            try:
+                server.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                os.killpg(server.pid, signal.SIGKILL)
+        wait_for_port_free()
+
+
+def wait_for_port_free(timeout: float = 15.0) -> None:
+    """Attend que le successeur ait libéré le port pour l'étape suivante."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", PORT), timeout=1).close()
+        except OSError:
+            return
+        time.sleep(0.2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
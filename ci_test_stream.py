@@ -0,0 +1,73 @@
+"""CI : une grande liste envoyée par lots est identique à sa variante gzip."""
+
+from __future__ import annotations
+
+import gzip
+import http.client
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from ci_test_api import BASE_URL, expect, wait_for_server
+
+PORT = int(BASE_URL.rsplit(":", 1)[1])
+ENTRIES = 1500
+
+
+def fetch(path: str, encoding: str) -> tuple[dict[str, str], bytes]:
+    conn = http.client.HTTPConnection("127.0.0.1", PORT, timeout=30)
+    try:
+        conn.request("GET", path, headers={"Accept-Encoding": encoding})
+        response = conn.getresponse()
+        body = response.read()
+        expect(response.status == 200, f"{path} ({encoding}) : statut {response.status}")
+        return {name.lower(): value for name, value in response.getheaders()}, body
+    finally:
+        conn.close()
+
+
+def main(argv: list[str]) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        shutil.copy("server.py", root / "server.py")
+        # Corpus assez grand pour dépasser STREAM_MIN_BYTES : le corps en
+        # clair est alors réécrit depuis les fragments, lot par lot.
+        corpus = [
+            {
+                "phrase": f"Phrase de test numéro {index}",
+                "argumentaire": f"Argumentaire {index} : " + "texte de remplissage " * 10,
+                "sources": [{"titre": f"Source {index % 7}", "url": f"https://exemple.org/{index}"}],
+            }
+            for index in range(ENTRIES)
+        ]
+        (root / "argumentaires.json").write_text(json.dumps(corpus, ensure_ascii=False), encoding="utf-8")
+        server = subprocess.Popen(
+            [sys.executable, "server.py", *argv],
+            cwd=root,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_for_server(server)
+            headers, identity = fetch("/api/argumentaires", "identity")
+            expect("content-encoding" not in headers, f"Réponse en clair compressée : {headers}")
+            expect(int(headers["content-length"]) == len(identity), "Content-Length du flux")
+            expect(len(identity) > 64 * 1024, f"Liste trop petite pour être envoyée par lots : {len(identity)}")
+            headers, compressed = fetch("/api/argumentaires", "gzip")
+            expect(headers.get("content-encoding") == "gzip", f"Variante gzip absente : {headers}")
+            expect(gzip.decompress(compressed) == identity, "Flux par lots différent du corps gzip")
+            expect(len(json.loads(identity)) >= ENTRIES, "Entrées manquantes dans le flux")
+            print(f"ci_test_stream {' '.join(argv) or '--mode=threaded'}: ok ({len(identity)} octets)")
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,518 @@
+"""Tests unitaires CI des structures internes du serveur, sans lancer d'HTTP."""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+import server
+
+
+def expect(condition: bool, message: str) -> None:
+    if not condition:
+        raise RuntimeError(message)
+
+
+def card(size: int = 3) -> server._PlayerCard:
+    return server._PlayerCard(1, "CI", size, [f"p{index}" for index in range(size * size)])
+
+
+def check_player_card() -> None:
+    """Rangée, colonne, diagonales, puis une ligne défaite en décochant."""
+    cases = {
+        "row:1": (3, 4, 5),
+        "col:2": (2, 5, 8),
+        "diagonal": (0, 4, 8),
+        "anti-diagonal": (2, 4, 6),
+    }
+    for line, cells in cases.items():
+        player = card()
+        for cell in cells[:-1]:
+            expect(player.set(cell, True), f"{line} : case {cell} non cochée")
+        expect(player.lines == 0, f"{line} : bingo prématuré")
+        player.set(cells[-1], True)
+        expect(player.lines == 1 and player.completed() == [line], f"{line} : {player.completed()}")
+        expect(not player.set(cells[-1], True), f"{line} : double coche comptée")
+        player.set(cells[0], False)
+        expect(player.lines == 0 and player.completed() == [], f"{line} : ligne non défaite")
+        expect(player.marks.bit_count() == len(cells) - 1, f"{line} : bitset {player.marks:b}")
+
+    # La case centrale complète à la fois sa rangée, sa colonne et les deux diagonales.
+    player = card()
+    for cell in (0, 8, 2, 6, 3, 5, 1, 7):
+        player.set(cell, True)
+    expect(player.lines == 4, f"Grille sans centre : {player.completed()}")
+    player.set(4, True)
+    expect(player.lines == 8, f"Grille pleine : {player.completed()}")
+    player.set(4, False)
+    expect(player.lines == 4, f"Centre décoché : {player.completed()}")
+
+    # La case libre est cochée d'office.
+    player = server._PlayerCard(1, "CI", 3, ["a", "b", "c", "d", None, "e", "f", "g", "h"])
+    expect(player.marks == 1 << 4 and player.lines == 0, "Case libre non cochée")
+
+
+def check_sources() -> None:
+    """Sources partagées : même instance, lecture seule, sérialisables."""
+    first = server._sanitize_source({"titre": " Insee ", "url": "https://insee.fr"})
+    second = server._sanitize_source({"titre": "Insee", "auteur": None, "url": "https://insee.fr"})
+    expect(first is second, "Sources identiques non partagées")
+    for mutate in (
+        lambda: first.__setitem__("titre", "x"),
+        lambda: first.update(auteur="x"),
+        lambda: first.pop("url"),
+        lambda: setattr(first, "id", "x"),
+    ):
+        try:
+            mutate()
+        except TypeError:
+            continue
+        raise RuntimeError(f"Source partagée modifiée : {first}")
+    expect(json.dumps(first) == '{"titre": "Insee", "url": "https://insee.fr"}', json.dumps(first))
+    compact = server._with_source_refs([{"phrase": "p", "sources": [first]}])
+    expect(compact["items"][0]["sources"] == [first.id], f"Forme ?sources=ref : {compact}")
+    expect(json.loads(json.dumps(compact))["sources"] == {first.id: dict(first)}, "Registre des sources")
+
+
+@contextmanager
+def temp_store() -> Iterator[Path]:
+    """Magasin JSON dans un répertoire temporaire, rendu ensuite tel qu'il était."""
+    names = (
+        "JSON_DB_PATH", "JOURNAL_PATH", "JOURNAL_COMPACTING_PATH", "STORE_LOCK_PATH",
+        "STARTUP_STATE_PATH", "LEGACY_DB_PATH", "SQLITE_DB_PATH",
+    )
+    saved = {name: getattr(server, name) for name in names}
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        for name in names:
+            setattr(server, name, root / saved[name].name)
+        try:
+            yield root
+        finally:
+            release_store()
+            for name, value in saved.items():
+                setattr(server, name, value)
+
+
+def release_store() -> None:
+    """Ferme ce qu'un processus garde ouvert, comme à son arrêt."""
+    if server._JOURNAL is not None:
+        server._JOURNAL.close()
+        server._JOURNAL = None
+    if server._LOCK_HANDLE is not None:
+        server._LOCK_HANDLE.close()
+        server._LOCK_HANDLE = None
+
+
+def restart() -> None:
+    release_store()
+    server.init_db("json")
+
+
+def stored(phrase: str) -> str | None:
+    item = server.fetch_argumentaire(phrase)
+    return None if item is None else item["argumentaire"]
+
+
+def json_phrases() -> set[str]:
+    return {item["phrase"] for item in json.loads(server.JSON_DB_PATH.read_text(encoding="utf-8"))}
+
+
+def check_journal() -> None:
+    """Rejeu du journal, ligne tronquée, compaction et .compacting orphelin."""
+    with temp_store():
+        server.init_db("json")
+        server.upsert_argumentaire("CI journal", "premier")
+        server.upsert_argumentaire("CI journal", "second")
+        expect("CI journal" not in json_phrases(), "Écriture recopiée dans le JSON sans compaction")
+        restart()
+        expect(stored("CI journal") == "second", f"Rejeu après redémarrage : {stored('CI journal')}")
+
+        # Ligne interrompue (arrêt brutal pendant l'écriture) : ignorée au rejeu,
+        # sans emporter la ligne suivante.
+        with server.JOURNAL_PATH.open("ab") as handle:
+            handle.write(b'{"phrase": "CI coup\xc3\xa9e", "argumentaire": "x"')
+        restart()
+        expect(stored("CI coupée") is None, "Ligne tronquée rejouée")
+        expect(stored("CI journal") == "second", "Ligne tronquée : entrées précédentes perdues")
+        server.upsert_argumentaire("CI après coupure", "x")
+        restart()
+        expect(stored("CI après coupure") == "x", "Écriture suivant une ligne tronquée perdue")
+
+        # Compaction : le journal est replié dans argumentaires.json puis vidé.
+        compact_bytes = server.JOURNAL_COMPACT_BYTES
+        server.JOURNAL_COMPACT_BYTES = 1
+        try:
+            server._compact_journal()
+        finally:
+            server.JOURNAL_COMPACT_BYTES = compact_bytes
+        expect({"CI journal", "CI après coupure"} <= json_phrases(), "Journal non replié dans le JSON")
+        expect(server.JOURNAL_PATH.stat().st_size == 0, "Journal non vidé après compaction")
+        expect(not server.JOURNAL_COMPACTING_PATH.exists(), ".compacting laissé après compaction")
+        restart()
+        expect(stored("CI journal") == "second", "Entrée perdue après compaction")
+
+        # Compaction interrompue : le .compacting restant est fusionné au démarrage.
+        line = json.dumps({"phrase": "CI orphelin", "argumentaire": "y"}, ensure_ascii=False)
+        server.JOURNAL_COMPACTING_PATH.write_text(line + "\n", encoding="utf-8")
+        restart()
+        expect(stored("CI orphelin") == "y", "Journal .compacting non fusionné")
+        expect("CI orphelin" in json_phrases(), ".compacting non replié dans le JSON")
+        expect(not server.JOURNAL_COMPACTING_PATH.exists(), ".compacting non supprimé")
+
+
+def check_compaction_handoff() -> None:
+    """Un successeur qui a déjà replié le journal n'est pas écrasé par la compaction."""
+    with temp_store():
+        server.init_db("json")
+        server.upsert_argumentaire("CI avant rotation", "x")
+        write_tmp = server._write_json_tmp
+
+        def successor_merges(items: list[dict[str, object]], suffix: str = "tmp") -> Path:
+            # Pendant l'écriture hors verrou, le successeur replie .compacting
+            # et une écriture plus récente dans le JSON.
+            path = write_tmp(items, suffix)
+            newer = [*json.loads(server.JSON_DB_PATH.read_text(encoding="utf-8"))]
+            newer.append({"phrase": "CI après rotation", "argumentaire": "z", "sources": []})
+            write_tmp(newer).replace(server.JSON_DB_PATH)
+            server.JOURNAL_COMPACTING_PATH.unlink()
+            return path
+
+        compact_bytes = server.JOURNAL_COMPACT_BYTES
+        server.JOURNAL_COMPACT_BYTES = 1
+        server._write_json_tmp = successor_merges
+        try:
+            server._compact_journal()
+        finally:
+            server._write_json_tmp = write_tmp
+            server.JOURNAL_COMPACT_BYTES = compact_bytes
+        expect("CI après rotation" in json_phrases(), "JSON du successeur écrasé par la compaction")
+        leftovers = sorted(path.name for path in server.JSON_DB_PATH.parent.glob("*.tmp"))
+        expect(not leftovers, f"Fichiers temporaires laissés : {leftovers}")
+
+
+def entry(phrase: str, argumentaire: str = "texte", titre: str = "") -> dict[str, object]:
+    return {"phrase": phrase, "argumentaire": argumentaire, "sources": [{"titre": titre}] if titre else []}
+
+
+def check_search() -> None:
+    """Accents, mots-outils, préfixes, et exact avant préfixe."""
+    index = server._SearchIndex.built([
+        entry("Les hommes ne pleurent pas", "Rôle social"),
+        entry("Un homme, un vrai", "Virilité"),
+        entry("Sois fort", "hommage aux pleureurs", titre="Étude"),
+    ])
+    phrases = lambda query: [phrase for phrase, _ in index.search(query, 10)]
+    expect(phrases("ROLE") == ["Les hommes ne pleurent pas"], f"Accents : {phrases('ROLE')}")
+    expect(phrases("etude") == ["Sois fort"], f"Titre de source : {phrases('etude')}")
+    expect(phrases("les ne pas") == [], f"Mots-outils indexés : {phrases('les ne pas')}")
+    expect(phrases("les hommes") == phrases("hommes"), "Mot-outil dans la requête")
+    expect(set(phrases("hom")) == {"Les hommes ne pleurent pas", "Un homme, un vrai", "Sois fort"}, "Préfixe")
+    # « homme » exact l'emporte sur « hommes » et « hommage », simples préfixes.
+    expect(phrases("homme")[0] == "Un homme, un vrai", f"Exact après préfixe : {phrases('homme')}")
+    expect(phrases("homme pleur") == ["Les hommes ne pleurent pas"], f"Tous les termes : {phrases('homme pleur')}")
+
+
+def check_search_updates() -> None:
+    """Mises à jour successives (surcouche repliée souvent) = index reconstruit."""
+    saved = server.SEARCH_OVERLAY_MIN
+    server.SEARCH_OVERLAY_MIN = 8
+    try:
+        rng = random.Random(7)
+        words = [f"mot{index}" for index in range(40)]
+        items: dict[str, dict[str, object]] = {}
+        index = server._SearchIndex.built([])
+        for step in range(400):
+            phrase = f"phrase {rng.randrange(60)}"
+            item = entry(phrase, " ".join(rng.sample(words, rng.randrange(1, 6))))
+            items[phrase] = item
+            index = index.updated([item])
+            if step == 200:
+                published, frozen = index, [index.search(word, 100) for word in words]
+        rebuilt = server._SearchIndex.built(items.values())
+        for query in [*words, "mot", "mot1", "phrase", "mot2 mot3"]:
+            expect(
+                index.search(query, 100) == rebuilt.search(query, 100),
+                f"Index mis à jour différent du reconstruit pour {query!r}",
+            )
+        # Un index publié ne change plus, malgré les mises à jour suivantes.
+        expect(frozen == [published.search(word, 100) for word in words], "Index publié modifié")
+    finally:
+        server.SEARCH_OVERLAY_MIN = saved
+
+
+@contextmanager
+def counting(*names: str) -> Iterator[dict[str, int]]:
+    """Compte les appels aux fonctions `names` du module server."""
+    calls = dict.fromkeys(names, 0)
+    saved = {name: getattr(server, name) for name in names}
+
+    def wrap(name: str):
+        def counted(*args, **kwargs):
+            calls[name] += 1
+            return saved[name](*args, **kwargs)
+        return counted
+
+    for name in names:
+        setattr(server, name, wrap(name))
+    try:
+        yield calls
+    finally:
+        for name, function in saved.items():
+            setattr(server, name, function)
+
+
+def write_json(items: list[dict[str, object]]) -> None:
+    server.JSON_DB_PATH.write_text(json.dumps(items, ensure_ascii=False), encoding="utf-8")
+
+
+def check_startup_fast_path() -> None:
+    """Démarrage sans fusion si rien n'a changé ; l'ancienne base n'est migrée qu'une fois."""
+    with temp_store():
+        server.init_db("json")
+        before = server.JSON_DB_PATH.stat()
+        with counting("_write_json_store", "_load_legacy_sqlite") as calls:
+            restart()
+            expect(calls["_write_json_store"] == 0, "Démarrage à l'identique : JSON réécrit")
+            after = server.JSON_DB_PATH.stat()
+            expect((after.st_ino, after.st_mtime_ns) == (before.st_ino, before.st_mtime_ns), "JSON touché")
+
+            # JSON modifié hors du serveur : fusion complète et réécriture.
+            items = json.loads(server.JSON_DB_PATH.read_text(encoding="utf-8"))
+            write_json([*items, {"phrase": "CI édité", "argumentaire": "x"}])
+            restart()
+            expect(calls["_write_json_store"] == 1, "JSON modifié : pas de fusion")
+            expect(stored("CI édité") == "x", "Entrée ajoutée au JSON non chargée")
+
+            # Nouvelle liste initiale : fusion complète aussi.
+            seed = server.INITIAL_ARGUMENTAIRES
+            server.INITIAL_ARGUMENTAIRES = [*seed, {"phrase": "CI graine", "argumentaire": "x"}]
+            try:
+                restart()
+            finally:
+                server.INITIAL_ARGUMENTAIRES = seed
+            expect(calls["_write_json_store"] == 2, "Liste initiale modifiée : pas de fusion")
+            expect(stored("CI graine") == "x", "Nouvelle graine non chargée")
+            expect(calls["_load_legacy_sqlite"] == 0, "Ancienne base relue après sa migration")
+
+        # Ancienne base SQLite : importée une fois, puis plus jamais relue.
+        conn = server.sqlite3.connect(server.LEGACY_DB_PATH)
+        conn.execute("CREATE TABLE argumentaires (phrase TEXT, argumentaire TEXT, sources TEXT)")
+        conn.execute("INSERT INTO argumentaires VALUES ('CI héritée', 'x', '[]')")
+        conn.commit()
+        conn.close()
+        state = json.loads(server.STARTUP_STATE_PATH.read_text(encoding="utf-8"))
+        server.STARTUP_STATE_PATH.write_text(json.dumps({**state, "legacy_migrated": False}), encoding="utf-8")
+        restart()
+        expect(stored("CI héritée") == "x", "Ancienne base non migrée")
+        items = json.loads(server.JSON_DB_PATH.read_text(encoding="utf-8"))
+        write_json([item for item in items if item["phrase"] != "CI héritée"])
+        with counting("_load_legacy_sqlite") as calls:
+            restart()
+        expect(calls["_load_legacy_sqlite"] == 0, "Ancienne base relue après sa migration")
+        expect(stored("CI héritée") is None, "Entrée supprimée réimportée de l'ancienne base")
+
+
+def hashed_files(out: Path) -> set[str]:
+    """Fichiers hachés de l'instantané, sans leurs jumeaux .gz."""
+    return {
+        path.relative_to(out).as_posix()
+        for path in [*out.glob("*.json"), *out.glob("phrases/*.json")]
+        if path.name != "manifest.json"
+    }
+
+
+def manifest_files(out: Path) -> set[str]:
+    manifest = json.loads((out / "manifest.json").read_text(encoding="utf-8"))
+    return {manifest["argumentaires"], manifest["index"]}
+
+
+def check_build() -> None:
+    """Build incrémental : rien de réécrit à l'identique, trois fichiers par phrase modifiée."""
+    with temp_store() as root:
+        out = root / "static-api"
+        server.build_static_api(out, "json")
+        first, first_manifest = hashed_files(out), manifest_files(out)
+        stats = server.build_static_api(out, "json")
+        expect(stats == {"written": 0, "unchanged": len(first), "removed": 0}, f"Second build : {stats}")
+        expect(hashed_files(out) == first, "Second build : fichiers changés")
+
+        # Une phrase modifiée : son fichier, la liste et l'index, rien d'autre.
+        phrase = server.fetch_argumentaires()[0]["phrase"]
+        server.upsert_argumentaire(phrase, "Argumentaire modifié")
+        stats = server.build_static_api(out, "json")
+        second = hashed_files(out)
+        expect(stats["written"] == 3 and stats["removed"] == 0, f"Build après modification : {stats}")
+        expect(len(second - first) == 3, f"Nouveaux fichiers : {sorted(second - first)}")
+        for name in second - first:
+            expect((out / f"{name}.gz").exists(), f"{name} sans jumeau .gz")
+        # Le manifeste précédent reste servi : ses fichiers sont gardés.
+        expect(first <= second, "Fichiers du manifeste précédent supprimés")
+
+        server.upsert_argumentaire(phrase, "Argumentaire modifié deux fois")
+        stats = server.build_static_api(out, "json")
+        third = hashed_files(out)
+        # Seuls les fichiers du premier manifeste, ni courant ni précédent, partent.
+        gone = first - third
+        expect(len(gone) == 3 and first_manifest <= gone, f"Élagage : {sorted(gone)}")
+        expect((second - first) <= third, "Fichiers du manifeste précédent supprimés")
+        expect(stats["removed"] == 2 * len(gone), f"Fichiers supprimés : {stats}")
+        expect(not any((out / f"{name}.gz").exists() for name in gone), "Jumeaux .gz laissés")
+
+
+def check_static_cache() -> None:
+    """Cache des fichiers du site : borné, réservé au site, sans les fichiers d'état."""
+    base = server.BASE_DIR
+    expect(server._is_site_file(str(base / "index.html")), "Page du site refusée")
+    expect(server._is_site_file(str(server.BUILD_DIR / "manifest.json")), "static-api refusé")
+    expect(
+        not server._is_site_file(str(base / "workers-argumentaires" / "node_modules" / "x.js")),
+        "node_modules mis en cache",
+    )
+    for name in ("argumentaires.journal", "argumentaires.db-wal", "argumentaires.json.tmp", "events/a.jsonl"):
+        expect(server._is_private_file(str(base / name)), f"{name} servi")
+    expect(not server._is_private_file(str(server.JSON_DB_PATH)), "argumentaires.json masqué")
+
+    saved = server.STATIC_CACHE_MAX_ENTRIES
+    server.STATIC_CACHE_MAX_ENTRIES = 2
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            paths = [Path(directory) / f"{index}.txt" for index in range(3)]
+            for path in paths:
+                path.write_text(path.name, encoding="utf-8")
+                server._load_static_asset(str(path), "text/plain")
+            cached = [path for path in paths if str(path) in server._STATIC_CACHE]
+            expect(cached == paths[1:], f"Éviction LRU : {cached}")
+            for path in paths:
+                server._STATIC_CACHE.pop(str(path), None)
+    finally:
+        server.STATIC_CACHE_MAX_ENTRIES = saved
+
+
+def check_sqlite_changes() -> None:
+    """Un second processus SQLite voit l'écriture dès le stat, et ne relit qu'elle."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "argumentaires.db"
+        writer, reader = server._SqliteStore(path), server._SqliteStore(path)
+        try:
+            writer.write([{"phrase": "CI a", "argumentaire": "x", "sources": []}])
+            expect(len(reader.load()) == 1, "Chargement initial")
+            expect(not reader.is_stale(60.0), "Base inchangée vue comme modifiée")
+            item = {"phrase": "CI b", "argumentaire": "y", "sources": [{"titre": "t"}]}
+            writer.write([item])
+            # Indice stat() : vu tout de suite, malgré l'intervalle de 60 s.
+            expect(reader.is_stale(60.0), "Écriture d'un autre processus non vue")
+            changed = reader.changed_items()
+            expect(changed == [item], f"Phrases relues : {changed}")
+            expect(not reader.is_stale(), "Génération non rattrapée")
+            with writer.connection() as conn:
+                conn.execute("DELETE FROM argumentaires WHERE phrase = 'CI a'")
+            expect(reader.is_stale(60.0) and reader.changed_items() is None, "Suppression non détectée")
+        finally:
+            writer.close()
+            reader.close()
+
+
+def totals(events: server._PhraseEvents, window: str) -> dict[str, int]:
+    return {row["phrase"]: row["count"] for row in events.top(window, 10)}
+
+
+def check_events_windows() -> None:
+    """Anneau des compteurs : fenêtres de top(), tours d'anneau, tranches périmées."""
+    with tempfile.TemporaryDirectory() as directory:
+        events = server._PhraseEvents(Path(directory))
+        events._pid = os.getpid()  # Pas de thread de vidage pendant le test.
+        step = server.EVENTS_BUCKET_SECONDS
+        current = int(time.time()) // step * step
+        events._add(current, {"maintenant": 1})
+        events._add(current - 2 * 3600, {"ce matin": 2})
+        events._add(current - 2 * 86400, {"avant-hier": 4})
+        # Tranche qui déborde d'une seconde dans la fenêtre d'une heure.
+        events._add(int(time.time()) - 3600 - step + 1, {"lisière": 8})
+        tops = {window: totals(events, window) for window in server.EVENTS_WINDOWS}
+        expect(tops["1h"] == {"maintenant": 1, "lisière": 8}, f"Fenêtre 1h : {tops['1h']}")
+        expect(tops["24h"] == {**tops["1h"], "ce matin": 2}, f"Fenêtre 24h : {tops['24h']}")
+        expect(tops["7d"] == {**tops["24h"], "avant-hier": 4}, f"Fenêtre 7d : {tops['7d']}")
+        ranked = [row["phrase"] for row in events.top("7d", 2)]
+        expect(ranked == ["lisière", "avant-hier"], f"Classement : {ranked}")
+
+        # Un tour d'anneau plus tard, la même case est réutilisée : une tranche
+        # plus ancienne que l'occupant est ignorée, une plus récente le remplace.
+        old = current - server.EVENTS_RETENTION_SECONDS
+        events._add(old, {"trop vieux": 16})
+        slot = events._ring[current // step % len(events._ring)]
+        expect(slot == (current, {"maintenant": 1}), f"Emplacement courant écrasé : {slot}")
+        events = server._PhraseEvents(Path(directory))
+        events._pid = os.getpid()
+        events._add(old, {"trop vieux": 16})
+        events._add(current, {"maintenant": 1})
+        expect(totals(events, "7d") == {"maintenant": 1}, "Tranche d'un tour précédent comptée")
+
+
+def check_events_segments() -> None:
+    """Vidage sur disque et relecture des lignes ajoutées par un autre worker."""
+    with tempfile.TemporaryDirectory() as directory:
+        mine = server._PhraseEvents(Path(directory))
+        other = server._PhraseEvents(Path(directory))
+        for events in (mine, other):
+            events._pid = os.getpid()
+        mine.record({"a": 1})
+        mine.record({"a": 2, "b": 1})
+        mine.flush()
+        other.record({"b": 5})
+        other.flush()
+        counts = totals(mine, "1h")
+        expect(counts == {"a": 3, "b": 1}, f"Avant relecture : {counts}")
+        mine.flush()  # Rien à verser : relit seulement la ligne de l'autre worker.
+        counts = totals(mine, "1h")
+        expect(counts == {"a": 3, "b": 6}, f"Après relecture : {counts}")
+
+        # Une ligne en cours d'écriture n'est lue qu'une fois complète, et une seule fois.
+        segment = mine._segment(int(time.time()))
+        bucket = int(time.time()) // server.EVENTS_BUCKET_SECONDS * server.EVENTS_BUCKET_SECONDS
+        line = json.dumps({"t": bucket, "counts": {"c": 7}})
+        with segment.open("a") as handle:
+            handle.write(line[:10])
+        mine.flush()
+        expect(all(row["phrase"] != "c" for row in mine.top("1h", 10)), "Ligne partielle comptée")
+        with segment.open("a") as handle:
+            handle.write(line[10:] + "\n")
+        mine.flush()
+        mine.flush()
+        counts = totals(mine, "1h")
+        expect(counts.get("c") == 7, f"Ligne complétée : {counts}")
+
+        # Un nouveau processus recharge tout l'historique depuis les segments.
+        fresh = server._PhraseEvents(Path(directory))
+        fresh._refresh()
+        fresh._pid = os.getpid()
+        counts = totals(fresh, "24h")
+        expect(counts == {"a": 3, "b": 6, "c": 7}, f"Rechargement : {counts}")
+
+
+def main() -> None:
+    check_player_card()
+    check_sources()
+    check_journal()
+    check_compaction_handoff()
+    check_startup_fast_path()
+    check_sqlite_changes()
+    check_static_cache()
+    check_build()
+    check_search()
+    check_search_updates()
+    check_events_windows()
+    check_events_segments()
+    print("ci_test_units: ok")
+
+
+if __name__ == "__main__":
+    main()
+    sys.exit(0)
@@ -0,0 +1,73 @@
+"""CI : avec --workers, une écriture est visible de tous les workers dès la réponse."""
+
+from __future__ import annotations
+
+import http.client
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from urllib.parse import quote
+
+from ci_test_api import BASE_URL, expect, wait_for_server
+
+PORT = int(BASE_URL.rsplit(":", 1)[1])
+ROUNDS = 50
+# Lectures après chaque écriture : de quoi tomber sur chacun des workers.
+READS = 6
+
+
+def request(method: str, path: str, body: bytes | None = None) -> tuple[int, bytes]:
+    """Une connexion neuve par requête : le noyau la confie à n'importe quel worker."""
+    conn = http.client.HTTPConnection("127.0.0.1", PORT, timeout=10)
+    try:
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        conn.request(method, path, body, headers)
+        response = conn.getresponse()
+        return response.status, response.read()
+    finally:
+        conn.close()
+
+
+def main(argv: list[str]) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        shutil.copy("server.py", root / "server.py")
+        shutil.copy("argumentaires.json", root / "argumentaires.json")
+        server = subprocess.Popen(
+            [sys.executable, "server.py", "--post-rate", "0", *argv],
+            cwd=root,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_for_server(server)
+            for round_index in range(ROUNDS):
+                phrase = f"CI workers {round_index}"
+                argumentaire = f"Version {round_index}"
+                body = json.dumps({"phrase": phrase, "argumentaire": argumentaire}).encode("utf-8")
+                status, _ = request("POST", "/api/argumentaires", body)
+                expect(status == 200, f"{phrase} : POST statut {status}")
+                for read in range(READS):
+                    if read % 2:
+                        status, data = request("GET", f"/api/argumentaires/{quote(phrase)}")
+                        found = status == 200 and json.loads(data)["argumentaire"] == argumentaire
+                    else:
+                        status, data = request("GET", "/api/argumentaires")
+                        found = status == 200 and any(
+                            item["phrase"] == phrase for item in json.loads(data)
+                        )
+                    expect(found, f"{phrase} invisible à la lecture {read} (statut {status})")
+            print(f"ci_test_workers {' '.join(argv)}: ok ({ROUNDS * READS} lectures)")
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -2,20 +2,421 @@
 
 from __future__ import annotations
 
+import gzip
+import hashlib
+import heapq
+import io
+import argparse
+import asyncio
+import base64
+import bisect
 import json
+import math
+import os
+import random
+import re
+import secrets
+import selectors
+import signal
+import socket
 import sqlite3
+import subprocess
+import sys
+import time
+import traceback
+import unicodedata
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from email.utils import formatdate, parsedate_to_datetime
 from http import HTTPStatus
 from http.server import HTTPServer, SimpleHTTPRequestHandler
 from pathlib import Path
 from socketserver import ThreadingMixIn
-from urllib.parse import urlparse
-from threading import Lock
+from types import MappingProxyType
+from typing import BinaryIO, Callable, Iterable, Iterator, Mapping, NamedTuple
+from urllib.parse import parse_qs, unquote, urlencode, urlparse
+from threading import Condition, Lock, Thread, current_thread, local
+from weakref import WeakValueDictionary
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
 
 
 BASE_DIR = Path(__file__).resolve().parent
 LEGACY_DB_PATH = BASE_DIR / "argumentaires.db"
+# Le moteur SQLite réutilise argumentaires.db (l'ancien schéma y est migré).
+SQLITE_DB_PATH = LEGACY_DB_PATH
+SQLITE_POOL_SIZE = 16
+# Sur le chemin de lecture, la génération SQLite n'est relue que si le
+# fichier ou son -wal a bougé (stat), et au moins une fois par intervalle.
+SQLITE_STALE_CHECK_SECONDS = 0.1
+# Lignes gardées dans la table changes : un processus plus en retard que ça
+# recharge toute la base au lieu des seules phrases modifiées.
+SQLITE_CHANGES_KEPT = 10000
+STORE_ENGINES = ("json", "sqlite")
+BULK_MAX_ITEMS = 1000
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/jsonl", "application/ndjson")
+ITEM_FIELDS = ("phrase", "argumentaire", "sources")
+PAGE_MAX_LIMIT = 500
+# ?sources=ref : chaque source est envoyée une fois et citée par identifiant.
+SOURCE_MODES = ("inline", "ref")
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+# Taille minimale de la surcouche de _SearchIndex avant repli dans la base.
+SEARCH_OVERLAY_MIN = 1024
+# Doublons : similarité de Jaccard minimale entre 3-grammes de caractères
+# des clés normalisées, nombre de candidats renvoyés et politiques de POST.
+DEDUPE_THRESHOLD = 0.7
+DEDUPE_NGRAM = 3
+DEDUPE_MAX_CANDIDATES = 5
+DUPLICATE_MODES = ("reject", "allow", "merge")
+# Salons multijoueurs, gardés en mémoire : plafonds de salons, de joueurs et
+# de corps de requête, et inactivité au-delà de laquelle un salon est évincé.
+ROOM_MAX_ROOMS = 1000
+ROOM_MAX_PLAYERS = 50
+ROOM_IDLE_SECONDS = 2 * 3600
+ROOM_MAX_BODY_BYTES = 4 * 1024
+ROOM_NAME_MAX_LENGTH = 40
+# Cases cochées (POST /api/events) : compteurs en mémoire répartis sur
+# EVENTS_SHARDS verrous, versés sur disque toutes les EVENTS_FLUSH_SECONDS
+# dans des segments journaliers, puis agrégés par tranches de
+# EVENTS_BUCKET_SECONDS sur EVENTS_RETENTION_SECONDS pour /api/stats/top.
+EVENTS_DIR = BASE_DIR / "events"
+EVENTS_SHARDS = 16
+EVENTS_FLUSH_SECONDS = 5.0
+EVENTS_BUCKET_SECONDS = 300
+EVENTS_RETENTION_SECONDS = 7 * 86400
+EVENTS_WINDOWS = {"1h": 3600, "24h": 86400, "7d": 7 * 86400}
+EVENTS_MAX_BATCH = 100
+EVENTS_MAX_BODY_BYTES = 16 * 1024
+EVENTS_TOP_DEFAULT = 10
+EVENTS_TOP_MAX = 100
+# Seau à jetons propre à POST /api/events, par IP : plus large que celui des
+# écritures du magasin, chaque requête portant au plus EVENTS_MAX_BATCH coups.
+EVENTS_RATE_PER_SECOND = 5.0
+EVENTS_BURST = 30
+BOARD_SIZES = (3, 4, 5)
+BOARD_DEFAULT_SIZE = 5
+SERVER_MODES = ("threaded", "async")
+# Fichiers du site servis depuis la mémoire, précompressés.
+STATIC_CACHE_SUFFIXES = (".html", ".json", ".css", ".js", ".svg", ".txt")
+STATIC_CACHE_MAX_BYTES = 1024 * 1024
+STATIC_CACHE_MAX_ENTRIES = 128
+STATIC_RECHECK_SECONDS = 1.0
+STATIC_MAX_AGE = 3600
+# Mode asyncio : connexions simultanées, threads de traitement et limites.
+ASYNC_MAX_CONNECTIONS = 1024
+ASYNC_WORKER_THREADS = min(32, (os.cpu_count() or 1) * 4)
+ASYNC_KEEPALIVE_TIMEOUT = 15.0
+ASYNC_HEADER_LIMIT = 64 * 1024
+ASYNC_MAX_BODY_BYTES = 4 * 1024 * 1024
+ASYNC_BACKLOG = 512
+# Arrêt en douceur et rechargement à chaud (SIGHUP) : délai accordé aux
+# requêtes en cours, attente maximale du successeur, et variables
+# d'environnement par lesquelles il reçoit les sockets d'écoute et le
+# descripteur où signaler qu'il est prêt.
+DRAIN_SECONDS = 30.0
+RELOAD_READY_SECONDS = 120.0
+RELOAD_LISTEN_FDS_ENV = "BINGO_LISTEN_FDS"
+RELOAD_READY_FD_ENV = "BINGO_READY_FD"
+RESPONSE_CACHE_SIZE = 256
+# Compression des réponses dynamiques : au-delà de 6, zlib coûte plusieurs
+# fois plus cher pour quelques pour cent gagnés. Les requêtes ponctuelles
+# (curseur, recherche libre, graine), ni partagées ni mises en cache, sont
+# compressées au niveau le plus rapide. Les fichiers statiques gardent 9.
+RESPONSE_COMPRESS_LEVEL = 6
+ONE_OFF_COMPRESS_LEVEL = 1
+# Au-delà de cette taille, une liste d'entrées complètes n'est pas gardée en
+# clair dans le cache : elle est envoyée par lots depuis les fragments JSON.
+STREAM_MIN_BYTES = 64 * 1024
+STREAM_CHUNK_BYTES = 64 * 1024
+# Admission des écritures : taille des corps, seau à jetons par IP cliente
+# (rythme par seconde et rafale) et plafond global des écritures en cours.
+# Un rythme ou un plafond à 0 désactive la limite correspondante.
+POST_MAX_BODY_BYTES = 64 * 1024
+BULK_MAX_BODY_BYTES = 4 * 1024 * 1024
+POST_RATE_PER_SECOND = 1.0
+POST_BURST = 10
+MAX_INFLIGHT_WRITES = 16
+RATE_LIMIT_TABLE_SIZE = 10_000
+# Journal des changements en mémoire (lots d'écritures) servi par `?since=`
+# et par le flux SSE ; au-delà, le client recharge la liste complète.
+CHANGE_LOG_SIZE = 1024
+# Flux SSE : relecture du magasin (écritures des autres workers), commentaire
+# de maintien, délai de reconnexion proposé, plafonds d'abonnés et de retard.
+SSE_POLL_SECONDS = 1.0
+SSE_HEARTBEAT_SECONDS = 15.0
+SSE_RETRY_MS = 5000
+SSE_MAX_SUBSCRIBERS = 10_000
+SSE_MAX_BUFFER_BYTES = 1024 * 1024
+WRITE_ROUTES = ("/api/argumentaires", "/api/argumentaires/bulk")
 JSON_DB_PATH = BASE_DIR / "argumentaires.json"
-DB_LOCK = Lock()
+JOURNAL_PATH = BASE_DIR / "argumentaires.journal"
+JOURNAL_COMPACTING_PATH = BASE_DIR / "argumentaires.journal.compacting"
+STORE_LOCK_PATH = BASE_DIR / "argumentaires.lock"
+# Empreintes des entrées de init_db() au dernier démarrage (chemin rapide).
+STARTUP_STATE_PATH = BASE_DIR / "argumentaires.state.json"
+# Sortie de `server.py build` : instantané statique de l'API pour Pages/CDN.
+BUILD_DIR = BASE_DIR / "static-api"
+BUILD_HASH_LENGTH = 16
+# Au-delà de cette taille, le journal est replié dans argumentaires.json.
+JOURNAL_COMPACT_BYTES = 256 * 1024
+# Bornes (en secondes) des histogrammes de latence exposés par /api/metrics.
+METRICS_LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Routes exposées telles quelles en étiquette ; les autres sont regroupées.
+METRICS_ROUTES = (
+    "/api/argumentaires",
+    "/api/argumentaires/bulk",
+    "/api/changes/stream",
+    "/api/search",
+    "/api/duplicates",
+    "/api/board",
+    "/api/events",
+    "/api/stats/top",
+    "/api/metrics",
+)
+METRICS_METHODS = ("GET", "HEAD", "POST", "OPTIONS")
+
+_MetricKey = tuple[str, tuple[tuple[str, str], ...]]
+
+# Nom -> (type, aide) des métriques exposées.
+_METRIC_HELP = {
+    "bingo_http_requests_total": ("counter", "Requêtes HTTP traitées."),
+    "bingo_http_request_duration_seconds": ("histogram", "Durée de traitement des requêtes HTTP."),
+    "bingo_lock_wait_seconds": ("histogram", "Attente avant obtention d'un verrou."),
+    "bingo_lock_hold_seconds": ("histogram", "Durée de détention d'un verrou."),
+    "bingo_json_parse_seconds": ("histogram", "Durée de décodage JSON."),
+    "bingo_json_serialize_seconds": ("histogram", "Durée d'encodage JSON."),
+    "bingo_store_bytes_written_total": ("counter", "Octets écrits dans les fichiers du magasin."),
+    "bingo_phrase_events_total": ("counter", "Cases cochées reçues par /api/events."),
+}
+
+
+class _MetricsShard:
+    """Compteurs d'un thread : lui seul y écrit, la collecte ne fait que lire."""
+
+    __slots__ = ("thread", "counters", "histograms")
+
+    def __init__(self, thread: Thread | None) -> None:
+        self.thread = thread
+        self.counters: dict[_MetricKey, float] = {}
+        # Par clé : effectifs de chaque borne, puis +Inf, puis la somme.
+        self.histograms: dict[_MetricKey, list[float]] = {}
+
+    def merge(self, other: _MetricsShard) -> None:
+        for key, value in list(other.counters.items()):
+            self.counters[key] = self.counters.get(key, 0) + value
+        for key, data in list(other.histograms.items()):
+            target = self.histograms.get(key)
+            if target is None:
+                self.histograms[key] = list(data)
+            else:
+                for index, value in enumerate(data):
+                    target[index] += value
+
+
+class _Metrics:
+    """Métriques du processus, sans verrou sur le chemin chaud.
+
+    Chaque thread écrit dans son propre fragment ; `render()` les fusionne
+    au moment de la collecte. Les fragments des threads terminés sont
+    repliés dans un cumul pour que leur nombre reste borné.
+    """
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self._local = local()
+        self._lock = Lock()
+        self._shards: list[_MetricsShard] = []
+        self._retired = _MetricsShard(None)
+        self._prune_at = 64
+
+    def _shard(self) -> _MetricsShard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _MetricsShard(current_thread())
+            with self._lock:
+                if len(self._shards) >= self._prune_at:
+                    self._retire_dead()
+                    self._prune_at = max(64, 2 * len(self._shards))
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def _retire_dead(self) -> None:
+        alive = []
+        for shard in self._shards:
+            if shard.thread.is_alive():
+                alive.append(shard)
+            else:
+                self._retired.merge(shard)
+        self._shards = alive
+
+    def inc(self, name: str, labels: tuple[tuple[str, str], ...] = (), value: float = 1) -> None:
+        counters = self._shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, labels: tuple[tuple[str, str], ...] = ()) -> None:
+        histograms = self._shard().histograms
+        key = (name, labels)
+        data = histograms.get(key)
+        if data is None:
+            data = histograms[key] = [0] * (len(self.buckets) + 2)
+        data[bisect.bisect_left(self.buckets, seconds)] += 1
+        data[-1] += seconds
+
+    def snapshot(self) -> _MetricsShard:
+        with self._lock:
+            self._retire_dead()
+            merged = _MetricsShard(None)
+            merged.merge(self._retired)
+            for shard in self._shards:
+                merged.merge(shard)
+        return merged
+
+    def render(self, gauges: Iterable[tuple[str, str, float]] = ()) -> str:
+        """Exposition au format texte Prometheus, jauges fournies en sus."""
+        merged = self.snapshot()
+        families: dict[str, list[str]] = {}
+        for (name, labels), value in sorted(merged.counters.items()):
+            families.setdefault(name, []).append(f"{name}{_format_labels(labels)} {_format_number(value)}")
+        for (name, labels), data in sorted(merged.histograms.items()):
+            lines = families.setdefault(name, [])
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), data):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else _format_number(bound)
+                lines.append(f"{name}_bucket{_format_labels((*labels, ('le', le)))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_number(data[-1])}")
+            lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+        output = []
+        for name, lines in families.items():
+            kind, help_text = _METRIC_HELP.get(name, ("untyped", name))
+            output.append(f"# HELP {name} {help_text}")
+            output.append(f"# TYPE {name} {kind}")
+            output.extend(lines)
+        for name, help_text, value in gauges:
+            output.append(f"# HELP {name} {help_text}")
+            output.append(f"# TYPE {name} gauge")
+            output.append(f"{name} {_format_number(value)}")
+        return "\n".join(output) + "\n"
+
+
+_LABEL_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n"})
+
+
+def _format_labels(labels: tuple[tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        f'{name}="{value.translate(_LABEL_ESCAPES)}"'
+        for name, value in labels
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_number(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+_METRICS = _Metrics(METRICS_LATENCY_BUCKETS)
+# Étiquettes fixes, construites une fois pour ne rien allouer par mesure.
+_SITE_STORE = (("site", "store"),)
+_SITE_SEND_JSON = (("site", "send_json"),)
+_SITE_RESPONSE_CACHE = (("site", "response_cache"),)
+_FILE_SNAPSHOT = (("file", "snapshot"),)
+_FILE_JOURNAL = (("file", "journal"),)
+_FILE_EVENTS = (("file", "events"),)
+
+
+class _TimedLock:
+    """Verrou dont l'attente et la durée de détention alimentent les métriques."""
+
+    def __init__(self, name: str) -> None:
+        self._lock = Lock()
+        self._labels = (("lock", name),)
+        self._acquired_at = 0.0
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        started = time.perf_counter()
+        acquired = self._lock.acquire(blocking, timeout)
+        if acquired:
+            # Un seul détenteur à la fois : l'attribut ne peut pas être écrasé.
+            self._acquired_at = now = time.perf_counter()
+            _METRICS.observe("bingo_lock_wait_seconds", now - started, self._labels)
+        return acquired
+
+    def release(self) -> None:
+        held = time.perf_counter() - self._acquired_at
+        self._lock.release()
+        _METRICS.observe("bingo_lock_hold_seconds", held, self._labels)
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    def __enter__(self) -> bool:
+        return self.acquire()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.release()
+
+
+DB_LOCK = _TimedLock("db")
+
+# Magasin résident : chargé par init_db(), puis republié à chaque écriture
+# sous forme d'instantané immuable (voir _StoreSnapshot).
+_SNAPSHOT: _StoreSnapshot
+# _STORE_STAT mémorise (mtime_ns, taille) du fichier JSON au dernier
+# chargement/écriture afin de détecter les éditions externes.
+_STORE_STAT: tuple[int, int] | None = (-1, -1)
+_JOURNAL: _Journal | None = None
+# (st_dev, st_ino, octets déjà rejoués) du journal, pour ne relire que sa fin.
+_JOURNAL_STATE: tuple[int, int, int] | None = None
+_LOCK_HANDLE: BinaryIO | None = None
+_STORE_ENGINE = "json"
+_SQLITE: _SqliteStore | None = None
+_COMPACTION_LOCK = Lock()
+
+
+class _EncodedResponse(NamedTuple):
+    etag: str
+    # None pour les grandes listes : le corps est alors réécrit à la volée
+    # depuis `fragments`, partagés avec l'instantané du magasin.
+    identity: bytes | None
+    gzip: bytes | None
+    deflate: bytes | None
+    headers: tuple[tuple[str, str], ...] = ()
+    fragments: tuple[bytes, ...] = ()
+    length: int = 0
+
+
+class _Fragments:
+    """Liste JSON déjà encodée : un fragment d'octets par entrée.
+
+    Pas un tuple : _cached_response() réserve les tuples à (données, en-têtes).
+    """
+
+    __slots__ = ("parts",)
+
+    def __init__(self, parts: tuple[bytes, ...]) -> None:
+        self.parts = parts
+
+
+# Réponses JSON pré-encodées, indexées par clé de route : (version, réponse).
+# Les plus anciennes sont évincées au-delà de RESPONSE_CACHE_SIZE.
+_RESPONSE_CACHE: OrderedDict[str, tuple[int, _EncodedResponse]] = OrderedDict()
+_CACHE_LOCK = Lock()
+_CACHE_BUILD_LOCK = Lock()
 
 INITIAL_ARGUMENTAIRES = [
     {
@@ -394,20 +795,110 @@ INITIAL_ARGUMENTAIRES = [
 ]
 
 
-def _sanitize_source(entry: dict[str, str]) -> dict[str, str] | None:
-    titre = (entry.get("titre") or "").strip()
-    auteur = (entry.get("auteur") or "").strip()
-    url = (entry.get("url") or "").strip()
+def _fold(text: str) -> str:
+    """Minuscules sans accents, pour les comparaisons tolérantes."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+
+
+def _phrase_key(phrase: str) -> str:
+    """Clé de recherche d'une phrase : casse, accents et espaces normalisés."""
+    return " ".join(_fold(phrase).split())
+
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]|_")
+
+
+def _dedupe_key(phrase: str) -> str:
+    """Clé de doublon : comme _phrase_key(), ponctuation ignorée en plus."""
+    return " ".join(_PUNCTUATION_RE.sub(" ", _fold(phrase)).split())
+
+
+def _fold_item(item: dict[str, object]) -> str:
+    return _fold(f"{item['phrase']}\n{item['argumentaire']}")
+
+
+class _Source(dict):
+    """Source partagée par tous les argumentaires qui la citent, en lecture seule.
+
+    Reste un dictionnaire pour être sérialisée telle quelle (json.dumps
+    encoderait un NamedTuple en liste et refuse un MappingProxyType), mais
+    toute modification lève TypeError : une même instance sert à chaque
+    entrée qui la cite, et au registre. L'identifiant, dérivé du contenu, est
+    stable d'un démarrage et d'un worker à l'autre ; __slots__ évite un
+    __dict__ par instance pour le porter.
+    """
+
+    __slots__ = ("id", "__weakref__")
+
+    def __init__(self, titre: str, auteur: str, url: str) -> None:
+        fields = {"titre": titre, "auteur": auteur, "url": url}
+        super().__init__((name, value) for name, value in fields.items() if value)
+        digest = hashlib.sha1(f"{titre}\0{auteur}\0{url}".encode("utf-8")).hexdigest()
+        object.__setattr__(self, "id", f"s{digest[:12]}")
+
+    def _read_only(self, *args: object, **kwargs: object) -> None:
+        raise TypeError("Source partagée en lecture seule : copiez-la avec dict(source)")
+
+    __setitem__ = __delitem__ = __setattr__ = __delattr__ = _read_only
+    clear = pop = popitem = setdefault = update = __ior__ = _read_only
+
+    def __reduce__(self) -> tuple[object, tuple[str, str, str]]:
+        # copy/pickle : même contenu, même identifiant.
+        return (_Source, (self.get("titre", ""), self.get("auteur", ""), self.get("url", "")))
+
+
+class _SourceRegistry:
+    """Registre des sources : même (titre, auteur, url) nettoyés, même instance.
+
+    Les références sont faibles : une source que plus aucune entrée ne cite
+    disparaît d'elle-même, si bien que le registre reste à la taille du corpus.
+    """
+
+    def __init__(self) -> None:
+        self._by_key: WeakValueDictionary[tuple[str, str, str], _Source] = WeakValueDictionary()
+        self._lock = Lock()
+
+    def intern(self, titre: str, auteur: str, url: str) -> _Source:
+        key = (titre, auteur, url)
+        source = self._by_key.get(key)
+        if source is None:
+            with self._lock:
+                source = self._by_key.get(key)
+                if source is None:
+                    source = self._by_key[key] = _Source(titre, auteur, url)
+        return source
+
+    def lookup(self, data: dict[str, str]) -> _Source:
+        """Source enregistrée correspondant à un dictionnaire déjà nettoyé."""
+        if isinstance(data, _Source):
+            return data
+        return self.intern(data.get("titre", ""), data.get("auteur", ""), data.get("url", ""))
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+
+_SOURCES = _SourceRegistry()
+
+
+def _sanitize_source(entry: dict[str, object]) -> _Source | None:
+    """Source nettoyée, None si elle n'a ni titre ni url.
+
+    Lève ValueError si un champ n'est pas du texte (ou null).
+    """
+    values = []
+    for field in ("titre", "auteur", "url"):
+        value = entry.get(field)
+        if value is None:
+            value = ""
+        elif not isinstance(value, str):
+            raise ValueError(f"Source : '{field}' doit être du texte")
+        values.append(value.strip())
+    titre, auteur, url = values
     if not titre and not url:
         return None
-    result: dict[str, str] = {}
-    if titre:
-        result["titre"] = titre
-    if auteur:
-        result["auteur"] = auteur
-    if url:
-        result["url"] = url
-    return result
+    return _SOURCES.intern(titre, auteur, url)
 
 
 def _sanitize_item(item: dict[str, object]) -> dict[str, object] | None:
@@ -422,7 +913,10 @@ def _sanitize_item(item: dict[str, object]) -> dict[str, object] | None:
         for entry in sources_raw:
             if not isinstance(entry, dict):
                 continue
-            cleaned = _sanitize_source(entry)
+            try:
+                cleaned = _sanitize_source(entry)
+            except ValueError:
+                return None
             if cleaned:
                 sources.append(cleaned)
 
@@ -433,6 +927,20 @@ def _sanitize_item(item: dict[str, object]) -> dict[str, object] | None:
     }
 
 
+def _item_error(entry: object) -> str:
+    """Motif du rejet d'une entrée par _sanitize_item(), pour les rapports d'import."""
+    if not isinstance(entry, dict):
+        return "L'entrée doit être un objet JSON"
+    sources = entry.get("sources")
+    for source in sources if isinstance(sources, list) else ():
+        if isinstance(source, dict):
+            try:
+                _sanitize_source(source)
+            except ValueError as exc:
+                return str(exc)
+    return "'phrase' et 'argumentaire' sont requis"
+
+
 def _load_legacy_sqlite() -> list[dict[str, object]]:
     if not LEGACY_DB_PATH.exists():
         return []
@@ -477,8 +985,10 @@ def _read_json_store() -> list[dict[str, object]]:
     if not JSON_DB_PATH.exists():
         return []
     try:
+        started = time.perf_counter()
         with JSON_DB_PATH.open("r", encoding="utf-8") as handle:
             data = json.load(handle)
+        _METRICS.observe("bingo_json_parse_seconds", time.perf_counter() - started, _SITE_STORE)
     except (OSError, json.JSONDecodeError):
         return []
 
@@ -494,184 +1004,4253 @@ def _read_json_store() -> list[dict[str, object]]:
     return sanitized
 
 
-def _write_json_store(items: list[dict[str, object]]) -> None:
-    tmp_path = JSON_DB_PATH.with_name(f"{JSON_DB_PATH.name}.tmp")
+def _write_json_tmp(items: list[dict[str, object]], suffix: str = "tmp") -> Path:
+    tmp_path = JSON_DB_PATH.with_name(f"{JSON_DB_PATH.name}.{suffix}")
     payload = sorted(items, key=lambda it: it["phrase"].lower())
     with tmp_path.open("w", encoding="utf-8") as handle:
         json.dump(payload, handle, ensure_ascii=False, indent=2)
         handle.write("\n")
-    tmp_path.replace(JSON_DB_PATH)
+        handle.flush()
+        os.fsync(handle.fileno())
+        _METRICS.inc("bingo_store_bytes_written_total", _FILE_SNAPSHOT, handle.tell())
+    return tmp_path
+
+
+def _write_json_store(items: list[dict[str, object]]) -> None:
+    _write_json_tmp(items).replace(JSON_DB_PATH)
+
+
+def _json_store_stat() -> tuple[int, int] | None:
+    try:
+        stat = JSON_DB_PATH.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class _Journal:
+    """Journal append-only des upserts : une ligne JSON par argumentaire.
+
+    `append()` écrit sous DB_LOCK ; `commit()` se fait hors du verrou et
+    regroupe les écritures concurrentes derrière un seul fsync.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._handle = path.open("a+b")
+        self._written = 0
+        self._durable = 0
+        self._sync_lock = Lock()
+
+    def _reopen_if_rotated(self) -> None:
+        # Un autre processus a pu compacter le journal : on suit le nouveau fichier.
+        try:
+            current = os.stat(self.path)
+        except FileNotFoundError:
+            current = None
+        opened = os.fstat(self._handle.fileno())
+        if current is None or (current.st_dev, current.st_ino) != (opened.st_dev, opened.st_ino):
+            with self._sync_lock:
+                self._handle.flush()
+                os.fsync(self._handle.fileno())
+                self._durable = self._written
+                self._handle.close()
+                self._handle = self.path.open("a+b")
+
+    def append(self, items: list[dict[str, object]]) -> int:
+        """Ajoute les entrées en fin de journal (DB_LOCK et verrou fichier détenus)."""
+        self._reopen_if_rotated()
+        lines = [
+            json.dumps(item, ensure_ascii=False).encode("utf-8") + b"\n"
+            for item in items
+        ]
+        data = b"".join(lines)
+        # Sous le verrou fichier, une fin sans saut de ligne ne peut venir que
+        # d'un arrêt brutal : on la clôt, sans quoi notre première ligne s'y
+        # collerait et serait ignorée au rejeu avec elle.
+        size = os.fstat(self._handle.fileno()).st_size
+        if size and os.pread(self._handle.fileno(), 1, size - 1) != b"\n":
+            data = b"\n" + data
+        self._handle.write(data)
+        self._handle.flush()
+        _METRICS.inc("bingo_store_bytes_written_total", _FILE_JOURNAL, len(data))
+        self._written += 1
+        return self._written
+
+    def commit(self, seq: int) -> None:
+        with self._sync_lock:
+            if self._durable >= seq:
+                return
+            target = self._written
+            os.fsync(self._handle.fileno())
+            self._durable = target
+
+    def size(self) -> int:
+        return os.fstat(self._handle.fileno()).st_size
+
+    def state(self) -> tuple[int, int, int]:
+        stat = os.fstat(self._handle.fileno())
+        return (stat.st_dev, stat.st_ino, stat.st_size)
+
+    def rotate(self, target: Path) -> None:
+        """Renomme le journal courant en `target` et en ouvre un vide."""
+        with self._sync_lock:
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+            self._durable = self._written
+            self._handle.close()
+            self.path.replace(target)
+            self._handle = self.path.open("a+b")
+
+    def reset(self) -> None:
+        with self._sync_lock:
+            self._handle.truncate(0)
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+            self._durable = self._written
+
+    def close(self) -> None:
+        with self._sync_lock:
+            self._handle.close()
+
+
+def _read_journal_tail(
+    path: Path,
+    offset: int = 0,
+) -> tuple[list[dict[str, object]], int]:
+    """Lit les lignes complètes du journal à partir de `offset`.
+
+    Renvoie les entrées et la position juste après la dernière ligne complète :
+    une ligne en cours d'écriture par un autre processus sera relue plus tard.
+    """
+    entries: list[dict[str, object]] = []
+    try:
+        handle = path.open("rb")
+    except FileNotFoundError:
+        return entries, 0
+    with handle:
+        handle.seek(offset)
+        for line in handle:
+            if not line.endswith(b"\n"):
+                break
+            offset += len(line)
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(entry, dict):
+                cleaned = _sanitize_item(entry)
+                if cleaned:
+                    entries.append(cleaned)
+    return entries, offset
+
+
+def _read_journal(path: Path) -> list[dict[str, object]]:
+    return _read_journal_tail(path)[0]
+
+
+def _journal_state() -> tuple[int, int, int] | None:
+    try:
+        stat = JOURNAL_PATH.stat()
+    except OSError:
+        return None
+    return (stat.st_dev, stat.st_ino, stat.st_size)
+
+
+@contextmanager
+def _store_file_lock() -> Iterator[None]:
+    """Verrou inter-processus (flock) des écritures du magasin JSON.
+
+    Se prend après DB_LOCK ; sans fcntl (Windows), seul DB_LOCK protège.
+    """
+    global _LOCK_HANDLE
+    if fcntl is None:
+        yield
+        return
+    if _LOCK_HANDLE is None:
+        _LOCK_HANDLE = STORE_LOCK_PATH.open("a+b")
+    fcntl.flock(_LOCK_HANDLE.fileno(), fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(_LOCK_HANDLE.fileno(), fcntl.LOCK_UN)
+
+
+def _journal() -> _Journal:
+    global _JOURNAL
+    if _JOURNAL is None:
+        _JOURNAL = _Journal(JOURNAL_PATH)
+    return _JOURNAL
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('generation', 0);
+
+CREATE TABLE IF NOT EXISTS argumentaires (
+    id INTEGER PRIMARY KEY,
+    phrase TEXT NOT NULL,
+    argumentaire TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS argumentaires_phrase ON argumentaires (phrase);
+
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    titre TEXT NOT NULL DEFAULT '',
+    auteur TEXT NOT NULL DEFAULT '',
+    url TEXT NOT NULL DEFAULT '',
+    UNIQUE (titre, auteur, url)
+);
+
+CREATE TABLE IF NOT EXISTS argumentaire_sources (
+    argumentaire_id INTEGER NOT NULL REFERENCES argumentaires (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    source_id INTEGER NOT NULL REFERENCES sources (id),
+    PRIMARY KEY (argumentaire_id, position)
+) WITHOUT ROWID;
+
+-- Phrases touchées par chaque génération : un autre processus ne relit
+-- qu'elles. Une génération absente de la table impose un rechargement complet.
+CREATE TABLE IF NOT EXISTS changes (
+    generation INTEGER NOT NULL,
+    phrase TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS changes_generation ON changes (generation);
+
+-- Toute modification, y compris faite hors du serveur (sqlite3, CI), incrémente
+-- la génération : c'est elle que les lecteurs comparent pour se resynchroniser.
+-- Les déclencheurs sont recréés à chaque démarrage, ceux d'une base plus
+-- ancienne ne journalisant pas les phrases.
+BEGIN IMMEDIATE;
+DROP TRIGGER IF EXISTS argumentaires_insert;
+DROP TRIGGER IF EXISTS argumentaires_update;
+DROP TRIGGER IF EXISTS argumentaires_delete;
+DROP TRIGGER IF EXISTS argumentaire_sources_insert;
+CREATE TRIGGER argumentaires_insert AFTER INSERT ON argumentaires
+BEGIN
+    UPDATE meta SET value = value + 1 WHERE key = 'generation';
+    INSERT INTO changes SELECT value, new.phrase FROM meta WHERE key = 'generation';
+END;
+CREATE TRIGGER argumentaires_update AFTER UPDATE ON argumentaires
+BEGIN
+    UPDATE meta SET value = value + 1 WHERE key = 'generation';
+    INSERT INTO changes SELECT value, old.phrase FROM meta WHERE key = 'generation';
+    INSERT INTO changes SELECT value, new.phrase FROM meta WHERE key = 'generation';
+END;
+CREATE TRIGGER argumentaires_delete AFTER DELETE ON argumentaires
+BEGIN
+    DELETE FROM argumentaire_sources WHERE argumentaire_id = old.id;
+    UPDATE meta SET value = value + 1 WHERE key = 'generation';
+    INSERT INTO changes SELECT value, old.phrase FROM meta WHERE key = 'generation';
+END;
+CREATE TRIGGER argumentaire_sources_insert AFTER INSERT ON argumentaire_sources
+BEGIN
+    UPDATE meta SET value = value + 1 WHERE key = 'generation';
+    INSERT INTO changes
+    SELECT meta.value, argumentaires.phrase FROM meta, argumentaires
+    WHERE meta.key = 'generation' AND argumentaires.id = new.argumentaire_id;
+END;
+COMMIT;
+"""
+
+
+# Entrées et sources dans l'ordre ; `where` restreint éventuellement les phrases.
+_SQLITE_SELECT_ITEMS = """
+SELECT a.phrase, a.argumentaire, s.titre, s.auteur, s.url
+FROM argumentaires AS a
+LEFT JOIN argumentaire_sources AS l ON l.argumentaire_id = a.id
+LEFT JOIN sources AS s ON s.id = l.source_id
+{where}
+ORDER BY a.id, l.position
+"""
+
+
+class _SqliteStore:
+    """Moteur SQLite en mode WAL, tables normalisées argumentaires/sources.
+
+    Les connexions sont prêtées par un pool : chaque thread actif travaille sur
+    sa propre connexion. En WAL, une requête SQL de lecture n'attend pas une
+    écriture SQLite en cours ; les GET, eux, lisent l'instantané mémoire et
+    n'attendent une écriture que lorsqu'un rechargement (sous DB_LOCK) est
+    nécessaire.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.generation = -1
+        # Instant (monotonic) de la dernière génération lue par is_stale(),
+        # et l'état des fichiers (stat) à cet instant.
+        self._checked = 0.0
+        self._hint: tuple[tuple[int, int] | None, ...] = ()
+        self._pool: list[sqlite3.Connection] = []
+        self._pool_lock = Lock()
+        with self.connection() as conn:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(argumentaires)")}
+            if "sources" in columns:
+                # Ancien schéma (sources en JSON) : _load_legacy_sqlite() l'a déjà lu.
+                conn.execute("ALTER TABLE argumentaires RENAME TO argumentaires_legacy")
+            conn.executescript(_SQLITE_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=5.0,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        with self._pool_lock:
+            conn = self._pool.pop() if self._pool else None
+        if conn is None:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            with self._pool_lock:
+                if len(self._pool) < SQLITE_POOL_SIZE:
+                    self._pool.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+
+    @staticmethod
+    def _read_generation(conn: sqlite3.Connection) -> int:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+        return row[0] if row else 0
+
+    def _file_hint(self) -> tuple[tuple[int, int] | None, ...]:
+        """(mtime, taille) de la base et de son -wal : tout commit WAL touche le -wal."""
+        hint: list[tuple[int, int] | None] = []
+        for path in (self.path, self.path.with_name(self.path.name + "-wal")):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                hint.append(None)
+            else:
+                hint.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(hint)
+
+    def is_stale(self, max_age: float = 0.0) -> bool:
+        """Vrai si la base a changé depuis le dernier chargement.
+
+        Avec `max_age`, la base n'est interrogée que si ses fichiers ont bougé
+        depuis la dernière vérification, ou si elle date de plus de `max_age` :
+        l'écriture d'un autre processus est vue dès la requête suivante, pour
+        le prix d'un stat() quand rien n'a changé.
+        """
+        if self.generation < 0:
+            return True
+        hint = self._file_hint()
+        now = time.monotonic()
+        if max_age and hint == self._hint and now - self._checked < max_age:
+            return False
+        with self.connection() as conn:
+            stale = self._read_generation(conn) != self.generation
+        if not stale:
+            self._hint, self._checked = hint, now
+        return stale
+
+    def load(self) -> dict[str, dict[str, object]]:
+        with self.connection() as conn:
+            conn.execute("BEGIN")
+            try:
+                generation = self._read_generation(conn)
+                rows = conn.execute(_SQLITE_SELECT_ITEMS.format(where="")).fetchall()
+            finally:
+                conn.execute("COMMIT")
+        self.generation = generation
+        return self._items_from_rows(rows)
+
+    def changed_items(self) -> list[dict[str, object]] | None:
+        """Entrées modifiées depuis le dernier chargement, d'après la table changes.
+
+        None si un rechargement complet s'impose : génération non journalisée
+        (élaguée ou écrite par un ancien déclencheur) ou phrase supprimée.
+        """
+        if self.generation < 0:
+            return None
+        with self.connection() as conn:
+            conn.execute("BEGIN")
+            try:
+                generation = self._read_generation(conn)
+                (logged,) = conn.execute(
+                    "SELECT COUNT(DISTINCT generation) FROM changes WHERE generation > ?",
+                    (self.generation,),
+                ).fetchone()
+                if logged != generation - self.generation:
+                    return None
+                phrases = {
+                    phrase
+                    for (phrase,) in conn.execute(
+                        "SELECT phrase FROM changes WHERE generation > ?", (self.generation,)
+                    )
+                }
+                rows = conn.execute(
+                    _SQLITE_SELECT_ITEMS.format(
+                        where="WHERE a.phrase IN (SELECT phrase FROM changes WHERE generation > ?)"
+                    ),
+                    (self.generation,),
+                ).fetchall()
+            finally:
+                conn.execute("COMMIT")
+        items = self._items_from_rows(rows)
+        if items.keys() != phrases:
+            return None
+        self.generation = generation
+        return list(items.values())
+
+    @staticmethod
+    def _items_from_rows(rows: list[tuple]) -> dict[str, dict[str, object]]:
+        raw: dict[str, dict[str, object]] = {}
+        for phrase, argumentaire, titre, auteur, url in rows:
+            entry = raw.setdefault(
+                phrase,
+                {"phrase": phrase, "argumentaire": argumentaire, "sources": []},
+            )
+            if titre is not None:
+                entry["sources"].append({"titre": titre, "auteur": auteur, "url": url})
+
+        items: dict[str, dict[str, object]] = {}
+        for entry in raw.values():
+            cleaned = _sanitize_item(entry)
+            if cleaned:
+                items[cleaned["phrase"]] = cleaned
+        return items
+
+    def write(self, items: list[dict[str, object]]) -> None:
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                before = self._read_generation(conn)
+                for item in items:
+                    self._upsert(conn, item)
+                after = self._read_generation(conn)
+                conn.execute(
+                    "DELETE FROM changes WHERE generation <= ?",
+                    (after - SQLITE_CHANGES_KEPT,),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        # Si la base a bougé entre-temps (autre processus, CI…), la génération
+        # connue reste en arrière : la prochaine lecture rattrape ces écritures,
+        # et les nôtres, via la table changes.
+        if before == self.generation:
+            self.generation = after
+
+    @staticmethod
+    def _upsert(conn: sqlite3.Connection, item: dict[str, object]) -> None:
+        conn.execute(
+            """
+            INSERT INTO argumentaires (phrase, argumentaire) VALUES (?, ?)
+            ON CONFLICT (phrase) DO UPDATE SET argumentaire = excluded.argumentaire
+            """,
+            (item["phrase"], item["argumentaire"]),
+        )
+        (argumentaire_id,) = conn.execute(
+            "SELECT id FROM argumentaires WHERE phrase = ?", (item["phrase"],)
+        ).fetchone()
+        conn.execute(
+            "DELETE FROM argumentaire_sources WHERE argumentaire_id = ?",
+            (argumentaire_id,),
+        )
+        for position, source in enumerate(item["sources"]):
+            key = (source.get("titre", ""), source.get("auteur", ""), source.get("url", ""))
+            conn.execute(
+                "INSERT OR IGNORE INTO sources (titre, auteur, url) VALUES (?, ?, ?)",
+                key,
+            )
+            (source_id,) = conn.execute(
+                "SELECT id FROM sources WHERE titre = ? AND auteur = ? AND url = ?",
+                key,
+            ).fetchone()
+            conn.execute(
+                """
+                INSERT INTO argumentaire_sources (argumentaire_id, position, source_id)
+                VALUES (?, ?, ?)
+                """,
+                (argumentaire_id, position, source_id),
+            )
+
+    def close(self) -> None:
+        with self._pool_lock:
+            pool, self._pool = self._pool, []
+        for conn in pool:
+            conn.close()
 
 
 def _load_store_map() -> dict[str, dict[str, object]]:
+    """Relit instantané + journaux et mémorise jusqu'où le journal a été lu."""
+    global _JOURNAL_STATE
     existing = {item["phrase"]: item for item in _read_json_store()}
     if not existing:
         for item in INITIAL_ARGUMENTAIRES:
             cleaned = _sanitize_item(item)
             if cleaned:
                 existing.setdefault(cleaned["phrase"], cleaned)
+    for item in _read_journal(JOURNAL_COMPACTING_PATH):
+        existing[item["phrase"]] = item
+    state = _journal_state()
+    entries, offset = _read_journal_tail(JOURNAL_PATH)
+    for item in entries:
+        existing[item["phrase"]] = item
+    _JOURNAL_STATE = (state[0], state[1], offset) if state is not None else None
     return existing
 
 
-def init_db() -> None:
-    with DB_LOCK:
-        merged: dict[str, dict[str, object]] = {}
-        for source in (INITIAL_ARGUMENTAIRES, _read_json_store(), _load_legacy_sqlite()):
-            for entry in source:
-                if not isinstance(entry, dict):
-                    continue
-                cleaned = _sanitize_item(entry)
-                if cleaned:
-                    merged[cleaned["phrase"]] = cleaned
-        _write_json_store(list(merged.values()))
+_TOKEN_RE = re.compile(r"\w+")
+# Mots-outils ignorés à l'indexation comme dans les requêtes.
+_STOPWORDS = frozenset(
+    "au aux ce ces cet cette dans de des du elle en est et il ils la le les leur "
+    "mais ne ni on ou par pas pour qu que qui sa se ses son sont sur un une "
+    "the of and".split()
+)
+# Poids de chaque champ dans le score de pertinence.
+_SEARCH_FIELD_WEIGHTS = (("phrase", 3.0), ("argumentaire", 1.0), ("titre", 1.5), ("auteur", 1.5))
 
 
-def fetch_argumentaires() -> list[dict[str, object]]:
-    with DB_LOCK:
-        items = list(_load_store_map().values())
-    return sorted(items, key=lambda it: it["phrase"].lower())
+def _tokenize(text: str) -> list[str]:
+    return [
+        token
+        for token in _TOKEN_RE.findall(_fold(text))
+        if len(token) > 1 and token not in _STOPWORDS
+    ]
 
 
-def upsert_argumentaire(
-    phrase: str,
-    argumentaire: str,
-    sources: list[dict[str, str]] | None = None,
-) -> None:
-    with DB_LOCK:
-        store = _load_store_map()
-        entry = {
-            "phrase": phrase,
-            "argumentaire": argumentaire,
-            "sources": sources or [],
-        }
-        cleaned = _sanitize_item(entry)
-        if cleaned is None:
-            raise ValueError("Phrase ou argumentaire manquant après nettoyage")
-        store[cleaned["phrase"]] = cleaned
-        _write_json_store(list(store.values()))
+def _search_weights(item: dict[str, object]) -> dict[str, float]:
+    """Poids de chaque terme d'une entrée, champ par champ."""
+    weights: dict[str, float] = {}
+    for field, weight in _SEARCH_FIELD_WEIGHTS:
+        if field in ("titre", "auteur"):
+            texts = [source.get(field, "") for source in item["sources"]]
+        else:
+            texts = [item[field]]
+        for text in texts:
+            for token in _tokenize(text):
+                weights[token] = weights.get(token, 0.0) + weight
+    return weights
 
 
-class RequestHandler(SimpleHTTPRequestHandler):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, directory=str(BASE_DIR), **kwargs)
+class _SearchIndex:
+    """Index inversé des phrases, argumentaires et titres/auteurs des sources.
 
-    def end_headers(self):
-        if self.path.startswith("/api/"):
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.send_header("Access-Control-Allow-Headers", "Content-Type")
-            self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
-        super().end_headers()
+    Immuable une fois publié : `updated()` renvoie un nouvel index. Les
+    tables de base (postings, documents, vocabulaire trié) sont partagées
+    telles quelles ; seules les entrées touchées depuis la base vivent dans
+    une surcouche propre à chaque index, copiée à chaque mise à jour. Quand
+    elle dépasse SEARCH_OVERLAY_MIN ou 16 * racine de la base, elle est
+    repliée dans une nouvelle base. Une mise à jour coûte ainsi
+    O(racine du vocabulaire) amorti au lieu d'une copie complète, et
+    `search()` peut s'exécuter sans verrou sur un index qu'un écrivain remplace.
+    """
 
-    def do_OPTIONS(self):
-        self.send_response(HTTPStatus.NO_CONTENT)
-        self.end_headers()
+    def __init__(self) -> None:
+        self._postings: dict[str, dict[str, float]] = {}
+        self._documents: dict[str, dict[str, float]] = {}
+        self._vocabulary: list[str] = []
+        # Surcouche : None marque un terme ou une phrase retiré de la base ;
+        # termes ajoutés (triés) et retirés par rapport au vocabulaire de base.
+        self._overlay_postings: dict[str, dict[str, float] | None] = {}
+        self._overlay_documents: dict[str, dict[str, float] | None] = {}
+        self._added: list[str] = []
+        self._removed: set[str] = set()
+        self._total = 0
+        # Postings propres à cet index, modifiables sans copie pendant updated().
+        self._owned: set[str] = set()
 
-    def do_GET(self):  # noqa: N802
-        parsed = urlparse(self.path)
-        if parsed.path == "/api/argumentaires":
-            self._handle_get_argumentaires()
-        else:
-            super().do_GET()
+    @classmethod
+    def built(cls, items: Iterable[dict[str, object]]) -> _SearchIndex:
+        """Index complet construit directement en base (chargement du magasin)."""
+        index = cls()
+        for item in items:
+            weights = _search_weights(item)
+            index._documents[item["phrase"]] = weights
+            for token, weight in weights.items():
+                index._postings.setdefault(token, {})[item["phrase"]] = weight
+        index._vocabulary = sorted(index._postings)
+        index._total = len(index._documents)
+        return index
 
-    def do_POST(self):  # noqa: N802
-        parsed = urlparse(self.path)
-        if parsed.path == "/api/argumentaires":
-            self._handle_post_argumentaire()
+    def updated(self, items: Iterable[dict[str, object]]) -> _SearchIndex:
+        index = _SearchIndex()
+        index._postings = self._postings
+        index._documents = self._documents
+        index._vocabulary = self._vocabulary
+        index._overlay_postings = dict(self._overlay_postings)
+        index._overlay_documents = dict(self._overlay_documents)
+        index._added = list(self._added)
+        index._removed = set(self._removed)
+        index._total = self._total
+        limit = max(SEARCH_OVERLAY_MIN, 16 * math.isqrt(len(self._postings)))
+        for item in items:
+            index._update(item)
+            if len(index._overlay_postings) + len(index._overlay_documents) > limit:
+                index._fold_overlay()
+        index._owned = set()
+        return index
+
+    def _fold_overlay(self) -> None:
+        """Replie la surcouche dans de nouvelles tables de base (O(vocabulaire))."""
+        postings = dict(self._postings)
+        for token, value in self._overlay_postings.items():
+            if value is None:
+                del postings[token]
+            else:
+                postings[token] = value
+        documents = dict(self._documents)
+        for phrase, value in self._overlay_documents.items():
+            if value is None:
+                del documents[phrase]
+            else:
+                documents[phrase] = value
+        self._vocabulary = list(
+            heapq.merge(
+                (token for token in self._vocabulary if token not in self._removed),
+                self._added,
+            )
+        )
+        self._postings, self._documents = postings, documents
+        # Les postings de la surcouche passent en base : on continue de les
+        # posséder, ils n'ont pas encore été publiés.
+        self._overlay_postings, self._overlay_documents = {}, {}
+        self._added, self._removed = [], set()
+
+    def _lookup_postings(self, token: str) -> dict[str, float] | None:
+        if token in self._overlay_postings:
+            return self._overlay_postings[token]
+        return self._postings.get(token)
+
+    def _lookup_document(self, phrase: str) -> dict[str, float] | None:
+        if phrase in self._overlay_documents:
+            return self._overlay_documents[phrase]
+        return self._documents.get(phrase)
+
+    def _own(self, token: str) -> dict[str, float]:
+        """Postings de `token` modifiables par cet index, créés au besoin."""
+        if token in self._owned:
+            postings = self._lookup_postings(token)
+            if postings is not None:
+                return postings
+        current = self._lookup_postings(token)
+        if current is None:
+            postings = {}
+            if token in self._removed:
+                self._removed.discard(token)
+            else:
+                bisect.insort(self._added, token)
         else:
-            self.send_error(HTTPStatus.NOT_FOUND, "Endpoint inconnu")
+            postings = dict(current)
+        self._overlay_postings[token] = postings
+        self._owned.add(token)
+        return postings
 
-    def _handle_get_argumentaires(self) -> None:
-        data = fetch_argumentaires()
-        self._send_json(HTTPStatus.OK, data)
+    def _update(self, item: dict[str, object]) -> None:
+        phrase = item["phrase"]
+        self._remove(phrase)
+        weights = _search_weights(item)
+        self._overlay_documents[phrase] = weights
+        self._total += 1
+        for token, weight in weights.items():
+            self._own(token)[phrase] = weight
 
-    def _handle_post_argumentaire(self) -> None:
-        length = int(self.headers.get("Content-Length", "0"))
-        if length <= 0:
-            self._send_json(
-                HTTPStatus.BAD_REQUEST,
-                {"error": "Corps JSON manquant"},
-            )
+    def _remove(self, phrase: str) -> None:
+        document = self._lookup_document(phrase)
+        if document is None:
             return
+        if phrase in self._documents:
+            self._overlay_documents[phrase] = None
+        else:
+            del self._overlay_documents[phrase]
+        self._total -= 1
+        for token in document:
+            postings = self._own(token)
+            del postings[phrase]
+            if postings:
+                continue
+            self._owned.discard(token)
+            if token in self._postings:
+                self._overlay_postings[token] = None
+                self._removed.add(token)
+            else:
+                del self._overlay_postings[token]
+                del self._added[bisect.bisect_left(self._added, token)]
 
-        raw = self.rfile.read(length)
-        try:
-            payload = json.loads(raw)
-        except json.JSONDecodeError:
-            self._send_json(
-                HTTPStatus.BAD_REQUEST,
-                {"error": "JSON invalide"},
-            )
-            return
+    def _expand(self, term: str) -> list[str]:
+        """Termes du vocabulaire commençant par `term` (recherche par préfixe)."""
+        matches: list[str] = []
+        for vocabulary in (self._vocabulary, self._added):
+            for position in range(bisect.bisect_left(vocabulary, term), len(vocabulary)):
+                token = vocabulary[position]
+                if not token.startswith(term):
+                    break
+                if vocabulary is self._added or token not in self._removed:
+                    matches.append(token)
+        return sorted(matches)
 
-        phrase = (payload.get("phrase") or "").strip()
-        argumentaire = (payload.get("argumentaire") or "").strip()
-        sources_raw = payload.get("sources")
-        if not phrase or not argumentaire:
-            self._send_json(
-                HTTPStatus.BAD_REQUEST,
-                {"error": "'phrase' et 'argumentaire' sont requis"},
-            )
-            return
+    def search(self, query: str, limit: int) -> list[tuple[str, float]]:
+        terms = _tokenize(query)
+        if not terms:
+            return []
+        total = self._total
+        scores: dict[str, float] | None = None
+        for term in dict.fromkeys(terms):
+            term_scores: dict[str, float] = {}
+            for token in self._expand(term):
+                postings = self._lookup_postings(token)
+                idf = math.log(1 + total / len(postings))
+                # Une correspondance exacte pèse plus lourd qu'un simple préfixe.
+                boost = 1.0 if token == term else 0.5
+                for phrase, weight in postings.items():
+                    term_scores[phrase] = term_scores.get(phrase, 0.0) + weight * idf * boost
+            if scores is None:
+                scores = term_scores
+            else:
+                # Tous les termes de la requête doivent correspondre.
+                scores = {
+                    phrase: score + term_scores[phrase]
+                    for phrase, score in scores.items()
+                    if phrase in term_scores
+                }
+            if not scores:
+                return []
+        ranked = sorted(scores.items(), key=lambda pair: (-pair[1], _sort_key(pair[0])))
+        return ranked[:limit]
 
-        sources: list[dict[str, str]]
-        if sources_raw is None:
-            sources = []
-        elif isinstance(sources_raw, list):
-            sources = []
-            for entry in sources_raw:
-                if not isinstance(entry, dict):
-                    continue
-                titre = (entry.get("titre") or "").strip()
-                auteur = (entry.get("auteur") or "").strip()
-                url = (entry.get("url") or "").strip()
-                if not titre and not url:
-                    continue
-                item: dict[str, str] = {}
-                if titre:
-                    item["titre"] = titre
-                if auteur:
-                    item["auteur"] = auteur
-                if url:
-                    item["url"] = url
-                sources.append(item)
-        else:
-            return self._send_json(
-                HTTPStatus.BAD_REQUEST,
-                {"error": "'sources' doit être un tableau d'objets"},
-            )
 
-        upsert_argumentaire(phrase, argumentaire, sources)
-        self._send_json(
-            HTTPStatus.OK,
-            {"phrase": phrase, "argumentaire": argumentaire, "sources": sources},
-        )
+class _StoreSnapshot(NamedTuple):
+    """État figé du magasin, publié d'un bloc par les écrivains.
 
-    def _send_json(self, status: HTTPStatus, payload: object) -> None:
-        encoded = json.dumps(payload, ensure_ascii=False).encode("utf-8")
-        self.send_response(status)
-        self.send_header("Content-Type", "application/json; charset=utf-8")
-        self.send_header("Content-Length", str(len(encoded)))
-        self.end_headers()
-        self.wfile.write(encoded)
+    Les lecteurs lisent la référence courante de _SNAPSHOT sans verrou et
+    travaillent sur un état cohérent même si une écriture la remplace entre
+    temps. Les entrées (dictionnaires) sont partagées : lecture seule.
+    """
 
+    # Incrémentée à chaque publication ; sert de clé aux caches de réponses.
+    version: int
+    items: Mapping[str, dict[str, object]]
+    # Index trié sur _sort_key(phrase) : clés, entrées et texte replié
+    # (phrase + argumentaire) pour le filtre `q`.
+    keys: tuple[tuple[str, str], ...]
+    ordered: tuple[dict[str, object], ...]
+    folded: tuple[str, ...]
+    # Encodage JSON de chaque entrée, dans l'ordre trié, fait une seule fois.
+    fragments: tuple[bytes, ...]
+    # Index de hachage _phrase_key(phrase) -> phrase pour les accès unitaires.
+    phrase_index: Mapping[str, str]
+    search: _SearchIndex
+    # Journal borné des lots publiés : (version, phrases modifiées), croissant.
+    # Il répond pour toute version >= changes_floor.
+    changes: tuple[tuple[int, tuple[str, ...]], ...]
+    changes_floor: int
 
-class ThreadedHTTPServer(ThreadingMixIn, HTTPServer):
-    daemon_threads = True
 
+_SNAPSHOT = _StoreSnapshot(
+    version=0,
+    items=MappingProxyType({}),
+    keys=(),
+    ordered=(),
+    folded=(),
+    fragments=(),
+    phrase_index=MappingProxyType({}),
+    search=_SearchIndex(),
+    changes=(),
+    changes_floor=0,
+)
 
-def run_server(port: int = 8000) -> None:
-    init_db()
-    server_address = ("", port)
-    httpd = ThreadedHTTPServer(server_address, RequestHandler)
-    print(f"Serveur lancé sur http://localhost:{port}/")
-    print("Arrêt : CTRL+C")
-    try:
-        httpd.serve_forever()
-    except KeyboardInterrupt:
-        print("\nArrêt demandé, fermeture...")
+# Suite de versions de ce processus : une version reçue d'un autre processus
+# (autre worker, redémarrage) ne se compare pas aux nôtres.
+_STORE_EPOCH = secrets.token_hex(4)
+
+
+def _renew_store_epoch() -> None:
+    global _STORE_EPOCH
+    _STORE_EPOCH = secrets.token_hex(4)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_renew_store_epoch)
+
+
+def _search_items(snapshot: _StoreSnapshot, query: str, limit: int) -> list[dict[str, object]]:
+    results: list[dict[str, object]] = []
+    for phrase, score in snapshot.search.search(query, limit):
+        results.append({**snapshot.items[phrase], "score": round(score, 4)})
+    return results
+
+
+def _sort_key(phrase: str) -> tuple[str, str]:
+    return (phrase.lower(), phrase)
+
+
+def _encode_item(item: dict[str, object]) -> bytes:
+    return json.dumps(item, ensure_ascii=False).encode("utf-8")
+
+
+def _log_changes(
+    previous: _StoreSnapshot,
+    version: int,
+    phrases: tuple[str, ...],
+) -> tuple[tuple[tuple[int, tuple[str, ...]], ...], int]:
+    """Journal de `previous` prolongé du lot `phrases`, et son nouveau plancher."""
+    changes = previous.changes + ((version, phrases),)
+    floor = previous.changes_floor
+    if len(changes) > CHANGE_LOG_SIZE:
+        floor = changes[-CHANGE_LOG_SIZE - 1][0]
+        changes = changes[-CHANGE_LOG_SIZE:]
+    return changes, floor
+
+
+def _set_store(items: dict[str, dict[str, object]]) -> None:
+    """Publie un instantané reconstruit à partir de `items` (DB_LOCK détenu).
+
+    Les entrées qui diffèrent de l'instantané précédent sont journalisées ;
+    si des phrases ont disparu, le journal repart de zéro et les clients
+    de `?since=` rechargent la liste.
+    """
+    global _SNAPSHOT
+    previous = _SNAPSHOT
+    version = previous.version + 1
+    changes, floor = (), version
+    if previous.version and previous.items.keys() <= items.keys():
+        changed = tuple(
+            phrase for phrase, item in items.items() if previous.items.get(phrase) != item
+        )
+        changes, floor = (
+            _log_changes(previous, version, changed)
+            if changed
+            else (previous.changes, previous.changes_floor)
+        )
+    ordered = tuple(sorted(items.values(), key=lambda it: _sort_key(it["phrase"])))
+    _SNAPSHOT = _StoreSnapshot(
+        version=version,
+        items=MappingProxyType(items),
+        keys=tuple(_sort_key(item["phrase"]) for item in ordered),
+        ordered=ordered,
+        folded=tuple(_fold_item(item) for item in ordered),
+        fragments=tuple(_encode_item(item) for item in ordered),
+        phrase_index=MappingProxyType({_phrase_key(phrase): phrase for phrase in items}),
+        search=_SearchIndex.built(ordered),
+        changes=changes,
+        changes_floor=floor,
+    )
+    _FEED.notify()
+
+
+def _put_items(items: list[dict[str, object]]) -> None:
+    """Publie un instantané où `items` sont insérées ou remplacées (DB_LOCK détenu).
+
+    L'instantané courant est copié, jamais modifié : les lecteurs qui le
+    tiennent encore le voient intact.
+    """
+    global _SNAPSHOT
+    current = _SNAPSHOT
+    store = dict(current.items)
+    keys = list(current.keys)
+    ordered = list(current.ordered)
+    folded = list(current.folded)
+    fragments = list(current.fragments)
+    phrase_index = dict(current.phrase_index)
+    for item in items:
+        phrase = item["phrase"]
+        key = _sort_key(phrase)
+        index = bisect.bisect_left(keys, key)
+        if phrase in store:
+            ordered[index] = item
+            folded[index] = _fold_item(item)
+            fragments[index] = _encode_item(item)
+        else:
+            keys.insert(index, key)
+            ordered.insert(index, item)
+            folded.insert(index, _fold_item(item))
+            fragments.insert(index, _encode_item(item))
+        store[phrase] = item
+        phrase_index[_phrase_key(phrase)] = phrase
+    version = current.version + 1
+    changes, floor = _log_changes(current, version, tuple(item["phrase"] for item in items))
+    _SNAPSHOT = _StoreSnapshot(
+        version=version,
+        items=MappingProxyType(store),
+        keys=tuple(keys),
+        ordered=tuple(ordered),
+        folded=tuple(folded),
+        fragments=tuple(fragments),
+        phrase_index=MappingProxyType(phrase_index),
+        search=current.search.updated(items),
+        changes=changes,
+        changes_floor=floor,
+    )
+    _FEED.notify()
+
+
+class _DuplicateIndex:
+    """Index des phrases proches : 3-grammes de caractères et filtrage par préfixe.
+
+    Chaque phrase est réduite à l'ensemble des 3-grammes de sa clé de
+    doublon, rangés dans un ordre global fixe (les plus rares d'abord). Deux
+    ensembles de similarité de Jaccard >= DEDUPE_THRESHOLD partagent
+    forcément un gramme de leurs préfixes de |x| - ceil(seuil * |x|) + 1
+    grammes : seuls ces préfixes sont indexés. Une phrase n'est donc comparée
+    qu'aux quelques phrases qui partagent un gramme rare, sans faux négatif.
+
+    Construit à la première utilisation, puis tenu à jour depuis le journal
+    des changements des instantanés.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._version = -1
+        # Dernier rapport de groups() et la version à laquelle il a été fait.
+        self._groups: tuple[int, list[dict[str, object]]] = (-1, [])
+        self._grams: dict[str, frozenset[str]] = {}
+        self._postings: dict[str, list[str]] = {}
+        # Fréquence des grammes à la construction : fige l'ordre global.
+        self._rank: dict[str, int] = {}
+
+    def similar(self, snapshot: _StoreSnapshot, phrase: str) -> list[tuple[str, float]]:
+        """Phrases de l'index proches de `phrase` (elle exclue), les plus proches d'abord."""
+        with self._lock:
+            self._sync(snapshot)
+            matches = self._matches(self._shingles(phrase), phrase)
+        return matches[:DEDUPE_MAX_CANDIDATES]
+
+    def near(self, phrase: str) -> list[tuple[str, float]]:
+        """Pour un index hors magasin (un lot d'import) : phrases ajoutées proches de `phrase`."""
+        return self._matches(self._shingles(phrase), phrase)[:DEDUPE_MAX_CANDIDATES]
+
+    def add(self, phrase: str) -> None:
+        """Pour un index hors magasin : ajoute `phrase` à ce que near() consulte."""
+        if phrase not in self._grams:
+            self._add(phrase, self._shingles(phrase))
+
+    def groups(self, snapshot: _StoreSnapshot) -> list[dict[str, object]]:
+        """Groupes de phrases proches de tout le magasin, les plus gros d'abord.
+
+        Le rapport est gardé jusqu'à la prochaine version du magasin.
+        """
+        with self._lock:
+            self._sync(snapshot)
+            version, groups = self._groups
+            if version != self._version:
+                groups = self._report()
+                self._groups = (self._version, groups)
+        return groups
+
+    def _report(self) -> list[dict[str, object]]:
+        parent: dict[str, str] = {}
+
+        def find(phrase: str) -> str:
+            while parent.setdefault(phrase, phrase) != phrase:
+                parent[phrase] = parent[parent[phrase]]
+                phrase = parent[phrase]
+            return phrase
+
+        pairs: list[tuple[str, str, float]] = []
+        for phrase, grams in self._grams.items():
+            # Chaque paire n'est vérifiée qu'une fois, depuis sa plus petite phrase.
+            for other, score in self._matches(grams, phrase, after=phrase):
+                pairs.append((phrase, other, score))
+                parent[find(other)] = find(phrase)
+        members: dict[str, list[str]] = {}
+        for phrase in parent:
+            members.setdefault(find(phrase), []).append(phrase)
+        scored: dict[str, list[dict[str, object]]] = {}
+        for phrase, other, score in pairs:
+            scored.setdefault(find(phrase), []).append(
+                {"phrases": sorted((phrase, other), key=_sort_key), "score": round(score, 4)}
+            )
+        groups = [
+            {
+                "phrases": sorted(phrases, key=_sort_key),
+                "pairs": sorted(scored[root], key=lambda pair: -pair["score"]),
+            }
+            for root, phrases in members.items()
+        ]
+        groups.sort(key=lambda group: (-len(group["phrases"]), _sort_key(group["phrases"][0])))
+        return groups
+
+    @staticmethod
+    def _shingles(phrase: str) -> frozenset[str]:
+        padded = f" {_dedupe_key(phrase)} "
+        if len(padded) <= DEDUPE_NGRAM:
+            return frozenset((padded,))
+        return frozenset(
+            padded[start:start + DEDUPE_NGRAM] for start in range(len(padded) - DEDUPE_NGRAM + 1)
+        )
+
+    def _prefix(self, grams: frozenset[str]) -> list[str]:
+        # Marge d'arrondi : 0.7 * 10 vaut 7.000000000000001 en flottant.
+        size = len(grams) - math.ceil(DEDUPE_THRESHOLD * len(grams) - 1e-9) + 1
+        ordered = sorted(
+            grams,
+            key=lambda gram: (self._rank.get(gram, 0), zlib.crc32(gram.encode("utf-8")), gram),
+        )
+        return ordered[:size]
+
+    def _matches(
+        self,
+        grams: frozenset[str],
+        exclude: str,
+        after: str | None = None,
+    ) -> list[tuple[str, float]]:
+        size = len(grams)
+        # Filtre de taille : la similarité ne dépasse pas min / max.
+        low = DEDUPE_THRESHOLD * size - 1e-9
+        high = size / DEDUPE_THRESHOLD + 1e-9
+        seen = {exclude}
+        matches: list[tuple[str, float]] = []
+        for gram in self._prefix(grams):
+            for other in self._postings.get(gram, ()):
+                if other in seen:
+                    continue
+                seen.add(other)
+                if after is not None and other <= after:
+                    continue
+                other_grams = self._grams[other]
+                if not low <= len(other_grams) <= high:
+                    continue
+                common = len(grams & other_grams)
+                score = common / (size + len(other_grams) - common)
+                if score >= DEDUPE_THRESHOLD:
+                    matches.append((other, score))
+        matches.sort(key=lambda match: (-match[1], _sort_key(match[0])))
+        return matches
+
+    def _add(self, phrase: str, grams: frozenset[str]) -> None:
+        self._grams[phrase] = grams
+        for gram in self._prefix(grams):
+            self._postings.setdefault(gram, []).append(phrase)
+
+    def _sync(self, snapshot: _StoreSnapshot) -> None:
+        """Rattrape `snapshot` (verrou détenu) : ajouts seuls, ou reconstruction."""
+        if self._version >= snapshot.version:
+            return
+        if self._version < snapshot.changes_floor:
+            grams = {phrase: self._shingles(phrase) for phrase in snapshot.items}
+            rank: dict[str, int] = {}
+            for phrase_grams in grams.values():
+                for gram in phrase_grams:
+                    rank[gram] = rank.get(gram, 0) + 1
+            self._grams, self._postings, self._rank = {}, {}, rank
+            for phrase, phrase_grams in grams.items():
+                self._add(phrase, phrase_grams)
+        else:
+            for stamp, phrases in snapshot.changes:
+                if stamp <= self._version:
+                    continue
+                for phrase in phrases:
+                    # Une mise à jour ne change pas la phrase : rien à réindexer.
+                    if phrase not in self._grams:
+                        self._add(phrase, self._shingles(phrase))
+        self._version = snapshot.version
+
+
+_DUPLICATES = _DuplicateIndex()
+
+
+def _version_token(snapshot: _StoreSnapshot) -> str:
+    return f"{_STORE_EPOCH}.{snapshot.version}"
+
+
+def _version_headers(snapshot: _StoreSnapshot) -> tuple[tuple[str, str], ...]:
+    return (("X-Store-Version", _version_token(snapshot)),)
+
+
+def _list_response(snapshot: _StoreSnapshot) -> tuple[_Fragments, tuple[tuple[str, str], ...]]:
+    """Liste complète (GET /api/argumentaires sans paramètre)."""
+    return _Fragments(snapshot.fragments), _version_headers(snapshot)
+
+
+def _parse_version_token(token: str) -> int | None:
+    """Version désignée par `token`, None si elle vient d'une autre suite de versions."""
+    epoch, _, version = token.partition(".")
+    if not (version.isascii() and version.isdigit()):
+        raise ValueError("Version invalide")
+    return int(version) if epoch == _STORE_EPOCH else None
+
+
+def _changes_since(snapshot: _StoreSnapshot, version: int | None) -> list[dict[str, object]] | None:
+    """Entrées modifiées après `version`, triées ; None si le journal n'y remonte pas."""
+    if version is None or not snapshot.changes_floor <= version <= snapshot.version:
+        return None
+    changed: set[str] = set()
+    for stamp, phrases in reversed(snapshot.changes):
+        if stamp <= version:
+            break
+        changed.update(phrases)
+    return sorted(
+        (snapshot.items[phrase] for phrase in changed),
+        key=lambda item: _sort_key(item["phrase"]),
+    )
+
+
+def _store_is_stale() -> bool:
+    """Vrai si la base a pu changer hors de ce processus (lecture sans verrou).
+
+    Un faux positif coûte seulement un passage par _refresh_store().
+    """
+    if _SQLITE is not None:
+        return _SQLITE.is_stale(SQLITE_STALE_CHECK_SECONDS)
+    if _json_store_stat() != _STORE_STAT:
+        return True
+    return _journal_state() != _JOURNAL_STATE
+
+
+def _current_snapshot() -> _StoreSnapshot:
+    """Instantané à jour ; DB_LOCK n'est pris que si la base a changé ailleurs."""
+    if _store_is_stale():
+        with DB_LOCK:
+            _refresh_store()
+    return _SNAPSHOT
+
+
+def _refresh_store() -> None:
+    """Recharge le magasin mémoire si la base a été modifiée hors du serveur.
+
+    Doit être appelée avec DB_LOCK détenu.
+    """
+    global _STORE_STAT, _JOURNAL_STATE
+    if _SQLITE is not None:
+        if _SQLITE.is_stale():
+            # Écritures d'un autre processus : seules les phrases touchées
+            # sont relues, sauf suppression ou retard hors de la table changes.
+            changed = _SQLITE.changed_items()
+            if changed is None:
+                _set_store(_SQLITE.load())
+            elif changed:
+                _put_items(changed)
+        return
+    current = _json_store_stat()
+    journal = _journal_state()
+    known = _JOURNAL_STATE
+    if (
+        current == _STORE_STAT
+        and journal is not None
+        and known is not None
+        and journal[:2] == known[:2]
+        and journal[2] >= known[2]
+    ):
+        # Même instantané, même journal : on rejoue seulement sa fin, écrite
+        # par un autre worker depuis la dernière lecture.
+        if journal[2] > known[2]:
+            entries, offset = _read_journal_tail(JOURNAL_PATH, known[2])
+            if entries:
+                _put_items(entries)
+            _JOURNAL_STATE = (known[0], known[1], offset)
+        return
+    if current == _STORE_STAT and journal is None and known is None:
+        return
+    _set_store(_load_store_map())
+    _STORE_STAT = current
+
+
+def _compact_journal() -> None:
+    """Replie le journal dans argumentaires.json (tâche de fond)."""
+    global _STORE_STAT, _JOURNAL_STATE
+    if not _COMPACTION_LOCK.acquire(blocking=False):
+        return
+    try:
+        with DB_LOCK, _store_file_lock():
+            # Un autre worker peut déjà être en train de compacter.
+            if JOURNAL_COMPACTING_PATH.exists():
+                return
+            _refresh_store()
+            journal = _journal()
+            if journal.size() < JOURNAL_COMPACT_BYTES:
+                return
+            items = list(_SNAPSHOT.items.values())
+            journal.rotate(JOURNAL_COMPACTING_PATH)
+            _JOURNAL_STATE = journal.state()
+            rotated = _file_identity(JOURNAL_COMPACTING_PATH)
+        # Écrit hors verrou, sous un nom propre à ce processus : le .tmp de
+        # init_db(), pris sous le verrou, peut être écrit au même moment.
+        tmp_path = _write_json_tmp(items, f"{os.getpid()}.compacting.tmp")
+        with DB_LOCK, _store_file_lock():
+            if _file_identity(JOURNAL_COMPACTING_PATH) != rotated:
+                # Un successeur (SIGHUP) a déjà replié ce journal dans le JSON,
+                # avec les écritures suivantes : notre instantané est plus ancien.
+                tmp_path.unlink(missing_ok=True)
+                return
+            tmp_path.replace(JSON_DB_PATH)
+            _STORE_STAT = _json_store_stat()
+            JOURNAL_COMPACTING_PATH.unlink(missing_ok=True)
+            # L'instantané réécrit reste connu : pas de fusion complète au redémarrage.
+            _record_startup_state(store=_STORE_STAT)
+    finally:
+        _COMPACTION_LOCK.release()
+
+
+def _file_identity(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (stat.st_dev, stat.st_ino)
+
+
+def _seed_fingerprint() -> str:
+    encoded = json.dumps(INITIAL_ARGUMENTAIRES, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _startup_fingerprint(seed: str) -> dict[str, object]:
+    """Empreintes des entrées de init_db(), sous leur forme sérialisée en JSON."""
+    fingerprint: dict[str, object] = {
+        "engine": _STORE_ENGINE,
+        "seed": seed,
+        "store": _json_store_stat(),
+    }
+    if _STORE_ENGINE == "sqlite":
+        # En SQLite, le journal JSON est une entrée de la fusion comme une autre.
+        fingerprint["journal"] = _journal_state()
+    return json.loads(json.dumps(fingerprint))
+
+
+def _read_startup_state() -> dict[str, object]:
+    try:
+        with STARTUP_STATE_PATH.open("r", encoding="utf-8") as handle:
+            state = json.load(handle)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return state if isinstance(state, dict) else {}
+
+
+def _record_startup_state(**changes: object) -> None:
+    """Met à jour l'état de démarrage (verrou fichier détenu).
+
+    Un état perdu ou illisible force seulement une fusion complète au
+    prochain démarrage : l'écriture n'est donc pas synchronisée.
+    """
+    state = _read_startup_state()
+    state.update(json.loads(json.dumps(changes)))
+    tmp_path = STARTUP_STATE_PATH.with_name(f"{STARTUP_STATE_PATH.name}.tmp")
+    try:
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            json.dump(state, handle, indent=2)
+            handle.write("\n")
+        tmp_path.replace(STARTUP_STATE_PATH)
+    except OSError:
+        pass
+
+
+def init_db(store: str | None = None) -> None:
+    """Charge le magasin au démarrage.
+
+    Si aucune entrée n'a changé depuis le dernier démarrage (liste initiale,
+    instantané JSON, moteur), le magasin est relu tel quel, sans réécriture.
+    Sinon tout est fusionné puis réécrit. L'ancienne base SQLite n'est
+    migrée qu'une fois.
+    """
+    global _STORE_STAT, _STORE_ENGINE, _SQLITE, _JOURNAL_STATE
+    if store is not None:
+        if store not in STORE_ENGINES:
+            raise ValueError(f"Moteur de stockage inconnu : {store}")
+        _STORE_ENGINE = store
+    seed = _seed_fingerprint()
+    # Le verrou fichier couvre aussi les lectures : pendant un déploiement
+    # progressif, l'ancien processus peut encore écrire dans le journal.
+    with DB_LOCK, _store_file_lock():
+        if _SQLITE is not None:
+            _SQLITE.close()
+            _SQLITE = None
+        state = _read_startup_state()
+        fingerprint = _startup_fingerprint(seed)
+        unchanged = (
+            all(state.get(name) == value for name, value in fingerprint.items())
+            and not JOURNAL_COMPACTING_PATH.exists()
+        )
+        if unchanged:
+            if _STORE_ENGINE == "sqlite":
+                _SQLITE = _SqliteStore(SQLITE_DB_PATH)
+                _set_store(_SQLITE.load())
+            else:
+                _STORE_STAT = _json_store_stat()
+                _set_store(_load_store_map())
+            return
+
+        merged: dict[str, dict[str, object]] = {}
+        for source in (
+            INITIAL_ARGUMENTAIRES,
+            _read_json_store(),
+            [] if state.get("legacy_migrated") else _load_legacy_sqlite(),
+            _read_journal(JOURNAL_COMPACTING_PATH),
+            _read_journal(JOURNAL_PATH),
+        ):
+            for entry in source:
+                if not isinstance(entry, dict):
+                    continue
+                cleaned = _sanitize_item(entry)
+                if cleaned:
+                    merged[cleaned["phrase"]] = cleaned
+
+        if _STORE_ENGINE == "sqlite":
+            _SQLITE = _SqliteStore(SQLITE_DB_PATH)
+            existing = _SQLITE.load()
+            missing = [
+                item
+                for phrase, item in merged.items()
+                if phrase not in existing
+            ]
+            if missing:
+                _SQLITE.write(missing)
+            merged.update(existing)
+            _set_store(merged)
+        else:
+            _set_store(merged)
+            _write_json_store(list(_SNAPSHOT.items.values()))
+            _STORE_STAT = _json_store_stat()
+            # Le journal est replié dans l'instantané : on peut le vider.
+            _journal().reset()
+            _JOURNAL_STATE = _journal().state()
+            JOURNAL_COMPACTING_PATH.unlink(missing_ok=True)
+        _record_startup_state(**_startup_fingerprint(seed), legacy_migrated=True)
+
+
+def _sorted_items(snapshot: _StoreSnapshot) -> list[dict[str, object]]:
+    return list(snapshot.ordered)
+
+
+def _encode_cursor(phrase: str) -> str:
+    return base64.urlsafe_b64encode(phrase.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> str:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        raw = base64.b64decode(padded.encode("ascii"), altchars=b"-_", validate=True)
+        return raw.decode("utf-8")
+    except (ValueError, UnicodeError) as exc:
+        raise ValueError("Curseur invalide") from exc
+
+
+def _page_items(
+    snapshot: _StoreSnapshot,
+    limit: int | None,
+    cursor: str | None,
+    fields: tuple[str, ...],
+    query: str,
+    source_refs: bool = False,
+) -> tuple[object, str | None]:
+    """Découpe l'index trié de `snapshot` après `cursor`.
+
+    Renvoie la page et le curseur de la page suivante. Une page d'entrées
+    complètes est faite des fragments JSON déjà encodés ; sinon chaque
+    entrée est projetée sur `fields`. Avec `source_refs`, la page prend la
+    forme compacte de _with_source_refs().
+    """
+    start = 0
+    if cursor is not None:
+        start = bisect.bisect_right(snapshot.keys, _sort_key(_decode_cursor(cursor)))
+    needle = _fold(query)
+    indices: list[int] = []
+    next_cursor = None
+    for index in range(start, len(snapshot.ordered)):
+        if needle and needle not in snapshot.folded[index]:
+            continue
+        if limit is not None and len(indices) >= limit:
+            next_cursor = _encode_cursor(snapshot.ordered[indices[-1]]["phrase"])
+            break
+        indices.append(index)
+    if fields == ITEM_FIELDS and not source_refs:
+        return _Fragments(tuple(snapshot.fragments[index] for index in indices)), next_cursor
+    page = [
+        {name: snapshot.ordered[index][name] for name in fields}
+        for index in indices
+    ]
+    if source_refs:
+        return _with_source_refs(page), next_cursor
+    return page, next_cursor
+
+
+def _with_source_refs(items: list[dict[str, object]]) -> dict[str, object]:
+    """Forme compacte : sources remplacées par leur identifiant, registre joint.
+
+    Le registre ne contient que les sources citées, dans l'ordre d'apparition.
+    """
+    registry: dict[str, dict[str, str]] = {}
+    compact: list[dict[str, object]] = []
+    for item in items:
+        if "sources" not in item:
+            compact.append(item)
+            continue
+        refs: list[str] = []
+        for data in item["sources"]:
+            source = _SOURCES.lookup(data)
+            registry.setdefault(source.id, source)
+            refs.append(source.id)
+        compact.append({**item, "sources": refs})
+    return {"items": compact, "sources": registry}
+
+
+def _canonical_phrase(snapshot: _StoreSnapshot, phrase: str) -> str | None:
+    """Phrase stockée que désigne `phrase`, à l'identique puis par clé normalisée."""
+    if phrase in snapshot.items:
+        return phrase
+    return snapshot.phrase_index.get(_phrase_key(phrase))
+
+
+def _lookup_item(snapshot: _StoreSnapshot, phrase: str) -> dict[str, object] | None:
+    """Accès O(1) à une entrée, d'abord à l'identique puis par clé normalisée."""
+    canonical = _canonical_phrase(snapshot, phrase)
+    return None if canonical is None else snapshot.items.get(canonical)
+
+
+def _require_item(snapshot: _StoreSnapshot, phrase: str) -> dict[str, object]:
+    item = _lookup_item(snapshot, phrase)
+    if item is None:
+        raise KeyError(phrase)
+    return item
+
+
+def fetch_argumentaire(phrase: str) -> dict[str, object] | None:
+    return _lookup_item(_current_snapshot(), phrase)
+
+
+def _build_board(
+    snapshot: _StoreSnapshot,
+    size: int,
+    free: bool,
+    seed: str,
+) -> dict[str, object]:
+    """Tire une grille reproductible : même graine, même corpus, même grille.
+
+    Le tirage se fait par indices dans l'index trié, en O(taille de la grille).
+    """
+    ordered = snapshot.ordered
+    use_free = free and size % 2 == 1
+    needed = size * size - (1 if use_free else 0)
+    if needed > len(ordered):
+        raise ValueError(
+            f"Pas assez de phrases pour une grille {size} x {size} "
+            f"({len(ordered)} disponibles)"
+        )
+    rng = random.Random(f"bingo:{seed}")
+    picked = [
+        ordered[index]["phrase"]
+        for index in rng.sample(range(len(ordered)), needed)
+    ]
+    cells: list[str | None] = picked
+    if use_free:
+        center = (size // 2) * size + size // 2
+        cells = picked[:center] + [None] + picked[center:]
+    return {"seed": seed, "size": size, "free": use_free, "cells": cells}
+
+
+def fetch_argumentaires() -> list[dict[str, object]]:
+    # Les dictionnaires renvoyés sont ceux du magasin : à traiter en lecture seule.
+    return _sorted_items(_current_snapshot())
+
+
+def upsert_argumentaire(
+    phrase: str,
+    argumentaire: str,
+    sources: list[dict[str, str]] | None = None,
+    duplicates: str = "allow",
+) -> tuple[dict[str, object] | None, list[dict[str, object]]]:
+    """Enregistre une entrée selon la politique de doublons `duplicates`.
+
+    Renvoie l'entrée écrite (None si elle est refusée) et les phrases proches.
+    """
+    entry = {
+        "phrase": phrase,
+        "argumentaire": argumentaire,
+        "sources": sources or [],
+    }
+    cleaned = _sanitize_item(entry)
+    if cleaned is None:
+        raise ValueError("Phrase ou argumentaire manquant après nettoyage")
+    return _apply_upserts([cleaned], duplicates)[0]
+
+
+def bulk_upsert_argumentaires(
+    entries: list[object],
+    duplicates: str = "allow",
+) -> list[tuple[dict[str, object] | None, list[dict[str, object]]]]:
+    """Enregistre en une seule transaction toutes les entrées valides.
+
+    Renvoie, pour chaque entrée, l'entrée écrite et ses phrases proches.
+    None sans candidat : entrée invalide ; None avec candidats : doublon refusé.
+    """
+    cleaned_entries = [
+        _sanitize_item(entry) if isinstance(entry, dict) else None
+        for entry in entries
+    ]
+    valid = [entry for entry in cleaned_entries if entry is not None]
+    outcomes = iter(_apply_upserts(valid, duplicates) if valid else ())
+    return [
+        (None, []) if entry is None else next(outcomes)
+        for entry in cleaned_entries
+    ]
+
+
+def _resolve_duplicates(
+    items: list[dict[str, object]],
+    mode: str,
+) -> tuple[list[tuple[str | None, list[dict[str, object]]]], list[dict[str, object]]]:
+    """Applique la politique de doublons `mode` à des entrées nettoyées.
+
+    Appelée sous DB_LOCK, magasin rattrapé : deux écritures concurrentes de
+    phrases proches ne passent donc pas toutes les deux. Les entrées d'un
+    même lot sont aussi comparées entre elles. Renvoie, pour chaque entrée,
+    la phrase écrite à sa place (None si elle est refusée) et ses candidats,
+    puis les entrées à écrire.
+
+    Une phrase déjà présente à l'identique est une mise à jour : elle passe
+    toujours. En `merge`, ses sources s'ajoutent à celles de la phrase la plus
+    proche, dont l'argumentaire est conservé ; il n'est remplacé que si les
+    deux phrases ont la même clé de doublon (casse, accents, ponctuation).
+    """
+    snapshot = _SNAPSHOT
+    batch = _DuplicateIndex()
+    accepted: dict[str, dict[str, object]] = {}
+    outcomes: list[tuple[str | None, list[dict[str, object]]]] = []
+    for item in items:
+        phrase = item["phrase"]
+        if mode == "allow" or phrase in snapshot.items or phrase in accepted:
+            accepted[phrase] = item
+            outcomes.append((phrase, []))
+            continue
+        matches = _DUPLICATES.similar(snapshot, phrase) + batch.near(phrase)
+        matches.sort(key=lambda match: (-match[1], _sort_key(match[0])))
+        candidates = [
+            {"phrase": other, "score": round(score, 4)}
+            for other, score in matches[:DEDUPE_MAX_CANDIDATES]
+        ]
+        if not candidates:
+            accepted[phrase] = item
+            batch.add(phrase)
+            outcomes.append((phrase, []))
+            continue
+        if mode == "reject":
+            outcomes.append((None, candidates))
+            continue
+        # Même clé de doublon : c'est la même phrase, l'entrée vaut mise à
+        # jour. Sinon, une phrase seulement proche ne doit pas écraser
+        # l'argumentaire d'une autre.
+        key = _dedupe_key(phrase)
+        same = next((other for other, _ in matches if _dedupe_key(other) == key), None)
+        target = same if same is not None else matches[0][0]
+        existing = accepted.get(target) or snapshot.items[target]
+        sources = list(existing["sources"])
+        sources.extend(source for source in item["sources"] if source not in sources)
+        argumentaire = item["argumentaire"] if same is not None else existing["argumentaire"]
+        accepted[target] = {"phrase": target, "argumentaire": argumentaire, "sources": sources}
+        outcomes.append((target, candidates))
+    return outcomes, list(accepted.values())
+
+
+def _apply_upserts(
+    items: list[dict[str, object]],
+    duplicates: str = "allow",
+) -> list[tuple[dict[str, object] | None, list[dict[str, object]]]]:
+    global _JOURNAL_STATE
+    with DB_LOCK:
+        if _SQLITE is not None:
+            _refresh_store()
+            outcomes, writes = _resolve_duplicates(items, duplicates)
+            if writes:
+                _SQLITE.write(writes)
+                _put_items(writes)
+            return _written(outcomes, writes)
+        with _store_file_lock():
+            # Sous le verrou fichier, on rattrape d'abord les écritures des
+            # autres workers : notre ajout prolonge alors exactement leur état,
+            # et les doublons sont cherchés dans cet état-là.
+            _refresh_store()
+            outcomes, writes = _resolve_duplicates(items, duplicates)
+            if not writes:
+                return _written(outcomes, writes)
+            journal = _journal()
+            seq = journal.append(writes)
+            _put_items(writes)
+            _JOURNAL_STATE = journal.state()
+            needs_compaction = _JOURNAL_STATE[2] >= JOURNAL_COMPACT_BYTES
+    journal.commit(seq)
+    if needs_compaction:
+        Thread(target=_compact_journal, name="journal-compaction", daemon=True).start()
+    return _written(outcomes, writes)
+
+
+def _written(
+    outcomes: list[tuple[str | None, list[dict[str, object]]]],
+    writes: list[dict[str, object]],
+) -> list[tuple[dict[str, object] | None, list[dict[str, object]]]]:
+    """Remplace chaque phrase écrite par sa version finale dans le lot."""
+    final = {item["phrase"]: item for item in writes}
+    return [
+        (None if phrase is None else final[phrase], candidates)
+        for phrase, candidates in outcomes
+    ]
+
+
+def _encode_response(
+    payload: object,
+    headers: tuple[tuple[str, str], ...] = (),
+    level: int = RESPONSE_COMPRESS_LEVEL,
+) -> _EncodedResponse:
+    started = time.perf_counter()
+    fragments: tuple[bytes, ...] = ()
+    if isinstance(payload, _Fragments):
+        # Mêmes octets que json.dumps(liste), sans réencoder les entrées.
+        body = b"[" + b", ".join(payload.parts) + b"]"
+        if len(body) >= STREAM_MIN_BYTES:
+            fragments = payload.parts
+    else:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    _METRICS.observe("bingo_json_serialize_seconds", time.perf_counter() - started, _SITE_RESPONSE_CACHE)
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    compressed = gzip.compress(body, compresslevel=level, mtime=0)
+    deflated = zlib.compress(body, level)
+    return _EncodedResponse(
+        etag=f'"{digest}"',
+        identity=None if fragments else body,
+        gzip=compressed if len(compressed) < len(body) else None,
+        deflate=deflated if len(deflated) < len(body) else None,
+        headers=headers,
+        fragments=fragments,
+        length=len(body),
+    )
+
+
+def _built_response(
+    build: Callable[[_StoreSnapshot], object | tuple[object, tuple[tuple[str, str], ...]]],
+    snapshot: _StoreSnapshot,
+    level: int = RESPONSE_COMPRESS_LEVEL,
+) -> _EncodedResponse:
+    built = build(snapshot)
+    payload, headers = built if isinstance(built, tuple) else (built, ())
+    return _encode_response(payload, headers, level)
+
+
+def _one_off_response(
+    build: Callable[[_StoreSnapshot], object | tuple[object, tuple[tuple[str, str], ...]]],
+) -> _EncodedResponse:
+    """Réponse d'une requête ponctuelle, construite sans passer par le cache.
+
+    Une clé qui ne se répète guère évincerait du cache les réponses
+    partagées ; elle n'attend pas non plus _CACHE_BUILD_LOCK.
+    """
+    return _built_response(build, _current_snapshot(), ONE_OFF_COMPRESS_LEVEL)
+
+
+def _cached_response(
+    key: str,
+    build: Callable[[_StoreSnapshot], object | tuple[object, tuple[tuple[str, str], ...]]],
+) -> _EncodedResponse:
+    """Renvoie la réponse encodée pour `key`, reconstruite si le magasin a changé.
+
+    `build` reçoit l'instantané courant et renvoie les données, éventuellement
+    accompagnées d'en-têtes sous la forme (données, en-têtes). Aucun verrou du
+    magasin n'est pris ; les reconstructions sont sérialisées par
+    _CACHE_BUILD_LOCK, ce qui laisse les réponses déjà en cache passer.
+    """
+    snapshot = _current_snapshot()
+    with _CACHE_LOCK:
+        cached = _RESPONSE_CACHE.get(key)
+        if cached is not None and cached[0] >= snapshot.version:
+            _RESPONSE_CACHE.move_to_end(key)
+            return cached[1]
+    with _CACHE_BUILD_LOCK:
+        # Une requête concurrente a pu la reconstruire pendant l'attente.
+        with _CACHE_LOCK:
+            cached = _RESPONSE_CACHE.get(key)
+        if cached is not None and cached[0] >= snapshot.version:
+            return cached[1]
+        response = _built_response(build, snapshot)
+        with _CACHE_LOCK:
+            _RESPONSE_CACHE[key] = (snapshot.version, response)
+            _RESPONSE_CACHE.move_to_end(key)
+            while len(_RESPONSE_CACHE) > RESPONSE_CACHE_SIZE:
+                _RESPONSE_CACHE.popitem(last=False)
+        return response
+
+
+class _WriteAdmission:
+    """Contrôle d'admission des POST : seaux à jetons par IP et plafond global.
+
+    Les seaux vivent dans une table LRU bornée ; une IP évincée repart
+    simplement avec un seau plein. Les lectures ne passent jamais par ici.
+    """
+
+    def __init__(
+        self,
+        max_body_bytes: int = POST_MAX_BODY_BYTES,
+        rate: float = POST_RATE_PER_SECOND,
+        burst: int = POST_BURST,
+        max_inflight: int = MAX_INFLIGHT_WRITES,
+    ) -> None:
+        self.max_body_bytes = max_body_bytes
+        self.rate = rate
+        self.burst = burst
+        self.max_inflight = max_inflight
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._inflight = 0
+        self._lock = Lock()
+
+    def take_token(self, client: str) -> float:
+        """Consomme un jeton de `client` ; renvoie 0 ou l'attente (s) avant le prochain."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            tokens, stamp = self._buckets.pop(client, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - stamp) * self.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[client] = (tokens, now)
+            if len(self._buckets) > RATE_LIMIT_TABLE_SIZE:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def enter(self) -> bool:
+        with self._lock:
+            if self.max_inflight and self._inflight >= self.max_inflight:
+                return False
+            self._inflight += 1
+            return True
+
+    def leave(self) -> None:
+        with self._lock:
+            self._inflight -= 1
+
+
+_ADMISSION = _WriteAdmission()
+# Seul take_token() sert : les événements ne touchent pas au magasin.
+_EVENTS_ADMISSION = _WriteAdmission(EVENTS_MAX_BODY_BYTES, EVENTS_RATE_PER_SECOND, EVENTS_BURST, 0)
+
+
+def _sse_message(snapshot: _StoreSnapshot, event: str, payload: Mapping[str, object]) -> bytes:
+    token = _version_token(snapshot)
+    data = json.dumps({"version": token, **payload}, ensure_ascii=False)
+    return f"id: {token}\nevent: {event}\ndata: {data}\n\n".encode("utf-8")
+
+
+def _sse_changes(snapshot: _StoreSnapshot, since: int | None) -> bytes:
+    """Événement qui amène un abonné de la version `since` à `snapshot`."""
+    changed = _changes_since(snapshot, since)
+    if changed is None:
+        return _sse_message(snapshot, "reset", {})
+    return _sse_message(snapshot, "change", {"items": changed})
+
+
+class _SocketSubscriber:
+    """Abonné du mode threaded : socket non bloquante servie par le thread du flux."""
+
+    __slots__ = ("sock", "version", "channel", "pending", "waiting", "closing")
+
+    def __init__(self, sock: socket.socket, version: int, channel: str | None) -> None:
+        self.sock = sock
+        self.version = version
+        # None : changements du magasin ; sinon canal de publish() (salon).
+        self.channel = channel
+        self.pending = bytearray()
+        # Vrai tant que le sélecteur surveille aussi la disponibilité en écriture.
+        self.waiting = False
+        # Vrai si la connexion doit être fermée une fois `pending` envoyé.
+        self.closing = False
+
+
+class _AsyncSubscriber:
+    """Abonné du mode async : les écritures sont confiées à sa boucle asyncio."""
+
+    __slots__ = ("loop", "writer", "version", "channel")
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        writer: asyncio.StreamWriter,
+        version: int,
+        channel: str | None,
+    ) -> None:
+        self.loop = loop
+        self.writer = writer
+        self.version = version
+        self.channel = channel
+
+    def send(self, data: bytes) -> None:
+        try:
+            self.loop.call_soon_threadsafe(self._write, data)
+        except RuntimeError:
+            # Boucle déjà fermée : la connexion part avec elle.
+            pass
+
+    def close(self) -> None:
+        try:
+            self.loop.call_soon_threadsafe(self.writer.close)
+        except RuntimeError:
+            pass
+
+    def _write(self, data: bytes) -> None:
+        transport = self.writer.transport
+        if transport.is_closing():
+            return
+        if transport.get_write_buffer_size() > SSE_MAX_BUFFER_BYTES:
+            # Client trop lent : il se reconnectera avec Last-Event-ID.
+            transport.abort()
+            return
+        self.writer.write(data)
+
+
+class _ChangeFeed:
+    """Diffuse les changements du magasin aux abonnés SSE depuis un seul thread.
+
+    En mode threaded, les connexions sont confiées au thread du flux qui les
+    surveille avec un sélecteur : un abonné inactif ne coûte ni thread ni
+    réveil. En mode async, les abonnés restent sur la boucle asyncio et ne
+    reçoivent que les écritures. Le thread relit aussi le magasin toutes les
+    SSE_POLL_SECONDS pour voir les écritures des autres workers.
+
+    Les abonnés d'un canal (un salon de jeu) ne suivent pas le magasin : ils
+    reçoivent seulement les messages passés à publish().
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._incoming: list[_SocketSubscriber] = []
+        # Messages à diffuser : (canal, données, fermer le canal ensuite).
+        self._outbox: list[tuple[str, bytes, bool]] = []
+        # Arrêt du processus : chaque abonné est déconnecté pour se
+        # reconnecter au successeur.
+        self._closing_all = False
+        self._async: set[_AsyncSubscriber] = set()
+        # Sockets détenues par le flux : le serveur ne doit pas les fermer.
+        self._owned: set[socket.socket] = set()
+        self._count = 0
+        self._pid: int | None = None
+        self._wake_r: socket.socket | None = None
+        self._wake_w: socket.socket | None = None
+        # Réservés au thread du flux.
+        self._sockets: dict[socket.socket, _SocketSubscriber] = {}
+        self._selector: selectors.BaseSelector | None = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def owns(self, sock: socket.socket) -> bool:
+        with self._lock:
+            return sock in self._owned
+
+    def notify(self) -> None:
+        """Signale une publication (appelée par les écrivains, sans attente)."""
+        if self._count and self._pid == os.getpid():
+            self._wake()
+
+    def publish(self, channel: str, data: bytes, close: bool = False) -> None:
+        """Envoie `data` aux abonnés de `channel`, puis les déconnecte si `close`."""
+        if not self._count or self._pid != os.getpid():
+            return
+        with self._lock:
+            self._outbox.append((channel, data, close))
+        self._wake()
+
+    def close_all(self) -> None:
+        """Déconnecte tous les abonnés, présents et à venir (arrêt en douceur)."""
+        with self._lock:
+            self._closing_all = True
+        if self._count and self._pid == os.getpid():
+            self._wake()
+
+    def attach_socket(self, sock: socket.socket, version: int, channel: str | None = None) -> None:
+        with self._lock:
+            self._owned.add(sock)
+            self._incoming.append(_SocketSubscriber(sock, version, channel))
+            self._count += 1
+            self._start()
+        self._wake()
+
+    async def serve_async(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        version: int,
+        channel: str | None = None,
+    ) -> None:
+        """Garde la connexion ouverte jusqu'à sa fermeture par le client."""
+        subscriber = _AsyncSubscriber(asyncio.get_running_loop(), writer, version, channel)
+        with self._lock:
+            self._async.add(subscriber)
+            self._count += 1
+            self._start()
+        # Rattrape une publication faite depuis l'ouverture du flux.
+        self._wake()
+        try:
+            while await reader.read(4096):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            with self._lock:
+                self._async.discard(subscriber)
+                self._count -= 1
+
+    def _start(self) -> None:
+        """Démarre le thread du flux de ce processus (verrou détenu)."""
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        Thread(target=self._run, name="bingo-feed", daemon=True).start()
+
+    def _wake(self) -> None:
+        try:
+            self._wake_w.send(b"\0")
+        except OSError:
+            # Tampon plein : un réveil est déjà en attente.
+            pass
+
+    def _run(self) -> None:
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+        now = time.monotonic()
+        next_poll = now + SSE_POLL_SECONDS
+        next_beat = now + SSE_HEARTBEAT_SECONDS
+        while True:
+            timeout = max(0.0, min(next_poll, next_beat) - time.monotonic()) if self._count else None
+            for key, mask in self._selector.select(timeout):
+                if key.fileobj is self._wake_r:
+                    try:
+                        while self._wake_r.recv(4096):
+                            pass
+                    except OSError:
+                        pass
+                    continue
+                subscriber = key.data
+                if mask & selectors.EVENT_READ and not self._read(subscriber):
+                    continue
+                if mask & selectors.EVENT_WRITE:
+                    self._flush(subscriber)
+            with self._lock:
+                incoming, self._incoming = self._incoming, []
+                outbox, self._outbox = self._outbox, []
+                closing_all = self._closing_all
+                subscribers: list[_SocketSubscriber | _AsyncSubscriber] = list(self._async)
+            for subscriber in incoming:
+                subscriber.sock.setblocking(False)
+                self._sockets[subscriber.sock] = subscriber
+                self._selector.register(subscriber.sock, selectors.EVENT_READ, subscriber)
+            subscribers.extend(self._sockets.values())
+
+            now = time.monotonic()
+            snapshot = _SNAPSHOT
+            if now >= next_poll:
+                next_poll = now + SSE_POLL_SECONDS
+                try:
+                    snapshot = _current_snapshot()
+                except Exception:
+                    # Le thread du flux doit survivre à une relecture ratée.
+                    traceback.print_exc()
+            # Un événement par version de départ : en régime normal, un seul
+            # encodage partagé par tous les abonnés.
+            events: dict[int, bytes] = {}
+            for subscriber in subscribers:
+                if subscriber.channel is None and subscriber.version != snapshot.version:
+                    data = events.get(subscriber.version)
+                    if data is None:
+                        data = events[subscriber.version] = _sse_changes(snapshot, subscriber.version)
+                    subscriber.version = snapshot.version
+                    self._send(subscriber, data)
+            if outbox:
+                channels: dict[str, list[_SocketSubscriber | _AsyncSubscriber]] = {}
+                for subscriber in subscribers:
+                    if subscriber.channel is not None:
+                        channels.setdefault(subscriber.channel, []).append(subscriber)
+                for channel, data, close in outbox:
+                    for subscriber in channels.get(channel, ()):
+                        self._send(subscriber, data)
+                        if close:
+                            self._close(subscriber)
+            if now >= next_beat:
+                for subscriber in subscribers:
+                    self._send(subscriber, b": \n\n")
+                next_beat = now + SSE_HEARTBEAT_SECONDS
+            if closing_all:
+                for subscriber in subscribers:
+                    self._close(subscriber)
+
+    def _send(self, subscriber: _SocketSubscriber | _AsyncSubscriber, data: bytes) -> None:
+        if isinstance(subscriber, _AsyncSubscriber):
+            subscriber.send(data)
+            return
+        if subscriber.sock not in self._sockets:
+            return
+        subscriber.pending += data
+        if len(subscriber.pending) > SSE_MAX_BUFFER_BYTES:
+            # Client trop lent : il se reconnectera avec Last-Event-ID.
+            self._drop(subscriber)
+            return
+        self._flush(subscriber)
+
+    def _read(self, subscriber: _SocketSubscriber) -> bool:
+        """Consomme ce que le client envoie ; False s'il a fermé la connexion."""
+        try:
+            if subscriber.sock.recv(4096):
+                return True
+        except BlockingIOError:
+            return True
+        except OSError:
+            pass
+        self._drop(subscriber)
+        return False
+
+    def _flush(self, subscriber: _SocketSubscriber) -> None:
+        try:
+            sent = subscriber.sock.send(subscriber.pending)
+        except BlockingIOError:
+            sent = 0
+        except OSError:
+            self._drop(subscriber)
+            return
+        del subscriber.pending[:sent]
+        if subscriber.closing and not subscriber.pending:
+            self._drop(subscriber)
+            return
+        waiting = bool(subscriber.pending)
+        if waiting != subscriber.waiting:
+            events = selectors.EVENT_READ | (selectors.EVENT_WRITE if waiting else 0)
+            self._selector.modify(subscriber.sock, events, subscriber)
+            subscriber.waiting = waiting
+
+    def _close(self, subscriber: _SocketSubscriber | _AsyncSubscriber) -> None:
+        if isinstance(subscriber, _AsyncSubscriber):
+            subscriber.close()
+            return
+        subscriber.closing = True
+        if not subscriber.pending:
+            self._drop(subscriber)
+
+    def _drop(self, subscriber: _SocketSubscriber) -> None:
+        if self._sockets.pop(subscriber.sock, None) is None:
+            return
+        self._selector.unregister(subscriber.sock)
+        with self._lock:
+            self._owned.discard(subscriber.sock)
+            self._count -= 1
+        subscriber.sock.close()
+
+
+_FEED = _ChangeFeed()
+
+
+class _PlayerCard:
+    """Grille d'un joueur : cases cochées en bitset, compteurs par ligne.
+
+    Chaque coup met à jour le compteur de sa rangée, de sa colonne et des
+    diagonales qui le traversent : un bingo se détecte en O(1) par coup,
+    sans relire la grille.
+    """
+
+    __slots__ = (
+        "id", "name", "token", "size", "cells", "marks", "seen",
+        "rows", "cols", "diagonal", "anti_diagonal", "lines",
+    )
+
+    def __init__(self, player_id: int, name: str, size: int, cells: list[str | None]) -> None:
+        self.id = player_id
+        self.name = name
+        self.token = secrets.token_urlsafe(16)
+        self.size = size
+        self.cells = cells
+        self.marks = 0
+        # Cases cochées au moins une fois : seul le premier coup est compté
+        # dans les statistiques, pas chaque bascule.
+        self.seen = 0
+        self.rows = [0] * size
+        self.cols = [0] * size
+        self.diagonal = 0
+        self.anti_diagonal = 0
+        # Lignes complètes (rangées, colonnes, diagonales).
+        self.lines = 0
+        for index, cell in enumerate(cells):
+            if cell is None:
+                self.set(index, True)
+
+    def set(self, index: int, marked: bool) -> bool:
+        """Coche ou décoche la case `index` ; False si elle était déjà dans cet état."""
+        bit = 1 << index
+        if bool(self.marks & bit) == marked:
+            return False
+        self.marks ^= bit
+        step = 1 if marked else -1
+        row, col = divmod(index, self.size)
+        self.rows[row] = self._count(self.rows[row], step)
+        self.cols[col] = self._count(self.cols[col], step)
+        if row == col:
+            self.diagonal = self._count(self.diagonal, step)
+        if row + col == self.size - 1:
+            self.anti_diagonal = self._count(self.anti_diagonal, step)
+        return True
+
+    def _count(self, count: int, step: int) -> int:
+        # Une ligne se complète en atteignant `size` et se défait en le quittant.
+        if count == self.size:
+            self.lines -= 1
+        count += step
+        if count == self.size:
+            self.lines += 1
+        return count
+
+    def completed(self) -> list[str]:
+        """Noms des lignes complètes, pour l'affichage (O(taille))."""
+        names = [f"row:{row}" for row, count in enumerate(self.rows) if count == self.size]
+        names += [f"col:{col}" for col, count in enumerate(self.cols) if count == self.size]
+        if self.diagonal == self.size:
+            names.append("diagonal")
+        if self.anti_diagonal == self.size:
+            names.append("anti-diagonal")
+        return names
+
+    def summary(self) -> dict[str, object]:
+        return {"id": self.id, "name": self.name, "marked": self.marks.bit_count(), "lines": self.lines}
+
+
+class _Room:
+    """Salon de jeu : chaque joueur a sa grille, tirée de la graine du salon."""
+
+    __slots__ = ("id", "size", "free", "seed", "players", "winners", "version", "touched", "lock")
+
+    def __init__(self, room_id: str, size: int, free: bool) -> None:
+        self.id = room_id
+        self.size = size
+        self.free = free
+        self.seed = secrets.token_urlsafe(6)
+        self.players: list[_PlayerCard] = []
+        # Identifiants des joueurs dans l'ordre de leur premier bingo.
+        self.winners: list[int] = []
+        self.version = 0
+        self.touched = time.monotonic()
+        self.lock = Lock()
+
+    def state(self) -> dict[str, object]:
+        return {
+            "room": self.id,
+            "size": self.size,
+            "free": self.free,
+            "version": self.version,
+            "players": [player.summary() for player in self.players],
+            "winners": list(self.winners),
+        }
+
+    def event(self, name: str, payload: Mapping[str, object]) -> bytes:
+        data = json.dumps({"version": self.version, **payload}, ensure_ascii=False)
+        return f"id: {self.version}\nevent: {name}\ndata: {data}\n\n".encode("utf-8")
+
+
+class _RoomRegistry:
+    """Salons en mémoire, du moins au plus récemment actif.
+
+    Les salons inactifs depuis ROOM_IDLE_SECONDS sont évincés au fil des
+    accès et leurs abonnés SSE déconnectés. Au-delà de ROOM_MAX_ROOMS salons
+    actifs, la création est refusée plutôt que d'évincer une partie en cours.
+    """
+
+    def __init__(self) -> None:
+        self._rooms: OrderedDict[str, _Room] = OrderedDict()
+        self._lock = Lock()
+        # Faux avec --workers > 1 : un salon ne vit que dans un processus.
+        self.enabled = True
+
+    def __len__(self) -> int:
+        return len(self._rooms)
+
+    def create(self, size: int, free: bool) -> _Room | None:
+        with self._lock:
+            self._evict_idle()
+            if len(self._rooms) >= ROOM_MAX_ROOMS:
+                return None
+            room = _Room(secrets.token_urlsafe(6), size, free)
+            self._rooms[room.id] = room
+        return room
+
+    def get(self, room_id: str) -> _Room | None:
+        """Salon `room_id`, marqué comme actif ; None s'il n'existe pas ou plus."""
+        with self._lock:
+            self._evict_idle()
+            room = self._rooms.get(room_id)
+            if room is not None:
+                room.touched = time.monotonic()
+                self._rooms.move_to_end(room_id)
+        return room
+
+    def _evict_idle(self) -> None:
+        """Évince les salons inactifs (verrou détenu), en O(salons évincés)."""
+        limit = time.monotonic() - ROOM_IDLE_SECONDS
+        while self._rooms:
+            room = next(iter(self._rooms.values()))
+            if room.touched > limit:
+                break
+            del self._rooms[room.id]
+            _FEED.publish(room.id, room.event("closed", {}), close=True)
+
+
+_ROOMS = _RoomRegistry()
+
+
+class _CounterShard:
+    __slots__ = ("lock", "counts")
+
+    def __init__(self) -> None:
+        self.lock = Lock()
+        self.counts: dict[str, int] = {}
+
+
+class _PhraseEvents:
+    """Compteurs des cases cochées, hors du chemin d'écriture du magasin.
+
+    Chaque thread incrémente la tranche de compteurs qui lui est attribuée :
+    le verrou n'est disputé qu'avec les threads de la même tranche et avec
+    le thread de vidage. Toutes les EVENTS_FLUSH_SECONDS, celui-ci échange
+    les dictionnaires des tranches, ajoute leur somme en une ligne JSON au
+    segment du jour (O_APPEND puis fsync) et relit les lignes ajoutées par
+    les autres workers. Les totaux sont rangés dans un anneau de tranches
+    de EVENTS_BUCKET_SECONDS : une fenêtre ne somme que ses tranches.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self._shards = [_CounterShard() for _ in range(EVENTS_SHARDS)]
+        self._local = local()
+        self._assigned = 0
+        self._assign_lock = Lock()
+        # Vidage et relecture des segments (entrées-sorties) ; le second
+        # verrou, bref, protège l'anneau et le cache des classements.
+        self._flush_lock = Lock()
+        self._lock = Lock()
+        self._pid: int | None = None
+        slots = EVENTS_RETENTION_SECONDS // EVENTS_BUCKET_SECONDS
+        # Emplacement i : (début de tranche, phrase -> total) ou None.
+        self._ring: list[tuple[int, dict[str, int]] | None] = [None] * slots
+        # Octets déjà lus de chaque segment.
+        self._offsets: dict[str, int] = {}
+        self._generation = 0
+        self._top_cache: dict[tuple[str, int], tuple[tuple[int, int], list[dict[str, object]]]] = {}
+
+    def record(self, counts: Mapping[str, int]) -> None:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            with self._assign_lock:
+                shard = self._shards[self._assigned % EVENTS_SHARDS]
+                self._assigned += 1
+            self._local.shard = shard
+        with shard.lock:
+            target = shard.counts
+            for phrase, count in counts.items():
+                target[phrase] = target.get(phrase, 0) + count
+        if self._pid != os.getpid():
+            self._start()
+
+    def top(self, window: str, limit: int) -> list[dict[str, object]]:
+        """Phrases les plus cochées sur la fenêtre, mémorisées jusqu'au vidage suivant."""
+        if self._pid != os.getpid():
+            self._start()
+        now = int(time.time())
+        with self._lock:
+            stamp = (self._generation, now // EVENTS_BUCKET_SECONDS)
+            cached = self._top_cache.get((window, limit))
+            if cached is not None and cached[0] == stamp:
+                return cached[1]
+            since = now - EVENTS_WINDOWS[window]
+            totals: dict[str, int] = {}
+            for slot in self._ring:
+                # Une tranche compte dès qu'elle chevauche la fenêtre.
+                if slot is None or slot[0] + EVENTS_BUCKET_SECONDS <= since:
+                    continue
+                for phrase, count in slot[1].items():
+                    totals[phrase] = totals.get(phrase, 0) + count
+            ranked = heapq.nlargest(limit, totals.items(), key=lambda pair: (pair[1], pair[0]))
+            result = [{"phrase": phrase, "count": count} for phrase, count in ranked]
+            self._top_cache[(window, limit)] = (stamp, result)
+        return result
+
+    def flush(self) -> None:
+        """Verse les compteurs en attente sur disque, puis relit les segments."""
+        with self._flush_lock:
+            batch: dict[str, int] = {}
+            for shard in self._shards:
+                with shard.lock:
+                    counts, shard.counts = shard.counts, {}
+                for phrase, count in counts.items():
+                    batch[phrase] = batch.get(phrase, 0) + count
+            if batch:
+                bucket = int(time.time()) // EVENTS_BUCKET_SECONDS * EVENTS_BUCKET_SECONDS
+                line = json.dumps({"t": bucket, "counts": batch}, ensure_ascii=False) + "\n"
+                self._append(self._segment(bucket), line.encode("utf-8"))
+            self._refresh()
+
+    def _start(self) -> None:
+        """Charge les segments et démarre le thread de vidage de ce processus."""
+        with self._flush_lock:
+            if self._pid == os.getpid():
+                return
+            self._refresh()
+            self._pid = os.getpid()
+        Thread(target=self._run, name="bingo-events", daemon=True).start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(EVENTS_FLUSH_SECONDS)
+            try:
+                self.flush()
+            except OSError:
+                traceback.print_exc()
+
+    def _segment(self, bucket: int) -> Path:
+        return self.directory / f"events-{time.strftime('%Y%m%d', time.gmtime(bucket))}.jsonl"
+
+    def _append(self, path: Path, data: bytes) -> None:
+        # Une seule écriture en O_APPEND : les lignes des workers ne se mêlent pas.
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        _METRICS.inc("bingo_store_bytes_written_total", _FILE_EVENTS, len(data))
+
+    def _refresh(self) -> None:
+        """Ajoute à l'anneau les lignes nouvelles des segments (verrou de vidage détenu)."""
+        oldest = int(time.time()) - EVENTS_RETENTION_SECONDS
+        expired = self._segment(oldest - 86400).name
+        try:
+            paths = sorted(self.directory.glob("events-*.jsonl"))
+        except OSError:
+            paths = []
+        entries: list[tuple[int, dict[str, int]]] = []
+        for path in paths:
+            if path.name <= expired:
+                # Segment entièrement hors rétention : n'importe quel worker le supprime.
+                path.unlink(missing_ok=True)
+                self._offsets.pop(path.name, None)
+                continue
+            offset = self._offsets.get(path.name, 0)
+            try:
+                with path.open("rb") as handle:
+                    handle.seek(offset)
+                    data = handle.read()
+            except OSError:
+                continue
+            # Une ligne sans fin (écriture en cours) sera relue au tour suivant.
+            end = data.rfind(b"\n") + 1
+            if not end:
+                continue
+            self._offsets[path.name] = offset + end
+            for raw in data[:end].splitlines():
+                try:
+                    entry = json.loads(raw)
+                    bucket, counts = int(entry["t"]), entry["counts"]
+                except (ValueError, KeyError, TypeError):
+                    continue
+                if bucket >= oldest and isinstance(counts, dict):
+                    entries.append((bucket, counts))
+        if entries:
+            with self._lock:
+                for bucket, counts in entries:
+                    self._add(bucket, counts)
+                self._generation += 1
+
+    def _add(self, bucket: int, counts: Mapping[str, int]) -> None:
+        index = bucket // EVENTS_BUCKET_SECONDS % len(self._ring)
+        slot = self._ring[index]
+        if slot is None or slot[0] < bucket:
+            # Emplacement libre ou d'un tour précédent de l'anneau.
+            slot = self._ring[index] = (bucket, {})
+        elif slot[0] > bucket:
+            return
+        totals = slot[1]
+        for phrase, count in counts.items():
+            if isinstance(count, int):
+                totals[phrase] = totals.get(phrase, 0) + count
+
+
+_EVENTS = _PhraseEvents(EVENTS_DIR)
+
+
+def _accepted_encodings(header: str) -> set[str]:
+    accepted: set[str] = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(name)
+    return accepted
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # Comparaison faible (RFC 9110 §13.1.2) : on ignore le préfixe W/ et le
+    # suffixe de codage ajouté aux variantes compressées.
+    base = etag.strip('"')
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        candidate = candidate.strip('"')
+        if candidate == base or candidate.rsplit("-", 1)[0] == base:
+            return True
+    return False
+
+
+def _is_build_file(path: str) -> bool:
+    """Vrai pour un fichier haché de `build`, servi comme immuable."""
+    try:
+        relative = Path(path).relative_to(BUILD_DIR).as_posix()
+    except ValueError:
+        return False
+    return _BUILD_HASHED_RE.match(relative) is not None
+
+
+def _metrics_route(path: str) -> str:
+    """Étiquette de route bornée : les phrases et fichiers ne créent pas de séries."""
+    if path in METRICS_ROUTES:
+        return path
+    if path.startswith("/api/argumentaires/"):
+        return "/api/argumentaires/{phrase}"
+    if path == "/api/rooms" or path.startswith("/api/rooms/"):
+        return "/api/rooms"
+    if path.startswith("/api/"):
+        return "/api/other"
+    return "static"
+
+
+class _StaticAsset(NamedTuple):
+    mtime_ns: int
+    size: int
+    content_type: str
+    etag: str
+    last_modified: str
+    identity: bytes
+    gzip: bytes | None
+
+
+# Fichiers du site gardés en mémoire (identité + gzip), par chemin absolu, avec
+# l'instant (monotonic) de la dernière vérification de leur mtime. Les moins
+# récemment servis sont évincés au-delà de STATIC_CACHE_MAX_ENTRIES.
+_STATIC_CACHE: OrderedDict[str, tuple[float, _StaticAsset]] = OrderedDict()
+_STATIC_LOCK = Lock()
+
+
+def _is_site_file(path: str) -> bool:
+    """Page ou fichier du site : à la racine, ou dans l'instantané static-api/."""
+    target = Path(path)
+    return target.parent == BASE_DIR or BUILD_DIR in target.parents
+
+
+def _is_private_file(path: str) -> bool:
+    """Fichiers d'état du serveur : jamais servis, bien qu'ils soient sous BASE_DIR."""
+    target = Path(path)
+    if target == EVENTS_DIR or EVENTS_DIR in target.parents:
+        return True
+    if target.parent != BASE_DIR:
+        return False
+    for private in (
+        JOURNAL_PATH, JOURNAL_COMPACTING_PATH, STORE_LOCK_PATH, STARTUP_STATE_PATH, SQLITE_DB_PATH,
+    ):
+        # Avec leurs variantes : .tmp, -wal, -shm...
+        if target.name == private.name or target.name.startswith((f"{private.name}.", f"{private.name}-")):
+            return True
+    # Fichiers temporaires de réécriture de argumentaires.json.
+    return target.name.startswith(f"{JSON_DB_PATH.name}.")
+
+
+def _load_static_asset(path: str, content_type: str) -> _StaticAsset | None:
+    """Renvoie l'asset en cache, rechargé si son mtime ou sa taille a changé."""
+    now = time.monotonic()
+    with _STATIC_LOCK:
+        cached = _STATIC_CACHE.get(path)
+        if cached is not None:
+            _STATIC_CACHE.move_to_end(path)
+    if cached is not None and now - cached[0] < STATIC_RECHECK_SECONDS:
+        return cached[1]
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    if stat.st_size > STATIC_CACHE_MAX_BYTES:
+        return None
+    if (
+        cached is not None
+        and cached[1].mtime_ns == stat.st_mtime_ns
+        and cached[1].size == stat.st_size
+    ):
+        with _STATIC_LOCK:
+            if path in _STATIC_CACHE:
+                _STATIC_CACHE[path] = (now, cached[1])
+        return cached[1]
+
+    try:
+        with open(path, "rb") as handle:
+            body = handle.read()
+    except OSError:
+        return None
+    compressed = gzip.compress(body, compresslevel=9, mtime=0)
+    asset = _StaticAsset(
+        mtime_ns=stat.st_mtime_ns,
+        size=stat.st_size,
+        content_type=content_type,
+        etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+        last_modified=formatdate(stat.st_mtime, usegmt=True),
+        identity=body,
+        gzip=compressed if len(compressed) < len(body) else None,
+    )
+    with _STATIC_LOCK:
+        _STATIC_CACHE[path] = (now, asset)
+        _STATIC_CACHE.move_to_end(path)
+        while len(_STATIC_CACHE) > STATIC_CACHE_MAX_ENTRIES:
+            _STATIC_CACHE.popitem(last=False)
+    return asset
+
+
+def _not_modified_since(header: str, asset: _StaticAsset) -> bool:
+    if not header:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since is None:
+        return False
+    return int(since.timestamp()) >= asset.mtime_ns // 1_000_000_000
+
+
+class RequestHandler(SimpleHTTPRequestHandler):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=str(BASE_DIR), **kwargs)
+
+    def end_headers(self):
+        if self.path.startswith("/api/"):
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.send_header("Access-Control-Allow-Headers", "Content-Type, Last-Event-ID")
+            self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
+            self.send_header(
+                "Access-Control-Expose-Headers",
+                "ETag, X-Next-Cursor, Link, Retry-After, X-Store-Version",
+            )
+        super().end_headers()
+
+    def handle_one_request(self) -> None:
+        self._response_status = None
+        started = time.perf_counter()
+        try:
+            super().handle_one_request()
+        finally:
+            # Rien à compter si la connexion s'est fermée sans requête.
+            if self._response_status is not None:
+                route = _metrics_route(urlparse(getattr(self, "path", "")).path)
+                method = self.command if self.command in METRICS_METHODS else "other"
+                _METRICS.inc(
+                    "bingo_http_requests_total",
+                    (("route", route), ("method", method), ("status", str(self._response_status))),
+                )
+                _METRICS.observe(
+                    "bingo_http_request_duration_seconds",
+                    time.perf_counter() - started,
+                    (("route", route), ("method", method)),
+                )
+
+    def send_response(self, code, message=None):
+        self._response_status = int(code)
+        super().send_response(code, message)
+
+    def do_OPTIONS(self):
+        self.send_response(HTTPStatus.NO_CONTENT)
+        self.end_headers()
+
+    def do_GET(self):  # noqa: N802
+        parsed = urlparse(self.path)
+        if parsed.path == "/api/argumentaires":
+            self._handle_get_argumentaires(parsed.query)
+        elif parsed.path == "/api/search":
+            self._handle_search(parsed.query)
+        elif parsed.path == "/api/board":
+            self._handle_get_board(parsed.query)
+        elif parsed.path == "/api/duplicates":
+            self._handle_duplicates()
+        elif parsed.path == "/api/stats/top":
+            self._handle_stats_top(parsed.query)
+        elif parsed.path == "/api/metrics":
+            self._handle_metrics()
+        elif parsed.path == "/api/changes/stream":
+            self._handle_stream(parsed.query)
+        elif parsed.path.startswith("/api/rooms/"):
+            self._handle_get_room(parsed.path[len("/api/rooms/"):])
+        elif parsed.path.startswith("/api/argumentaires/"):
+            self._handle_get_argumentaire(unquote(parsed.path[len("/api/argumentaires/"):]))
+        elif not self._send_static_asset():
+            super().do_GET()
+
+    def do_HEAD(self):  # noqa: N802
+        if not self._send_static_asset(head_only=True):
+            super().do_HEAD()
+
+    def _static_asset_path(self) -> str | None:
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            # Sans « / » final, SimpleHTTPRequestHandler redirige : on le laisse faire.
+            if not urlparse(self.path).path.endswith("/"):
+                return None
+            path = os.path.join(path, "index.html")
+        if (
+            not path.endswith(STATIC_CACHE_SUFFIXES)
+            or not _is_site_file(path)
+            or not os.path.isfile(path)
+        ):
+            return None
+        return path
+
+    def _send_static_asset(self, head_only: bool = False) -> bool:
+        """Sert un fichier du site depuis le cache mémoire ; False s'il n'y est pas éligible.
+
+        Les fichiers d'état du serveur reçoivent ici un 404, avant le repli
+        sur SimpleHTTPRequestHandler.
+        """
+        if _is_private_file(self.translate_path(self.path)):
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return True
+        path = self._static_asset_path()
+        if path is None:
+            return False
+        asset = _load_static_asset(path, self.guess_type(path))
+        if asset is None:
+            return False
+
+        cache_control = (
+            "no-cache"
+            if path.endswith((".html", ".json"))
+            else f"public, max-age={STATIC_MAX_AGE}"
+        )
+        if _is_build_file(path):
+            cache_control = "public, max-age=31536000, immutable"
+        if_none_match = self.headers.get("If-None-Match")
+        if (
+            _etag_matches(if_none_match, asset.etag)
+            if if_none_match is not None
+            else _not_modified_since(self.headers.get("If-Modified-Since", ""), asset)
+        ):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", asset.etag)
+            self.send_header("Last-Modified", asset.last_modified)
+            self.send_header("Cache-Control", cache_control)
+            self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            return True
+
+        accepted = _accepted_encodings(self.headers.get("Accept-Encoding", ""))
+        body = asset.identity
+        etag = asset.etag
+        use_gzip = asset.gzip is not None and ("gzip" in accepted or "*" in accepted)
+        if use_gzip:
+            body = asset.gzip
+            etag = f'"{asset.etag[1:-1]}-gzip"'
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", asset.content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", asset.last_modified)
+        self.send_header("Cache-Control", cache_control)
+        self.send_header("Vary", "Accept-Encoding")
+        self.end_headers()
+        if not head_only:
+            self.wfile.write(body)
+        return True
+
+    def copyfile(self, source, outputfile):
+        # Fichiers hors cache : envoi direct du noyau vers la socket (sendfile).
+        if self.connection is not None and hasattr(os, "sendfile"):
+            outputfile.flush()
+            self.connection.sendfile(source)
+        else:
+            super().copyfile(source, outputfile)
+
+    def do_POST(self):  # noqa: N802
+        parsed = urlparse(self.path)
+        if parsed.path == "/api/events":
+            # Compteurs en mémoire : ni admission des écritures, ni DB_LOCK.
+            self._handle_post_events()
+            return
+        if parsed.path == "/api/rooms" or parsed.path.startswith("/api/rooms/"):
+            # Les salons ne touchent pas au magasin : pas d'admission des écritures.
+            self._handle_post_room(parsed.path)
+            return
+        if parsed.path not in WRITE_ROUTES:
+            self.send_error(HTTPStatus.NOT_FOUND, "Endpoint inconnu")
+            return
+        bulk = parsed.path == "/api/argumentaires/bulk"
+        params = parse_qs(parsed.query)
+        duplicates = params["duplicates"][0] if "duplicates" in params else "allow"
+        if duplicates not in DUPLICATE_MODES:
+            self._reject_write(
+                HTTPStatus.BAD_REQUEST,
+                f"'duplicates' accepte : {', '.join(DUPLICATE_MODES)}",
+            )
+            return
+        if not self._admit_write(BULK_MAX_BODY_BYTES if bulk else _ADMISSION.max_body_bytes):
+            return
+        try:
+            if bulk:
+                self._handle_post_bulk(duplicates)
+            else:
+                self._handle_post_argumentaire(duplicates)
+        finally:
+            _ADMISSION.leave()
+
+    def _admit_write(self, max_body_bytes: int) -> bool:
+        """Refuse la requête avant de lire son corps si elle doit être délestée.
+
+        En cas de refus, le corps reste non lu : la connexion est fermée.
+        """
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._reject_write(HTTPStatus.BAD_REQUEST, "Content-Length invalide")
+            return False
+        if length > max_body_bytes:
+            self._reject_write(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                f"Corps limité à {max_body_bytes} octets",
+            )
+            return False
+        if not self._take_token(_ADMISSION):
+            return False
+        if not _ADMISSION.enter():
+            self._reject_write(
+                HTTPStatus.SERVICE_UNAVAILABLE,
+                "Serveur saturé en écriture, réessayez plus tard",
+                retry_after=1,
+            )
+            return False
+        return True
+
+    def _take_token(self, admission: _WriteAdmission) -> bool:
+        """Consomme un jeton du seau de l'IP cliente ; sinon répond 429."""
+        wait = admission.take_token(self.client_address[0])
+        if wait:
+            self._reject_write(
+                HTTPStatus.TOO_MANY_REQUESTS,
+                "Trop d'envois, réessayez plus tard",
+                retry_after=wait,
+            )
+            return False
+        return True
+
+    def _reject_write(
+        self,
+        status: HTTPStatus,
+        message: str,
+        retry_after: float | None = None,
+    ) -> None:
+        self.close_connection = True
+        headers = [("Connection", "close")]
+        if retry_after is not None:
+            headers.append(("Retry-After", str(max(1, math.ceil(retry_after)))))
+        self._send_json(status, {"error": message}, headers)
+
+    def _handle_get_argumentaires(self, query: str) -> None:
+        params = parse_qs(query)
+        if "since" in params:
+            self._handle_changes(params)
+            return
+        if not params.keys() & {"limit", "cursor", "fields", "q", "sources"}:
+            self._send_cached(_cached_response("argumentaires", _list_response))
+            return
+
+        try:
+            limit = None
+            if "limit" in params:
+                limit = int(params["limit"][0])
+                if not 1 <= limit <= PAGE_MAX_LIMIT:
+                    raise ValueError
+            elif "cursor" in params:
+                limit = PAGE_MAX_LIMIT
+        except ValueError:
+            self._send_json(
+                HTTPStatus.BAD_REQUEST,
+                {"error": f"'limit' doit être un entier entre 1 et {PAGE_MAX_LIMIT}"},
+            )
+            return
+
+        cursor = params["cursor"][0] if "cursor" in params else None
+        fields = ITEM_FIELDS
+        if "fields" in params:
+            requested = {
+                name.strip()
+                for value in params["fields"]
+                for name in value.split(",")
+                if name.strip()
+            }
+            unknown = requested - set(ITEM_FIELDS)
+            if unknown or not requested:
+                self._send_json(
+                    HTTPStatus.BAD_REQUEST,
+                    {"error": f"'fields' accepte : {', '.join(ITEM_FIELDS)}"},
+                )
+                return
+            fields = tuple(name for name in ITEM_FIELDS if name in requested)
+        text = params["q"][0].strip() if "q" in params else ""
+        source_mode = params["sources"][0] if "sources" in params else "inline"
+        if source_mode not in SOURCE_MODES:
+            self._send_json(
+                HTTPStatus.BAD_REQUEST,
+                {"error": f"'sources' accepte : {', '.join(SOURCE_MODES)}"},
+            )
+            return
+        source_refs = source_mode == "ref"
+
+        canonical = {"fields": ",".join(fields)}
+        if limit is not None:
+            canonical["limit"] = str(limit)
+        if cursor is not None:
+            canonical["cursor"] = cursor
+        if text:
+            canonical["q"] = text
+        if source_refs:
+            canonical["sources"] = source_mode
+
+        def build(snapshot: _StoreSnapshot) -> tuple[object, tuple[tuple[str, str], ...]]:
+            page, next_cursor = _page_items(snapshot, limit, cursor, fields, text, source_refs)
+            if next_cursor is None:
+                return page, _version_headers(snapshot)
+            next_query = urlencode({**canonical, "cursor": next_cursor})
+            return page, _version_headers(snapshot) + (
+                ("X-Next-Cursor", next_cursor),
+                ("Link", f'</api/argumentaires?{next_query}>; rel="next"'),
+            )
+
+        try:
+            if cursor is not None or text:
+                response = _one_off_response(build)
+            else:
+                response = _cached_response(f"argumentaires?{urlencode(canonical)}", build)
+        except ValueError as exc:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(exc)})
+            return
+        self._send_cached(response)
+
+    def _handle_changes(self, params: dict[str, list[str]]) -> None:
+        """`?since=<version>` : seules les entrées modifiées depuis `version`.
+
+        Si le journal des changements ne remonte pas jusque-là (version trop
+        ancienne ou venue d'un autre processus), la réponse porte `reset` et
+        le client recharge la liste complète.
+        """
+        if params.keys() != {"since"}:
+            self._send_json(
+                HTTPStatus.BAD_REQUEST,
+                {"error": "'since' ne se combine pas avec d'autres paramètres"},
+            )
+            return
+        try:
+            since = _parse_version_token(params["since"][0])
+        except ValueError as exc:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(exc)})
+            return
+
+        def build(snapshot: _StoreSnapshot) -> tuple[object, tuple[tuple[str, str], ...]]:
+            token = _version_token(snapshot)
+            changed = _changes_since(snapshot, since)
+            if changed is None:
+                return {"version": token, "reset": True}, _version_headers(snapshot)
+            return {"version": token, "items": changed}, _version_headers(snapshot)
+
+        # Hors cache : chaque client a sa propre version de départ, une clé
+        # par version évincerait les réponses partagées du LRU.
+        self._send_cached(_one_off_response(build))
+
+    def _handle_stream(self, query: str) -> None:
+        """Flux SSE des changements, repris après `Last-Event-ID` ou `?since=`.
+
+        Après l'envoi des en-têtes, la connexion est confiée à _FEED et le
+        thread (ou la tâche asyncio) qui l'a servie est libéré.
+        """
+        params = parse_qs(query)
+        token = self.headers.get("Last-Event-ID") or (params["since"][0] if "since" in params else "")
+        if not self._feed_available():
+            return
+        snapshot = _current_snapshot()
+        try:
+            opening = (
+                _sse_changes(snapshot, _parse_version_token(token))
+                if token
+                else _sse_message(snapshot, "ready", {})
+            )
+        except ValueError as exc:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(exc)})
+            return
+        self._open_event_stream(opening)
+        self._subscribe(snapshot.version)
+
+    def _feed_available(self) -> bool:
+        if len(_FEED) < SSE_MAX_SUBSCRIBERS:
+            return True
+        self._reject_write(
+            HTTPStatus.SERVICE_UNAVAILABLE,
+            "Trop d'abonnés au flux, réessayez plus tard",
+            retry_after=SSE_RETRY_MS / 1000,
+        )
+        return False
+
+    def _open_event_stream(self, opening: bytes) -> None:
+        self.close_connection = True
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        # Pas de mise en tampon par un éventuel proxy nginx.
+        self.send_header("X-Accel-Buffering", "no")
+        self.end_headers()
+        self.wfile.write(f"retry: {SSE_RETRY_MS}\n\n".encode("ascii") + opening)
+
+    def _subscribe(self, version: int, channel: str | None = None) -> None:
+        _FEED.attach_socket(self.connection, version, channel)
+
+    def _rooms_available(self) -> bool:
+        if _ROOMS.enabled:
+            return True
+        self._reject_write(
+            HTTPStatus.NOT_IMPLEMENTED,
+            "Salons indisponibles avec --workers > 1 : une partie vit dans un seul processus",
+        )
+        return False
+
+    def _handle_get_room(self, path: str) -> None:
+        if not self._rooms_available():
+            return
+        room_id, _, action = path.partition("/")
+        room = _ROOMS.get(room_id)
+        if room is None or action not in ("", "stream"):
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "Salon introuvable"})
+            return
+        if action == "":
+            with room.lock:
+                state = room.state()
+            self._send_json(HTTPStatus.OK, state, [("Cache-Control", "no-store")])
+            return
+        if not self._feed_available():
+            return
+        with room.lock:
+            opening = room.event("state", room.state())
+        self._open_event_stream(opening)
+        self._subscribe(0, room.id)
+
+    def _json_object_body(self, max_bytes: int) -> dict[str, object] | None:
+        """Objet JSON d'un petit corps de requête ; None si l'erreur est déjà envoyée."""
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._reject_write(HTTPStatus.BAD_REQUEST, "Content-Length invalide")
+            return None
+        if length > max_bytes:
+            self._reject_write(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                f"Corps limité à {max_bytes} octets",
+            )
+            return None
+        try:
+            payload = json.loads(self.rfile.read(length)) if length else {}
+        except ValueError:
+            payload = None
+        if not isinstance(payload, dict):
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": "Objet JSON attendu"})
+            return None
+        return payload
+
+    def _handle_post_room(self, path: str) -> None:
+        if not self._rooms_available():
+            return
+        # Créer ou rejoindre un salon consomme un jeton du seau des POST, pour
+        # qu'un seul client ne puisse pas occuper les ROOM_MAX_ROOMS salons ;
+        # les coups, authentifiés par le jeton du joueur, restent libres.
+        if (path == "/api/rooms" or path.endswith("/join")) and not self._take_token(_ADMISSION):
+            return
+        payload = self._json_object_body(ROOM_MAX_BODY_BYTES)
+        if payload is None:
+            return
+        if path == "/api/rooms":
+            self._handle_create_room(payload)
+            return
+        room_id, _, action = path[len("/api/rooms/"):].partition("/")
+        room = _ROOMS.get(room_id)
+        if room is None or action not in ("join", "mark"):
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "Salon introuvable"})
+        elif action == "join":
+            self._handle_join_room(room, payload)
+        else:
+            self._handle_mark(room, payload)
+
+    def _handle_post_events(self) -> None:
+        """Compte des cases cochées : {"phrase": ...} ou {"events": [{"phrase": ...}, ...]}.
+
+        Seules les phrases connues du magasin sont comptées ; les cases
+        décochées (`"marked": false`) sont ignorées.
+        """
+        if not self._take_token(_EVENTS_ADMISSION):
+            return
+        payload = self._json_object_body(EVENTS_MAX_BODY_BYTES)
+        if payload is None:
+            return
+        events = payload["events"] if "events" in payload else [payload]
+        if not isinstance(events, list) or not 1 <= len(events) <= EVENTS_MAX_BATCH:
+            self._send_json(
+                HTTPStatus.BAD_REQUEST,
+                {"error": f"'events' doit être une liste de 1 à {EVENTS_MAX_BATCH} événements"},
+            )
+            return
+        snapshot = _current_snapshot()
+        counts: dict[str, int] = {}
+        for event in events:
+            if not isinstance(event, dict) or event.get("marked", True) is False:
+                continue
+            phrase = event.get("phrase")
+            if isinstance(phrase, str) and phrase not in snapshot.items:
+                phrase = snapshot.phrase_index.get(_phrase_key(phrase))
+            if isinstance(phrase, str) and phrase in snapshot.items:
+                counts[phrase] = counts.get(phrase, 0) + 1
+        accepted = sum(counts.values())
+        if counts:
+            _EVENTS.record(counts)
+            _METRICS.inc("bingo_phrase_events_total", value=accepted)
+        self._send_json(
+            HTTPStatus.ACCEPTED,
+            {"accepted": accepted, "ignored": len(events) - accepted},
+        )
+
+    def _handle_stats_top(self, query: str) -> None:
+        params = parse_qs(query)
+        window = params["window"][0] if "window" in params else "24h"
+        if window not in EVENTS_WINDOWS:
+            self._send_json(
+                HTTPStatus.BAD_REQUEST,
+                {"error": f"'window' doit valoir {', '.join(EVENTS_WINDOWS)}"},
+            )
+            return
+        try:
+            limit = int(params["limit"][0]) if "limit" in params else EVENTS_TOP_DEFAULT
+            if not 1 <= limit <= EVENTS_TOP_MAX:
+                raise ValueError
+        except ValueError:
+            self._send_json(
+                HTTPStatus.BAD_REQUEST,
+                {"error": f"'limit' doit être un entier entre 1 et {EVENTS_TOP_MAX}"},
+            )
+            return
+        self._send_json(
+            HTTPStatus.OK,
+            {"window": window, "items": _EVENTS.top(window, limit)},
+            [("Cache-Control", f"max-age={int(EVENTS_FLUSH_SECONDS)}")],
+        )
+
+    def _handle_create_room(self, payload: dict[str, object]) -> None:
+        size = payload.get("size", BOARD_DEFAULT_SIZE)
+        # type() et non isinstance() : ni booléen ni flottant (3.0 == 3).
+        if type(size) is not int or size not in BOARD_SIZES:
+            self._send_json(
+                HTTPStatus.BAD_REQUEST,
+                {"error": f"'size' doit valoir {', '.join(map(str, BOARD_SIZES))}"},
+            )
+            return
+        free = payload.get("free", True)
+        if not isinstance(free, bool):
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": "'free' doit être un booléen"})
+            return
+        room = _ROOMS.create(size, free and size % 2 == 1)
+        if room is None:
+            self._send_json(
+                HTTPStatus.SERVICE_UNAVAILABLE,
+                {"error": "Trop de salons ouverts, réessayez plus tard"},
+                [("Retry-After", "60")],
+            )
+            return
+        with room.lock:
+            state = room.state()
+        self._send_json(HTTPStatus.CREATED, state)
+
+    def _handle_join_room(self, room: _Room, payload: dict[str, object]) -> None:
+        name = payload.get("name")
+        if name is None:
+            name = ""
+        elif not isinstance(name, str):
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": "'name' doit être du texte"})
+            return
+        name = name.strip()[:ROOM_NAME_MAX_LENGTH]
+        with room.lock:
+            if len(room.players) >= ROOM_MAX_PLAYERS:
+                self._send_json(
+                    HTTPStatus.CONFLICT,
+                    {"error": f"Salon complet ({ROOM_MAX_PLAYERS} joueurs)"},
+                )
+                return
+            player_id = len(room.players) + 1
+            try:
+                # Chaque joueur a sa grille, reproductible depuis la graine du salon.
+                board = _build_board(_current_snapshot(), room.size, room.free, f"{room.seed}:{player_id}")
+            except ValueError as exc:
+                self._send_json(HTTPStatus.CONFLICT, {"error": str(exc)})
+                return
+            player = _PlayerCard(player_id, name or f"Joueur {player_id}", room.size, board["cells"])
+            room.players.append(player)
+            room.version += 1
+            state = room.state()
+            event = room.event("join", {"player": player.summary()})
+        _FEED.publish(room.id, event)
+        self._send_json(
+            HTTPStatus.CREATED,
+            {
+                "room": state,
+                "player": {"id": player.id, "name": player.name, "token": player.token},
+                "cells": player.cells,
+                "marks": player.marks,
+                "lines": player.completed(),
+            },
+        )
+
+    def _handle_mark(self, room: _Room, payload: dict[str, object]) -> None:
+        """Coche (`marked` vrai), décoche (faux) ou bascule (absent) une case."""
+        player_id = payload.get("player")
+        token = payload.get("token")
+        cell = payload.get("cell")
+        marked = payload.get("marked")
+        total = room.size * room.size
+        if (
+            any(type(value) is not int for value in (player_id, cell))
+            or not isinstance(token, str)
+            or not 0 <= cell < total
+            or not isinstance(marked, (bool, type(None)))
+        ):
+            self._send_json(
+                HTTPStatus.BAD_REQUEST,
+                {"error": f"'player', 'token' et 'cell' (0 à {total - 1}) sont requis"},
+            )
+            return
+        event = None
+        with room.lock:
+            player = room.players[player_id - 1] if 1 <= player_id <= len(room.players) else None
+            if player is None:
+                self._send_json(HTTPStatus.NOT_FOUND, {"error": "Joueur introuvable"})
+                return
+            if not secrets.compare_digest(token.encode("utf-8"), player.token.encode("ascii")):
+                self._send_json(HTTPStatus.FORBIDDEN, {"error": "Jeton de joueur invalide"})
+                return
+            if player.cells[cell] is None:
+                self._send_json(HTTPStatus.CONFLICT, {"error": "La case libre reste cochée"})
+                return
+            if marked is None:
+                marked = not player.marks >> cell & 1
+            had_bingo = player.lines > 0
+            first_mark = marked and not player.seen >> cell & 1
+            if player.set(cell, marked):
+                player.seen |= player.marks
+                room.version += 1
+                if player.lines and not had_bingo and player.id not in room.winners:
+                    room.winners.append(player.id)
+                event = room.event(
+                    "mark",
+                    {"player": player.summary(), "cell": cell, "marked": marked, "winners": room.winners},
+                )
+            result = {
+                "version": room.version,
+                "marks": player.marks,
+                "lines": player.completed(),
+                "bingo": player.lines > 0,
+                "winners": list(room.winners),
+            }
+        if event is not None:
+            _FEED.publish(room.id, event)
+            if first_mark:
+                _EVENTS.record({player.cells[cell]: 1})
+        self._send_json(HTTPStatus.OK, result)
+
+    def _handle_duplicates(self) -> None:
+        # Les groupes ne sont calculés que par le constructeur, donc seulement
+        # quand la réponse en cache est périmée (_DUPLICATES garde en plus
+        # le dernier rapport jusqu'au prochain changement du magasin).
+        self._send_cached(
+            _cached_response(
+                "duplicates",
+                lambda snapshot: {
+                    "threshold": DEDUPE_THRESHOLD,
+                    "groups": _DUPLICATES.groups(snapshot),
+                },
+            )
+        )
+
+    def _handle_get_argumentaire(self, phrase: str) -> None:
+        # Hors cache : une clé par phrase évincerait du LRU la liste et les
+        # pages partagées. L'ETag, calculé sur le corps, reste stable.
+        try:
+            response = _one_off_response(lambda snapshot: _require_item(snapshot, phrase))
+        except KeyError:
+            self._send_json(
+                HTTPStatus.NOT_FOUND,
+                {"error": "Argumentaire introuvable"},
+            )
+            return
+        self._send_cached(response)
+
+    def _handle_search(self, query: str) -> None:
+        params = parse_qs(query)
+        text = params["q"][0].strip() if "q" in params else ""
+        if not text:
+            self._send_json(
+                HTTPStatus.BAD_REQUEST,
+                {"error": "Paramètre 'q' requis"},
+            )
+            return
+        try:
+            limit = int(params["limit"][0]) if "limit" in params else SEARCH_DEFAULT_LIMIT
+            if not 1 <= limit <= SEARCH_MAX_LIMIT:
+                raise ValueError
+        except ValueError:
+            self._send_json(
+                HTTPStatus.BAD_REQUEST,
+                {"error": f"'limit' doit être un entier entre 1 et {SEARCH_MAX_LIMIT}"},
+            )
+            return
+
+        self._send_cached(_one_off_response(lambda snapshot: _search_items(snapshot, text, limit)))
+
+    def _handle_get_board(self, query: str) -> None:
+        params = parse_qs(query)
+        try:
+            size = int(params["size"][0]) if "size" in params else BOARD_DEFAULT_SIZE
+            if size not in BOARD_SIZES:
+                raise ValueError
+        except ValueError:
+            self._send_json(
+                HTTPStatus.BAD_REQUEST,
+                {"error": f"'size' doit valoir {', '.join(map(str, BOARD_SIZES))}"},
+            )
+            return
+        free = params.get("free", ["1"])[0].lower() not in ("0", "false", "non")
+        seed = params["seed"][0].strip()[:64] if "seed" in params else ""
+
+        try:
+            if seed:
+                # Même graine, même grille : l'ETag permet au client de revalider.
+                self._send_cached(
+                    _one_off_response(lambda snapshot: _build_board(snapshot, size, free, seed))
+                )
+                return
+            board = _build_board(_current_snapshot(), size, free, secrets.token_urlsafe(6))
+        except ValueError as exc:
+            self._send_json(HTTPStatus.CONFLICT, {"error": str(exc)})
+            return
+        self._send_json(HTTPStatus.OK, board)
+
+    def _handle_metrics(self) -> None:
+        snapshot = _current_snapshot()
+        gauges = (
+            ("bingo_store_items", "Argumentaires présents dans le magasin.", len(snapshot.items)),
+            ("bingo_store_version", "Version courante du magasin.", snapshot.version),
+            ("bingo_sources_registered", "Sources distinctes du registre.", len(_SOURCES)),
+            ("bingo_sse_subscribers", "Abonnés aux flux SSE (magasin et salons).", len(_FEED)),
+            ("bingo_rooms_active", "Salons de jeu en mémoire.", len(_ROOMS)),
+            ("bingo_response_cache_entries", "Réponses encodées en cache.", len(_RESPONSE_CACHE)),
+        )
+        body = _METRICS.render(gauges).encode("utf-8")
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", METRICS_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle_post_argumentaire(self, duplicates: str) -> None:
+        length = int(self.headers.get("Content-Length", "0"))
+        if length <= 0:
+            self._send_json(
+                HTTPStatus.BAD_REQUEST,
+                {"error": "Corps JSON manquant"},
+            )
+            return
+
+        raw = self.rfile.read(length)
+        try:
+            payload = json.loads(raw)
+        except ValueError:
+            # JSON mal formé ou octets qui ne sont pas de l'UTF-8.
+            self._send_json(
+                HTTPStatus.BAD_REQUEST,
+                {"error": "JSON invalide"},
+            )
+            return
+        if not isinstance(payload, dict):
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": "Objet JSON attendu"})
+            return
+
+        phrase = payload.get("phrase") or ""
+        argumentaire = payload.get("argumentaire") or ""
+        if not isinstance(phrase, str) or not isinstance(argumentaire, str):
+            self._send_json(
+                HTTPStatus.BAD_REQUEST,
+                {"error": "'phrase' et 'argumentaire' doivent être du texte"},
+            )
+            return
+        phrase = phrase.strip()
+        argumentaire = argumentaire.strip()
+        sources_raw = payload.get("sources")
+        if not phrase or not argumentaire:
+            self._send_json(
+                HTTPStatus.BAD_REQUEST,
+                {"error": "'phrase' et 'argumentaire' sont requis"},
+            )
+            return
+
+        sources: list[dict[str, str]]
+        if sources_raw is None:
+            sources = []
+        elif isinstance(sources_raw, list):
+            sources = []
+            for entry in sources_raw:
+                if not isinstance(entry, dict):
+                    continue
+                try:
+                    cleaned = _sanitize_source(entry)
+                except ValueError as exc:
+                    self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(exc)})
+                    return
+                if cleaned:
+                    sources.append(cleaned)
+        else:
+            return self._send_json(
+                HTTPStatus.BAD_REQUEST,
+                {"error": "'sources' doit être un tableau d'objets"},
+            )
+
+        item, candidates = upsert_argumentaire(phrase, argumentaire, sources, duplicates)
+        if item is None:
+            self._send_json(
+                HTTPStatus.CONFLICT,
+                {
+                    "error": "Phrase proche d'argumentaires existants ; "
+                    "renvoyez avec duplicates=allow ou duplicates=merge",
+                    "candidates": candidates,
+                },
+            )
+            return
+        self._send_json(HTTPStatus.OK, item)
+
+    def _handle_post_bulk(self, duplicates: str) -> None:
+        length = int(self.headers.get("Content-Length", "0"))
+        if length <= 0:
+            self._send_json(
+                HTTPStatus.BAD_REQUEST,
+                {"error": "Corps JSON manquant"},
+            )
+            return
+
+        content_type = self.headers.get("Content-Type", "").split(";")[0].strip()
+        entries: list[object] = []
+        parse_errors: dict[int, str] = {}
+        if content_type in NDJSON_CONTENT_TYPES:
+            # NDJSON : une entrée par ligne, lue au fil de l'eau.
+            remaining = length
+            while remaining > 0:
+                line = self.rfile.readline(remaining)
+                if not line:
+                    break
+                remaining -= len(line)
+                if not line.strip():
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    parse_errors[len(entries)] = "JSON invalide"
+                    entries.append(None)
+        else:
+            try:
+                payload = json.loads(self.rfile.read(length))
+            except ValueError:
+                self._send_json(
+                    HTTPStatus.BAD_REQUEST,
+                    {"error": "JSON invalide"},
+                )
+                return
+            if not isinstance(payload, list):
+                self._send_json(
+                    HTTPStatus.BAD_REQUEST,
+                    {"error": "Le corps doit être un tableau JSON ou du NDJSON"},
+                )
+                return
+            entries = payload
+
+        if len(entries) > BULK_MAX_ITEMS:
+            self._send_json(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                {"error": f"Au plus {BULK_MAX_ITEMS} entrées par import"},
+            )
+            return
+
+        # Les doublons sont cherchés dans le magasin et entre les entrées du
+        # lot, sous le verrou d'écriture.
+        results: list[dict[str, object]] = []
+        conflicts = 0
+        outcomes = bulk_upsert_argumentaires(entries, duplicates)
+        for index, (item, candidates) in enumerate(outcomes):
+            if item is not None:
+                results.append({"index": index, "status": "ok", "phrase": item["phrase"]})
+            elif candidates:
+                conflicts += 1
+                results.append(
+                    {
+                        "index": index,
+                        "status": "duplicate",
+                        "phrase": _sanitize_item(entries[index])["phrase"],
+                        "candidates": candidates,
+                    }
+                )
+            else:
+                error = parse_errors.get(index) or _item_error(entries[index])
+                results.append({"index": index, "status": "error", "error": error})
+        applied = sum(1 for result in results if result["status"] == "ok")
+        self._send_json(
+            HTTPStatus.OK,
+            {
+                "applied": applied,
+                "rejected": len(results) - applied - conflicts,
+                "duplicates": conflicts,
+                "results": results,
+            },
+        )
+
+    def _send_cached(self, response: _EncodedResponse) -> None:
+        if _etag_matches(self.headers.get("If-None-Match", ""), response.etag):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", response.etag)
+            self.send_header("Vary", "Accept-Encoding")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            return
+
+        accepted = _accepted_encodings(self.headers.get("Accept-Encoding", ""))
+        body = response.identity
+        encoding = None
+        etag = response.etag
+        if response.gzip is not None and ("gzip" in accepted or "*" in accepted):
+            body, encoding = response.gzip, "gzip"
+        elif response.deflate is not None and "deflate" in accepted:
+            body, encoding = response.deflate, "deflate"
+        if encoding:
+            etag = f'"{response.etag[1:-1]}-{encoding}"'
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(response.length if body is None else len(body)))
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("ETag", etag)
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Cache-Control", "no-cache")
+        for name, value in response.headers:
+            self.send_header(name, value)
+        self.end_headers()
+        if body is None:
+            self._write_fragments(response.fragments)
+        else:
+            self.wfile.write(body)
+
+    def _write_fragments(self, fragments: tuple[bytes, ...]) -> None:
+        for batch in _fragment_batches(fragments):
+            self.wfile.write(batch)
+
+    def _send_json(
+        self,
+        status: HTTPStatus,
+        payload: object,
+        headers: Iterable[tuple[str, str]] = (),
+    ) -> None:
+        started = time.perf_counter()
+        encoded = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        _METRICS.observe("bingo_json_serialize_seconds", time.perf_counter() - started, _SITE_SEND_JSON)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(encoded)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(encoded)
+
+
+class ThreadedHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # Requêtes en cours, attendues par drain() à l'arrêt.
+        self._active = 0
+        self._idle = Condition()
+
+    @classmethod
+    def adopt(cls, listener: socket.socket) -> ThreadedHTTPServer:
+        """Serveur sur une socket déjà à l'écoute (ouverte par run_server ou héritée)."""
+        httpd = cls(listener.getsockname()[:2], RequestHandler, bind_and_activate=False)
+        httpd.socket.close()
+        httpd.socket = listener
+        httpd.server_address = listener.getsockname()
+        httpd.server_name, httpd.server_port = httpd.server_address[:2]
+        return httpd
+
+    def process_request(self, request, client_address):
+        # Compté avant le démarrage du thread : drain() ne peut pas le manquer.
+        with self._idle:
+            self._active += 1
+        try:
+            super().process_request(request, client_address)
+        except BaseException:
+            self._done()
+            raise
+
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self._done()
+
+    def _done(self) -> None:
+        with self._idle:
+            self._active -= 1
+            if not self._active:
+                self._idle.notify_all()
+
+    def drain(self, timeout: float) -> int:
+        """Attend la fin des requêtes en cours ; renvoie le nombre d'abandonnées."""
+        with self._idle:
+            self._idle.wait_for(lambda: not self._active, timeout)
+            return self._active
+
+    def shutdown_request(self, request):
+        # Une connexion SSE appartient désormais au thread du flux.
+        if not _FEED.owns(request):
+            super().shutdown_request(request)
+
+
+def _fragment_batches(fragments: tuple[bytes, ...]) -> Iterator[bytes]:
+    """La liste JSON `[a, b, ...]` par lots d'environ STREAM_CHUNK_BYTES."""
+    batch = [b"["]
+    size = 1
+    for index, fragment in enumerate(fragments):
+        if index:
+            batch.append(b", ")
+        batch.append(fragment)
+        size += len(fragment) + 2
+        if size >= STREAM_CHUNK_BYTES:
+            yield b"".join(batch)
+            batch = []
+            size = 0
+    batch.append(b"]")
+    yield b"".join(batch)
+
+
+class _BufferedRequestHandler(RequestHandler):
+    """RequestHandler rejoué sur une requête déjà lue par la boucle asyncio.
+
+    La réponse est accumulée en mémoire ; la boucle l'écrit ensuite sur la
+    connexion, ce qui garde le routage et les fichiers statiques communs aux
+    deux modes. Seul le corps d'une grande liste (fragments) n'est pas
+    accumulé : la boucle l'écrit elle-même, lot par lot.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def __init__(
+        self,
+        raw_request: bytes,
+        client_address: tuple[str, int],
+        last: bool = False,
+    ) -> None:
+        self._raw_request = raw_request
+        # Dernière requête de la connexion (arrêt en cours) : annoncée au client.
+        self._last = last
+        # (version, canal) de départ si la requête ouvre un flux SSE.
+        self.stream: tuple[int, str | None] | None = None
+        # Corps différé d'une grande liste, écrit par la boucle après les en-têtes.
+        self.fragments: tuple[bytes, ...] = ()
+        super().__init__(None, client_address, None)
+
+    def setup(self) -> None:
+        self.connection = None
+        self.rfile = io.BytesIO(self._raw_request)
+        self.wfile = io.BytesIO()
+
+    def handle(self) -> None:
+        self.close_connection = True
+        self.handle_one_request()
+
+    def finish(self) -> None:
+        pass
+
+    def end_headers(self) -> None:
+        if self._last and not self.close_connection:
+            self.send_header("Connection", "close")
+        super().end_headers()
+
+    def _subscribe(self, version: int, channel: str | None = None) -> None:
+        # La boucle asyncio garde la connexion et l'inscrit elle-même.
+        self.stream = (version, channel)
+
+    def _write_fragments(self, fragments: tuple[bytes, ...]) -> None:
+        self.fragments = fragments
+
+
+def _run_buffered_request(
+    raw_request: bytes,
+    client_address: tuple[str, int],
+    last: bool = False,
+) -> tuple[bytes, tuple[bytes, ...], bool, tuple[int, str | None] | None]:
+    """(en-têtes et corps accumulés, fragments à écrire ensuite, fermeture, flux SSE)."""
+    handler = _BufferedRequestHandler(raw_request, client_address, last)
+    return handler.wfile.getvalue(), handler.fragments, handler.close_connection, handler.stream
+
+
+def _plain_response(status: HTTPStatus, message: str) -> bytes:
+    body = json.dumps({"error": message}, ensure_ascii=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Connection: close\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+def _request_body_length(head: bytes) -> int | None:
+    """Longueur du corps d'après les en-têtes, None si elle est inexploitable."""
+    length = 0
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        name = name.strip().lower()
+        if name == b"transfer-encoding":
+            return None
+        if name == b"content-length":
+            try:
+                length = int(value.strip())
+            except ValueError:
+                return None
+            if length < 0:
+                return None
+    return length
+
+
+class _AsyncConnections:
+    """Connexions du serveur asyncio, suivies pour l'arrêt en douceur.
+
+    Au vidage, chaque connexion sert encore une requête, annoncée comme la
+    dernière (Connection: close), puis se ferme : un client keep-alive
+    n'envoie jamais de requête sur une connexion fermée sous ses pieds.
+    Celles qui n'ont pas fini à l'échéance sont coupées.
+    """
+
+    def __init__(self) -> None:
+        self.writers: dict[asyncio.Task, asyncio.StreamWriter] = {}
+        self.draining = False
+
+    async def drain(self, timeout: float) -> int:
+        """Attend les connexions ouvertes ; renvoie le nombre de coupées."""
+        self.draining = True
+        if not self.writers:
+            return 0
+        _, pending = await asyncio.wait(set(self.writers), timeout=timeout)
+        for task in pending:
+            writer = self.writers.get(task)
+            if writer is not None:
+                writer.transport.abort()
+        if pending:
+            await asyncio.wait(pending, timeout=1.0)
+        return len(pending)
+
+
+async def _handle_async_connection(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    executor: ThreadPoolExecutor,
+    slots: asyncio.Semaphore,
+    connections: _AsyncConnections,
+) -> None:
+    loop = asyncio.get_running_loop()
+    peer = writer.get_extra_info("peername") or ("", 0)
+    task = asyncio.current_task()
+    connections.writers[task] = writer
+    stream = None
+    try:
+        # Au-delà de ASYNC_MAX_CONNECTIONS, les nouvelles connexions attendent
+        # qu'un créneau se libère au lieu de consommer des ressources.
+        async with slots:
+            while True:
+                try:
+                    head = await asyncio.wait_for(
+                        reader.readuntil(b"\r\n\r\n"),
+                        ASYNC_KEEPALIVE_TIMEOUT,
+                    )
+                except asyncio.LimitOverrunError:
+                    writer.write(
+                        _plain_response(
+                            HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                            "En-têtes trop volumineux",
+                        )
+                    )
+                    break
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+
+                length = _request_body_length(head)
+                if length is None:
+                    writer.write(
+                        _plain_response(HTTPStatus.LENGTH_REQUIRED, "Content-Length requis")
+                    )
+                    break
+                if length > ASYNC_MAX_BODY_BYTES:
+                    writer.write(
+                        _plain_response(
+                            HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                            "Corps de requête trop volumineux",
+                        )
+                    )
+                    break
+                try:
+                    # Un corps qui n'arrive pas ne doit pas retenir le créneau.
+                    body = (
+                        await asyncio.wait_for(reader.readexactly(length), ASYNC_KEEPALIVE_TIMEOUT)
+                        if length
+                        else b""
+                    )
+                except asyncio.TimeoutError:
+                    writer.write(
+                        _plain_response(HTTPStatus.REQUEST_TIMEOUT, "Corps de requête incomplet")
+                    )
+                    break
+
+                last = connections.draining
+                try:
+                    response, fragments, close, stream = await loop.run_in_executor(
+                        executor,
+                        _run_buffered_request,
+                        head + body,
+                        peer[:2],
+                        last,
+                    )
+                except Exception:
+                    # Le client reçoit une 500 plutôt qu'une connexion coupée sans réponse.
+                    traceback.print_exc()
+                    writer.write(
+                        _plain_response(HTTPStatus.INTERNAL_SERVER_ERROR, "Erreur interne du serveur")
+                    )
+                    break
+                writer.write(response)
+                if stream is not None:
+                    break
+                # Grande liste : un lot de STREAM_CHUNK_BYTES à la fois en
+                # mémoire, au rythme où le client les lit.
+                for batch in _fragment_batches(fragments) if fragments else ():
+                    await writer.drain()
+                    writer.write(batch)
+                # Contre-pression : on n'accepte pas la requête suivante tant que
+                # le client n'a pas absorbé la réponse.
+                await writer.drain()
+                if close or last:
+                    break
+        # Hors du sémaphore : un abonné SSE inactif n'occupe pas de créneau.
+        if stream is not None:
+            await _FEED.serve_async(reader, writer, *stream)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        connections.writers.pop(task, None)
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def _serve_async(listener: socket.socket, reloadable: list[socket.socket] | None) -> None:
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(
+        max_workers=ASYNC_WORKER_THREADS,
+        thread_name_prefix="bingo-worker",
+    )
+    slots = asyncio.Semaphore(ASYNC_MAX_CONNECTIONS)
+    connections = _AsyncConnections()
+    server = await asyncio.start_server(
+        lambda reader, writer: _handle_async_connection(reader, writer, executor, slots, connections),
+        sock=listener,
+        limit=ASYNC_HEADER_LIMIT,
+        backlog=ASYNC_BACKLOG,
+    )
+    stopping = asyncio.Event()
+    loop.add_signal_handler(signal.SIGTERM, stopping.set)
+    if reloadable is not None and hasattr(signal, "SIGHUP"):
+
+        async def reload() -> None:
+            if await loop.run_in_executor(None, _spawn_successor, reloadable):
+                stopping.set()
+
+        loop.add_signal_handler(signal.SIGHUP, lambda: loop.create_task(reload()))
+    try:
+        await stopping.wait()
+    finally:
+        server.close()
+        _FEED.close_all()
+        abandoned = await connections.drain(DRAIN_SECONDS)
+        if abandoned:
+            print(f"Délai de vidage dépassé : {abandoned} connexion(s) interrompue(s)")
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _serve(listener: socket.socket, mode: str, reloadable: list[socket.socket] | None = None) -> None:
+    """Sert sur `listener` jusqu'à SIGTERM, CTRL+C ou relais à un successeur,
+    puis vide les requêtes en cours pendant au plus DRAIN_SECONDS.
+
+    `reloadable` : sockets d'écoute à transmettre au successeur sur SIGHUP
+    (None dans un worker, c'est le maître qui recharge).
+    """
+    try:
+        if mode == "async":
+            asyncio.run(_serve_async(listener, reloadable))
+            return
+        httpd = ThreadedHTTPServer.adopt(listener)
+
+        def stop(*_: object) -> None:
+            # shutdown() attend la fin de serve_forever : hors du thread principal.
+            Thread(target=httpd.shutdown, daemon=True).start()
+
+        def reload(*_: object) -> None:
+            Thread(
+                target=lambda: _spawn_successor(reloadable) and httpd.shutdown(),
+                name="bingo-reload",
+                daemon=True,
+            ).start()
+
+        signal.signal(signal.SIGTERM, stop)
+        if reloadable is not None and hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, reload)
+        try:
+            httpd.serve_forever()
+        finally:
+            httpd.server_close()
+            _FEED.close_all()
+            abandoned = httpd.drain(DRAIN_SECONDS)
+            if abandoned:
+                print(f"Délai de vidage dépassé : {abandoned} requête(s) interrompue(s)")
     finally:
-        httpd.server_close()
+        # Les cases cochées depuis le dernier vidage ne sont pas perdues.
+        _EVENTS.flush()
+
+
+def _open_listeners(port: int, mode: str, count: int) -> list[socket.socket]:
+    """Sockets d'écoute : héritées du prédécesseur (SIGHUP), sinon ouvertes.
+
+    Avec plusieurs workers, chacun a sa socket SO_REUSEPORT : le noyau
+    répartit les connexions, et un worker relancé reprend la file du précédent.
+    """
+    inherited = [
+        socket.socket(fileno=int(fd))
+        for fd in os.environ.pop(RELOAD_LISTEN_FDS_ENV, "").split(",")
+        if fd
+    ]
+    for extra in inherited[count:]:
+        extra.close()
+    listeners = inherited[:count]
+    backlog = ASYNC_BACKLOG if mode == "async" else ThreadedHTTPServer.request_queue_size
+    while len(listeners) < count:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if count > 1:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind(("", port))
+        sock.listen(backlog)
+        listeners.append(sock)
+    return listeners
+
+
+_RELOAD_LOCK = Lock()
+
+
+def _spawn_successor(listeners: list[socket.socket]) -> bool:
+    """Relance la même commande en lui passant les sockets d'écoute.
+
+    Le successeur charge le magasin et chauffe ses caches, puis écrit un
+    octet sur le tube reçu : ce n'est qu'alors que l'appelant peut cesser
+    d'accepter. Sans signal sous RELOAD_READY_SECONDS, le successeur est
+    tué et l'appelant continue de servir. False si le relais n'a pas eu lieu.
+
+    Le successeur est un enfant qui survit à son parent, avec un autre PID :
+    cela suppose un processus non supervisé, ou un superviseur qui suit ce
+    changement. Sous systemd avec KillMode=control-group (le défaut), ou en
+    PID 1 d'un conteneur, la sortie de l'ancien processus emporte le
+    successeur ; redémarrer le service y reste la voie normale.
+    """
+    if not _RELOAD_LOCK.acquire(blocking=False):
+        return False
+    try:
+        ready_r, ready_w = os.pipe()
+        fds = [sock.fileno() for sock in listeners]
+        env = dict(
+            os.environ,
+            **{RELOAD_LISTEN_FDS_ENV: ",".join(map(str, fds)), RELOAD_READY_FD_ENV: str(ready_w)},
+        )
+        print("Rechargement : démarrage du successeur...")
+        try:
+            process = subprocess.Popen(
+                [sys.executable, *sys.orig_argv[1:]],
+                env=env,
+                pass_fds=(*fds, ready_w),
+            )
+        except OSError as exc:
+            print(f"Rechargement impossible : {exc}")
+            return False
+        finally:
+            os.close(ready_w)
+        with selectors.DefaultSelector() as selector:
+            selector.register(ready_r, selectors.EVENT_READ)
+            ready = bool(selector.select(RELOAD_READY_SECONDS)) and os.read(ready_r, 1) == b"1"
+        os.close(ready_r)
+        if not ready:
+            process.kill()
+            process.wait()
+            print("Rechargement annulé : le successeur n'est pas prêt, l'ancien processus continue")
+            return False
+        print(f"Rechargement : relais passé au processus {process.pid}, vidage des connexions")
+        return True
+    finally:
+        _RELOAD_LOCK.release()
+
+
+def _signal_ready() -> None:
+    """Prévient le prédécesseur (SIGHUP) que ce processus peut servir."""
+    fd = os.environ.pop(RELOAD_READY_FD_ENV, "")
+    if not fd:
+        return
+    try:
+        os.write(int(fd), b"1")
+    finally:
+        os.close(int(fd))
+
+
+def _warm_up() -> None:
+    """Construit d'avance les réponses et index les plus demandés.
+
+    Fait avant d'accepter (et avant le fork des workers, qui en héritent) :
+    les premières requêtes après un rechargement ne paient pas ces calculs.
+    """
+    snapshot = _current_snapshot()
+    _cached_response("argumentaires", _list_response)
+    _DUPLICATES.groups(snapshot)
+    for path in BASE_DIR.glob("*.html"):
+        _load_static_asset(str(path), "text/html")
+
+
+def _release_process_handles() -> None:
+    """Ferme les descripteurs du magasin avant un fork : chaque worker rouvre
+    les siens (journal, verrou flock, connexions SQLite)."""
+    global _JOURNAL, _LOCK_HANDLE
+    with DB_LOCK:
+        if _JOURNAL is not None:
+            _JOURNAL.close()
+            _JOURNAL = None
+        if _LOCK_HANDLE is not None:
+            _LOCK_HANDLE.close()
+            _LOCK_HANDLE = None
+        if _SQLITE is not None:
+            _SQLITE.close()
+
+
+def _interrupt(signum: int, frame: object) -> None:
+    """SIGTERM sur le maître traité comme CTRL+C."""
+    raise KeyboardInterrupt
+
+
+def _run_workers(listeners: list[socket.socket], mode: str) -> None:
+    """Pré-fork : un worker par socket d'écoute, le noyau répartit (SO_REUSEPORT)."""
+    _release_process_handles()
+    # pid -> indice de la socket d'écoute du worker.
+    children: dict[int, int] = {}
+
+    def spawn(index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            if hasattr(signal, "SIGHUP"):
+                # Le maître seul recharge ; chaque worker reçoit ensuite SIGTERM.
+                signal.signal(signal.SIGHUP, signal.SIG_IGN)
+            code = 0
+            try:
+                _serve(listeners[index], mode)
+            except KeyboardInterrupt:
+                pass
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = index
+
+    def reload(*_: object) -> None:
+        # Une fois le successeur prêt, arrêt comme sur SIGTERM : les workers
+        # vident leurs connexions pendant que le successeur accepte.
+        Thread(
+            target=lambda: _spawn_successor(listeners) and os.kill(os.getpid(), signal.SIGTERM),
+            name="bingo-reload",
+            daemon=True,
+        ).start()
+
+    # SIGTERM sur le maître arrête proprement tous les workers.
+    signal.signal(signal.SIGTERM, _interrupt)
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, reload)
+    for index in range(len(listeners)):
+        spawn(index)
+    try:
+        while children:
+            pid, status = os.wait()
+            index = children.pop(pid)
+            code = os.waitstatus_to_exitcode(status)
+            if code not in (0, -signal.SIGINT, -signal.SIGTERM):
+                print(f"Worker {pid} arrêté (code {code}), relance")
+                spawn(index)
+    except KeyboardInterrupt:
+        print("\nArrêt demandé, fermeture...")
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in children:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+
+
+# Fichiers à nom haché de `build`, chemins relatifs au dossier de sortie.
+_BUILD_HASHED_RE = re.compile(
+    rf"^(?:argumentaires\.|index\.|phrases/)[0-9a-f]{{{BUILD_HASH_LENGTH}}}\.json(?:\.gz)?$"
+)
+
+
+def _write_build_file(path: Path, data: bytes) -> bool:
+    """Écrit `data` et son jumeau .gz ; False s'ils existent déjà (nom = contenu)."""
+    compressed = path.with_name(f"{path.name}.gz")
+    if path.exists() and compressed.exists():
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Le .gz d'abord : un fichier présent a toujours son jumeau complet.
+    for target, body in (
+        (compressed, gzip.compress(data, compresslevel=9, mtime=0)),
+        (path, data),
+    ):
+        tmp_path = target.with_name(f"{target.name}.tmp")
+        tmp_path.write_bytes(body)
+        tmp_path.replace(target)
+    return True
+
+
+def _build_references(out_dir: Path, manifest: Mapping[str, object]) -> set[str]:
+    """Fichiers cités par `manifest`, entrées de son index comprises."""
+    names = {manifest["argumentaires"], manifest["index"]}
+    try:
+        index = json.loads((out_dir / manifest["index"]).read_bytes())
+    except (OSError, ValueError):
+        return names
+    if isinstance(index, dict):
+        names.update(index.values())
+    return names
+
+
+def build_static_api(out_dir: Path = BUILD_DIR, store: str | None = None) -> dict[str, int]:
+    """Écrit dans `out_dir` un instantané statique de l'API, pour Pages/CDN.
+
+    - argumentaires.<hash>.json : le corps de GET /api/argumentaires ;
+    - phrases/<hash>.json : une entrée, comme GET /api/argumentaires/{phrase} ;
+    - index.<hash>.json : phrase -> fichier de son entrée ;
+    - manifest.json : seul nom fixe, il pointe vers la liste et l'index.
+
+    Les noms dépendent du contenu : un fichier déjà présent n'est pas réécrit
+    et peut rester en cache indéfiniment. Chaque fichier haché a un jumeau
+    .gz. Ceux que ne citent ni ce manifeste ni le précédent sont supprimés,
+    pour qu'un client qui tient l'ancien manifeste trouve encore ses fichiers.
+    """
+    init_db(store)
+    items = fetch_argumentaires()
+    stats = {"written": 0, "unchanged": 0, "removed": 0}
+
+    def emit(prefix: str, data: bytes) -> str:
+        name = f"{prefix}{hashlib.sha256(data).hexdigest()[:BUILD_HASH_LENGTH]}.json"
+        stats["written" if _write_build_file(out_dir / name, data) else "unchanged"] += 1
+        return name
+
+    index = {item["phrase"]: emit("phrases/", _encode_item(item)) for item in items}
+    manifest = {
+        "count": len(items),
+        "argumentaires": emit("argumentaires.", json.dumps(items, ensure_ascii=False).encode("utf-8")),
+        "index": emit(
+            "index.",
+            json.dumps(index, ensure_ascii=False, sort_keys=True).encode("utf-8"),
+        ),
+    }
+
+    manifest_path = out_dir / "manifest.json"
+    try:
+        previous = json.loads(manifest_path.read_bytes())
+    except (OSError, ValueError):
+        previous = None
+    if previous != manifest:
+        tmp_path = manifest_path.with_name(f"{manifest_path.name}.tmp")
+        tmp_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        tmp_path.replace(manifest_path)
+
+    keep = _build_references(out_dir, manifest)
+    if isinstance(previous, dict) and {"argumentaires", "index"} <= previous.keys():
+        keep |= _build_references(out_dir, previous)
+    for path in [*out_dir.glob("*.json*"), *out_dir.glob("phrases/*.json*")]:
+        relative = path.relative_to(out_dir).as_posix()
+        if _BUILD_HASHED_RE.match(relative) and relative.removesuffix(".gz") not in keep:
+            path.unlink()
+            stats["removed"] += 1
+    return stats
+
+
+def run_server(
+    port: int = 8000,
+    store: str = "json",
+    mode: str = "threaded",
+    workers: int = 1,
+) -> None:
+    if mode not in SERVER_MODES:
+        raise ValueError(f"Mode de serveur inconnu : {mode}")
+    if workers > 1 and not hasattr(os, "fork"):
+        raise ValueError("--workers nécessite fork() (Linux, macOS)")
+    # Après un SIGHUP, les sockets viennent du prédécesseur, qui sert encore
+    # pendant ce démarrage : le port n'est jamais fermé.
+    listeners = _open_listeners(port, mode, workers)
+    init_db(store)
+    _warm_up()
+    print(
+        f"Serveur lancé sur http://localhost:{port}/ "
+        f"(stockage : {store}, mode : {mode}, workers : {workers})"
+    )
+    print(f"Arrêt : CTRL+C ; rechargement sans coupure : kill -HUP {os.getpid()}")
+    _signal_ready()
+    if workers > 1:
+        _ROOMS.enabled = False
+        _run_workers(listeners, mode)
+        return
+    try:
+        _serve(listeners[0], mode, reloadable=listeners)
+    except KeyboardInterrupt:
+        print("\nArrêt demandé, fermeture...")
+
+
+def main(argv: list[str] | None = None) -> None:
+    global _ADMISSION
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=("serve", "build"),
+        default="serve",
+        help="servir le site, ou écrire l'instantané statique de l'API (défaut : serve)",
+    )
+    parser.add_argument(
+        "--out",
+        type=Path,
+        default=BUILD_DIR,
+        help=f"dossier de sortie de build (défaut : {BUILD_DIR.name})",
+    )
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--store",
+        choices=STORE_ENGINES,
+        default="json",
+        help="moteur de stockage des argumentaires (défaut : json)",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=SERVER_MODES,
+        default="threaded",
+        help="un thread par connexion, ou boucle asyncio HTTP/1.1 (défaut : threaded)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="nombre de processus partageant le port via SO_REUSEPORT (défaut : 1)",
+    )
+    parser.add_argument(
+        "--max-body-bytes",
+        type=int,
+        default=POST_MAX_BODY_BYTES,
+        help=f"taille maximale d'un POST unitaire (défaut : {POST_MAX_BODY_BYTES})",
+    )
+    parser.add_argument(
+        "--post-rate",
+        type=float,
+        default=POST_RATE_PER_SECOND,
+        help=f"POST autorisés par seconde et par IP, 0 = illimité (défaut : {POST_RATE_PER_SECOND})",
+    )
+    parser.add_argument(
+        "--post-burst",
+        type=int,
+        default=POST_BURST,
+        help=f"rafale de POST tolérée par IP (défaut : {POST_BURST})",
+    )
+    parser.add_argument(
+        "--max-inflight-writes",
+        type=int,
+        default=MAX_INFLIGHT_WRITES,
+        help=f"écritures simultanées avant réponse 503, 0 = illimité (défaut : {MAX_INFLIGHT_WRITES})",
+    )
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        stats = build_static_api(args.out, args.store)
+        print(
+            f"Instantané écrit dans {args.out} : {stats['written']} fichiers écrits, "
+            f"{stats['unchanged']} inchangés, {stats['removed']} supprimés"
+        )
+        return
+    if args.workers < 1:
+        parser.error("--workers doit être au moins 1")
+    if args.max_body_bytes < 1 or args.post_burst < 1:
+        parser.error("--max-body-bytes et --post-burst doivent être au moins 1")
+    if args.post_rate < 0 or args.max_inflight_writes < 0:
+        parser.error("--post-rate et --max-inflight-writes ne peuvent pas être négatifs")
+    _ADMISSION = _WriteAdmission(
+        args.max_body_bytes,
+        args.post_rate,
+        args.post_burst,
+        args.max_inflight_writes,
+    )
+    run_server(args.port, args.store, args.mode, args.workers)
 
 
 if __name__ == "__main__":
-    run_server()
+    main()